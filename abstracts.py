@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Compressed abstract archive with random access by project id
+- Trains a zstd dictionary on a sample of abstracts, then compresses every
+  abstract as its own frame with that dictionary, so one record decodes
+  without touching the others
+- A sorted id/offset index at the front of the file finds a frame with a
+  binary search; frames are read through mmap
+- bulk() decodes many records in one call for batch jobs
+- strip/join move abstracts between projects.json and the archive; strip
+  leaves "abstract": null in place so join restores each record exactly
+
+File layout (little-endian):
+    magic, dictionary size, record count
+    dictionary
+    ids (int64 x count, sorted), offsets (int64 x count + 1, into the frames)
+    frames
+
+Usage:
+    python abstracts.py build                         # data/projects.json -> data/abstracts.zst
+    python abstracts.py get 8893 8895
+    python abstracts.py strip --output data/projects.slim.json
+    python abstracts.py join data/projects.slim.json --output data/projects.json
+    python abstracts.py bench [--synthetic 100000]
+
+Needs zstandard (pip install zstandard).
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import mmap
+import os
+import random
+import struct
+import time
+from array import array
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import serialization
+from jsonstream import iter_records, write_json_array
+
+PROJECTS_FILE = "data/projects.json"
+ARCHIVE_FILE = "data/abstracts.zst"
+
+MAGIC = b'CMABST01'
+HEADER = struct.Struct('<8sII')
+DICT_SIZE = 112640          # zstd's default dictionary size
+DICT_SAMPLES = 20000
+LEVEL = 12
+
+def _require():
+    if zstandard is None:
+        raise RuntimeError("The abstract archive needs zstandard (pip install zstandard)")
+
+def _int64_array(values=()):
+    result = array('q', values)
+    if result.itemsize != 8:
+        raise RuntimeError("array('q') is not 64-bit on this platform")
+    return result
+
+def write_archive(path, abstracts, dict_size=DICT_SIZE, level=LEVEL, seed=0):
+    """
+    Write {project id: abstract} to an archive; dict_size=0 compresses
+    each frame without a dictionary.
+
+    Returns:
+        Size of the trained dictionary in bytes
+    """
+    _require()
+    items = sorted((int(project_id), text.encode('utf-8')) for project_id, text in abstracts.items())
+    samples = [data for _, data in items if data]
+    if len(samples) > DICT_SAMPLES:
+        samples = random.Random(seed).sample(samples, DICT_SAMPLES)
+    dictionary = b''
+    if dict_size and len(samples) >= 8:
+        try:
+            dictionary = zstandard.train_dictionary(dict_size, samples, level=level).as_bytes()
+        except zstandard.ZstdError:
+            # Too little text to train on; frames are compressed without one
+            dictionary = b''
+    compressor = zstandard.ZstdCompressor(
+        level=level, dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None,
+        write_checksum=False, write_content_size=True, write_dict_id=False)
+
+    ids, offsets = _int64_array(), _int64_array([0])
+    frames = bytearray()
+    for project_id, data in items:
+        ids.append(project_id)
+        frames += compressor.compress(data)
+        offsets.append(len(frames))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(dictionary), len(ids)))
+        f.write(dictionary)
+        f.write(ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(frames)
+    os.replace(tmp_path, path)
+    return len(dictionary)
+
+class AbstractArchive:
+    """Read-only access to an archive written by write_archive()"""
+
+    def __init__(self, path=ARCHIVE_FILE):
+        _require()
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, dict_size, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an abstract archive")
+        position = HEADER.size
+        self.dictionary = bytes(self._map[position:position + dict_size])
+        position += dict_size
+        self.ids = _int64_array()
+        self.ids.frombytes(self._map[position:position + 8 * count])
+        position += 8 * count
+        self.offsets = _int64_array()
+        self.offsets.frombytes(self._map[position:position + 8 * (count + 1)])
+        self.frames_start = position + 8 * (count + 1)
+        self._decompressor = zstandard.ZstdDecompressor(
+            dict_data=zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _position(self, project_id):
+        i = bisect.bisect_left(self.ids, int(project_id))
+        return i if i < len(self.ids) and self.ids[i] == int(project_id) else None
+
+    def __contains__(self, project_id):
+        return self._position(project_id) is not None
+
+    def _frame(self, i):
+        return self._map[self.frames_start + self.offsets[i]:self.frames_start + self.offsets[i + 1]]
+
+    def get(self, project_id, default=None):
+        """One abstract, decoded on its own"""
+        i = self._position(project_id)
+        if i is None:
+            return default
+        return self._decompressor.decompress(self._frame(i)).decode('utf-8')
+
+    def bulk(self, project_ids=None):
+        """
+        Yield (project id, abstract) for the given ids (default: all, in id
+        order), decoding frames in batches with one native call each.
+        """
+        if project_ids is None:
+            positions = range(len(self.ids))
+        else:
+            positions = [i for i in map(self._position, project_ids) if i is not None]
+        batch = 4096
+        for start in range(0, len(positions), batch):
+            chunk = positions[start:start + batch]
+            frames = [self._frame(i) for i in chunk]
+            decoded = self._decompressor.multi_decompress_to_buffer(frames)
+            for i, segment in zip(chunk, decoded):
+                yield self.ids[i], segment.tobytes().decode('utf-8')
+
+def build(projects_path=PROJECTS_FILE, archive_path=ARCHIVE_FILE, **kwargs):
+    """Archive every abstract in a projects file; returns (records, dictionary bytes)"""
+    abstracts = {p['id']: p['abstract'] for p in iter_records(projects_path)
+                 if isinstance(p.get('abstract'), str)}
+    return len(abstracts), write_archive(archive_path, abstracts, **kwargs)
+
+def strip(projects_path, output):
+    """
+    Write the projects without their abstracts. The key stays, set to
+    null, so join() puts each abstract back where it was.
+    """
+    def records():
+        for project in iter_records(projects_path):
+            if 'abstract' in project:
+                project['abstract'] = None
+            yield project
+    return write_json_array(output, records(), serialization.default_indent())
+
+def join(projects_path, output, archive_path=ARCHIVE_FILE, batch=4096):
+    """Put abstracts from the archive back into stripped projects, a batch at a time"""
+    def records(archive):
+        pending = []
+        for project in iter_records(projects_path):
+            pending.append(project)
+            if len(pending) == batch:
+                yield from _with_abstracts(archive, pending)
+                pending = []
+        yield from _with_abstracts(archive, pending)
+
+    with AbstractArchive(archive_path) as archive:
+        return write_json_array(output, records(archive), serialization.default_indent())
+
+def _with_abstracts(archive, projects):
+    # Only records strip() left a placeholder in; the rest never had an abstract
+    stripped = [p for p in projects if 'abstract' in p and p['abstract'] is None]
+    abstracts = dict(archive.bulk(p['id'] for p in stripped))
+    for project in stripped:
+        if project['id'] in abstracts:
+            project['abstract'] = abstracts[project['id']]
+    return projects
+
+def _latency(func, ids):
+    latencies = []
+    for project_id in ids:
+        start = time.perf_counter()
+        func(project_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+def benchmark(projects, lookups=2000, seed=0):
+    """Size and decode latency: JSON, whole-file gzip, zstd per record with and without a dictionary"""
+    import tempfile
+    projects = list(projects)
+    abstracts = {p['id']: p.get('abstract') or '' for p in projects}
+    rng = random.Random(seed)
+    ids = [rng.choice(projects)['id'] for _ in range(lookups)]
+    pretty = json.dumps(projects, indent=2, ensure_ascii=False).encode('utf-8')
+    raw = sum(len(a.encode('utf-8')) for a in abstracts.values())
+    rows = []
+
+    with tempfile.TemporaryDirectory(prefix='curiousmails-abstracts-') as tmpdir:
+        json_path = os.path.join(tmpdir, 'projects.json')
+        with open(json_path, 'wb') as f:
+            f.write(pretty)
+        start = time.perf_counter()
+        by_id = {p['id']: p.get('abstract') for p in serialization.load(json_path)}
+        load = time.perf_counter() - start
+        rows.append(('projects.json', len(pretty), load, _latency(by_id.get, ids)))
+
+        gzip_path = json_path + '.gz'
+        with open(gzip_path, 'wb') as f:
+            f.write(gzip.compress(pretty, 6, mtime=0))
+        start = time.perf_counter()
+        with gzip.open(gzip_path, 'rb') as f:
+            serialization.loads(f.read())
+        # Any one abstract costs decompressing and parsing the whole file
+        whole = time.perf_counter() - start
+        rows.append(('projects.json.gz', os.path.getsize(gzip_path), whole, (whole, whole)))
+
+        for name, dict_size in (('zstd per record', 0), ('zstd + dictionary', DICT_SIZE)):
+            path = os.path.join(tmpdir, f"{dict_size}.zst")
+            start = time.perf_counter()
+            write_archive(path, abstracts, dict_size, seed=seed)
+            built = time.perf_counter() - start
+            with AbstractArchive(path) as archive:
+                start = time.perf_counter()
+                for _ in archive.bulk():
+                    pass
+                bulk = time.perf_counter() - start
+                rows.append((name, os.path.getsize(path), bulk, _latency(archive.get, ids)))
+                print(f"  {name}: built in {built:.1f}s")
+
+    print(f"{len(projects)} projects, abstracts {raw / 1e6:.1f} MB raw")
+    print(f"  {'format':<20} {'size':>10} {'vs JSON':>8} {'all records':>12} {'one record p50':>15} {'p99':>10}")
+    for name, size, everything, (p50, p99) in rows:
+        print(f"  {name:<20} {size / 1e6:8.1f}MB {len(pretty) / size:7.1f}x {everything * 1000:10.0f}ms "
+              f"{p50 * 1e6:13.1f}us {p99 * 1e6:8.1f}us")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dictionary-compressed abstract archive")
+    parser.add_argument('--archive', default=ARCHIVE_FILE, help=f"Archive file (default: {ARCHIVE_FILE})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Archive every abstract in a projects file")
+    build_cmd.add_argument('--projects', default=PROJECTS_FILE)
+    build_cmd.add_argument('--level', type=int, default=LEVEL)
+
+    get = sub.add_parser('get', help="Print abstracts by project id")
+    get.add_argument('ids', nargs='+', type=int)
+
+    strip_cmd = sub.add_parser('strip', help="Write projects without abstracts")
+    strip_cmd.add_argument('--projects', default=PROJECTS_FILE)
+    strip_cmd.add_argument('--output', required=True)
+
+    join_cmd = sub.add_parser('join', help="Restore abstracts into stripped projects")
+    join_cmd.add_argument('projects')
+    join_cmd.add_argument('--output', required=True)
+
+    bench = sub.add_parser('bench', help="Compare sizes and decode latency")
+    bench.add_argument('--projects', default=PROJECTS_FILE)
+    bench.add_argument('--synthetic', type=int, metavar='N', help="Use N synthetic projects instead")
+
+    args = parser.parse_args(argv)
+    try:
+        _require()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+    if args.command == 'build':
+        count, dict_size = build(args.projects, args.archive, level=args.level)
+        print(f"Archived {count} abstracts into {args.archive} "
+              f"({os.path.getsize(args.archive):,} bytes, dictionary {dict_size:,} bytes)")
+    elif args.command == 'get':
+        with AbstractArchive(args.archive) as archive:
+            for project_id in args.ids:
+                print(f"{project_id}: {archive.get(project_id, '(not in archive)')}")
+    elif args.command == 'strip':
+        count = strip(args.projects, args.output)
+        print(f"Wrote {count} projects without abstracts to {args.output}")
+    elif args.command == 'join':
+        count = join(args.projects, args.output, args.archive)
+        print(f"Wrote {count} projects with abstracts to {args.output}")
+    elif args.command == 'bench':
+        if args.synthetic:
+            from benchmarks import synthetic
+            projects = synthetic.iter_projects(args.synthetic)
+        else:
+            projects = iter_records(args.projects)
+        benchmark(projects)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Search and paging API over projects, winners and students
+- Loads each data file once and keeps inverted and filter indexes in memory
+- Same filters as the webapp: year, category, country, award (has/none)
+- fuzzy=1 corrects misspelled terms with the spelling.py deletion index
+- Responses are cached by normalized query, already encoded
+- asyncio HTTP/1.1 server with keep-alive; --workers N runs one event loop
+  per process on a shared port (SO_REUSEPORT)
+
+Endpoints (GET, JSON):
+    /api/search?q=solar+cell&year=2019&category=...&country=...&award=has&page=1&per_page=20
+    /api/facets?q=...&year=...            counts per year/category/country/award
+    /api/suggest?q=photovoltiac           spelling corrections per term
+    /api/projects/<id>
+    /api/winners?q=...&uni=...&year=...&page=1
+    /api/students?q=...&uni=...&year=...&major=...&page=1
+    /api/stats
+
+Usage:
+    python api.py --port 8001
+    python api.py --port 8001 --workers 4
+    python -m benchmarks.api_load --url http://127.0.0.1:8001
+"""
+
+import argparse
+import asyncio
+import bisect
+import heapq
+import os
+import sys
+import time
+import traceback
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import serialization
+from generate_table_data import iter_formatted_winners
+from records import iter_projects
+from spelling import MIN_TERM_LENGTH, SymSpell, tokenize
+
+PROJECTS_FILE = "data/projects.json"
+WINNERS_FILE = "data/winner_emails.json"
+STUDENTS_FILE = "data/students.json"
+
+CACHE_SIZE = 4096
+PREFIX_CACHE_SIZE = 1024
+PER_PAGE = 20
+MAX_PER_PAGE = 100
+MAX_REQUEST_BYTES = 16 * 1024
+
+# Field weights, as in the webapp's Fuse.js keys
+SEARCH_FIELDS = (('title', 0.4), ('abstract', 0.3), ('category', 0.2), ('awards', 0.1))
+
+FILTERS = ('year', 'category', 'country')
+FACETS = FILTERS + ('award',)
+
+# Parameters each endpoint understands; anything else is dropped before caching
+PARAMS = {
+    'search': {'q', 'fuzzy', 'year', 'category', 'country', 'award', 'page', 'per_page'},
+    'facets': {'q', 'fuzzy', 'year', 'category', 'country', 'award'},
+    'suggest': {'q'},
+    'winners': {'q', 'uni', 'year', 'page', 'per_page'},
+    'students': {'q', 'uni', 'year', 'major', 'page', 'per_page'},
+}
+
+# Searched as substrings, like the tables' search boxes
+WINNER_TEXT_FIELDS = ('first', 'last', 'uni', 'major', 'year', 'email', 'notes', 'project_title')
+STUDENT_TEXT_FIELDS = ('first', 'last', 'uni', 'major', 'year', 'email', 'notes')
+
+class BadRequest(ValueError):
+    pass
+
+class ProjectIndex:
+    """Projects with an inverted index for text search and sets per filter value"""
+
+    def __init__(self, projects):
+        self.projects = list(projects)
+        self.by_id = {}
+        self.postings = defaultdict(dict)        # term -> {position: weight}
+        self.filters = {name: defaultdict(set) for name in FACETS}
+
+        for position, project in enumerate(self.projects):
+            self.by_id[str(project.get('id'))] = position
+            for name in FILTERS:
+                self.filters[name][project.get(name) or ''].add(position)
+            award = 'has' if project.get('awards') else 'none'
+            self.filters['award'][award].add(position)
+
+            for field, weight in SEARCH_FIELDS:
+                value = project.get(field)
+                text = ' '.join(value) if isinstance(value, (list, tuple)) else value
+                for term in set(tokenize(text)):
+                    postings = self.postings[term]
+                    postings[position] = postings.get(position, 0.0) + weight
+
+        # Sorted vocabulary for prefix lookups of the term being typed; short
+        # prefixes cover many words, so their merged postings are cached
+        self.vocabulary = sorted(self.postings)
+        self._prefix_scores = lru_cache(maxsize=PREFIX_CACHE_SIZE)(self._merge_prefix)
+
+        # Deletion index for fuzzy search and suggestions. Built here, not on
+        # the first fuzzy request: at 100k terms it takes seconds, which
+        # would stall the event loop
+        self.speller = SymSpell({term: len(postings) for term, postings in self.postings.items()
+                                 if len(term) >= MIN_TERM_LENGTH and not term.isdigit()})
+
+    def _term_scores(self, term, prefix):
+        if not prefix:
+            return self.postings.get(term, {})
+        start = bisect.bisect_left(self.vocabulary, term)
+        end = bisect.bisect_left(self.vocabulary, term + '\uffff', start)
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        return self._prefix_scores(start, end)
+
+    def _merge_prefix(self, start, end):
+        """Best weight per position over the vocabulary words in [start, end)"""
+        scores = {}
+        for word in self.vocabulary[start:end]:
+            for position, weight in self.postings[word].items():
+                if weight > scores.get(position, 0.0):
+                    scores[position] = weight
+        return scores
+
+    def _corrected_scores(self, term):
+        """Postings of the closest vocabulary terms, discounted by edit distance"""
+        scores = {}
+        for candidate, distance, _ in self.speller.lookup(term):
+            factor = 1 / (1 + distance)
+            for position, weight in self.postings[candidate].items():
+                if weight * factor > scores.get(position, 0.0):
+                    scores[position] = weight * factor
+        return scores
+
+    def correct(self, query):
+        """query with every term that matches nothing replaced by its correction"""
+        terms = tokenize(query)
+        corrected = []
+        for i, term in enumerate(terms):
+            if not self._term_scores(term, prefix=i == len(terms) - 1):
+                term = self.speller.correct(term) or term
+            corrected.append(term)
+        return ' '.join(corrected)
+
+    def match(self, query, fuzzy=False):
+        """
+        {position: score} of projects containing every query term.
+
+        The last term also matches as a prefix, so results follow typing.
+        With fuzzy, a term that matches nothing is replaced by its nearest
+        vocabulary terms. None means no query (every project matches).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+        scores = None
+        for i, term in enumerate(terms):
+            term_scores = self._term_scores(term, prefix=i == len(terms) - 1)
+            if not term_scores and fuzzy:
+                term_scores = self._corrected_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {p: s + term_scores[p] for p, s in scores.items() if p in term_scores}
+            if not scores:
+                break
+        return scores
+
+    def select(self, params):
+        """
+        Positions matching params, unordered.
+
+        Returns:
+            (set of positions or None for all, {position: score} or None without a query)
+        """
+        scores = self.match(params.get('q'), bool(params.get('fuzzy')))
+        selected = None if scores is None else set(scores)
+        for name in FACETS:
+            value = params.get(name)
+            if value:
+                positions = self.filters[name].get(value, set())
+                selected = set(positions) if selected is None else selected & positions
+        return selected, scores
+
+    def ranked(self, selected, scores, limit):
+        """The first `limit` positions of a selection, best score first"""
+        if selected is None:
+            return range(min(limit, len(self.projects)))
+        if scores is None:
+            return heapq.nsmallest(limit, selected)
+        return heapq.nsmallest(limit, selected, key=lambda p: (-scores[p], p))
+
+    def facets(self, selected):
+        """Counts per value of every facet within a selection"""
+        counts = {}
+        for name, index in self.filters.items():
+            if selected is None:
+                values = ((value, len(positions)) for value, positions in index.items())
+            else:
+                values = ((value, len(selected & positions)) for value, positions in index.items())
+            counts[name] = dict(sorted(((v, n) for v, n in values if n), key=lambda item: -item[1]))
+        return counts
+
+class TableIndex:
+    """Rows with exact-match filters and a lowercase haystack for substring search"""
+
+    def __init__(self, rows, text_fields, filters):
+        self.rows = list(rows)
+        self.haystacks = [' '.join(str(row.get(f) or '') for f in text_fields).lower()
+                          for row in self.rows]
+        self.filters = {name: defaultdict(set) for name in filters}
+        for position, row in enumerate(self.rows):
+            for name in filters:
+                self.filters[name][str(row.get(name) or '')].add(position)
+
+    def select(self, params):
+        selected = None
+        for name, index in self.filters.items():
+            value = params.get(name)
+            if value:
+                positions = index.get(value, set())
+                selected = set(positions) if selected is None else selected & positions
+        positions = range(len(self.rows)) if selected is None else sorted(selected)
+        query = params.get('q')
+        if query:
+            positions = [p for p in positions if query in self.haystacks[p]]
+        return positions
+
+def _load_or_empty(load, path):
+    try:
+        return load(path)
+    except FileNotFoundError:
+        print(f"  {path} not found; serving no records from it")
+        return []
+
+def normalize_params(endpoint, pairs):
+    """
+    Canonical, hashable form of a query string for endpoint.
+
+    Unknown parameters and empty values are dropped, text is lowercased
+    with whitespace collapsed, and paging is validated and clamped.
+    """
+    allowed = PARAMS[endpoint]
+    params = {}
+    for name, value in pairs:
+        value = ' '.join(value.split())
+        if name in allowed and value:
+            params[name] = value
+    if 'q' in params:
+        params['q'] = params['q'].lower()
+    if 'fuzzy' in params:
+        if params['fuzzy'] in ('1', 'true'):
+            params['fuzzy'] = '1'
+        else:
+            del params['fuzzy']
+    if 'award' in params and params['award'] not in ('has', 'none'):
+        raise BadRequest("award must be 'has' or 'none'")
+    for name, default, upper in (('page', 1, None), ('per_page', PER_PAGE, MAX_PER_PAGE)):
+        if name not in allowed:
+            continue
+        try:
+            number = int(params.get(name, default))
+        except ValueError:
+            raise BadRequest(f"{name} must be an integer") from None
+        if number < 1:
+            raise BadRequest(f"{name} must be at least 1")
+        params[name] = min(number, upper) if upper else number
+    return tuple(sorted(params.items()))
+
+def _page(total, items, params, render):
+    """Page of items; items holds at least every position up to the page's end"""
+    page, per_page = params['page'], params['per_page']
+    start = (page - 1) * per_page
+    return {
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'results': [render(item) for item in items[start:start + per_page]],
+    }
+
+class SearchAPI:
+    """Loaded stores plus a cache of encoded responses per normalized query"""
+
+    def __init__(self, projects=(), winners=(), students=()):
+        started = time.perf_counter()
+        self.projects = ProjectIndex(projects)
+        self.winners = TableIndex(winners, WINNER_TEXT_FIELDS, ('uni', 'year'))
+        self.students = TableIndex(students, STUDENT_TEXT_FIELDS, ('uni', 'year', 'major'))
+        self.load_seconds = time.perf_counter() - started
+        self.requests = 0
+        self.query = lru_cache(maxsize=CACHE_SIZE)(self._query)
+
+    @classmethod
+    def from_files(cls, projects=PROJECTS_FILE, winners=WINNERS_FILE, students=STUDENTS_FILE):
+        return cls(
+            _load_or_empty(lambda p: list(iter_projects(p)), projects),
+            _load_or_empty(lambda p: list(iter_formatted_winners(p)), winners),
+            _load_or_empty(lambda p: serialization.load(p, 'students'), students),
+        )
+
+    def _project_result(self, position, scores=None):
+        data = self.projects.projects[position].to_dict()
+        if scores is not None:
+            data['score'] = round(scores.get(position, 0.0), 4)
+        return data
+
+    def _query(self, endpoint, params):
+        """Encoded JSON body for one normalized (endpoint, params) query"""
+        params = dict(params)
+        if endpoint == 'search':
+            selected, scores = self.projects.select(params)
+            total = len(self.projects.projects) if selected is None else len(selected)
+            # Only the positions up to this page's end need ordering
+            top = self.projects.ranked(selected, scores, params['page'] * params['per_page'])
+            body = _page(total, top, params, lambda p: self._project_result(p, scores))
+            if params.get('fuzzy') and params.get('q'):
+                body['corrected'] = self.projects.correct(params['q'])
+        elif endpoint == 'suggest':
+            terms = tokenize(params.get('q'))
+            body = {
+                'corrected': self.projects.correct(params.get('q')),
+                'terms': {
+                    term: [{'term': t, 'distance': d, 'count': c}
+                           for t, d, c in self.projects.speller.lookup(term)]
+                    for term in terms
+                },
+            }
+        elif endpoint == 'facets':
+            selected, _ = self.projects.select(params)
+            total = len(self.projects.projects) if selected is None else len(selected)
+            body = {'total': total, 'facets': self.projects.facets(selected)}
+        elif endpoint in ('winners', 'students'):
+            table = getattr(self, endpoint)
+            positions = table.select(params)
+            body = _page(len(positions), positions, params, lambda p: table.rows[p])
+        else:
+            raise KeyError(endpoint)
+        return serialization.dumps(body, pretty=False)
+
+    def handle(self, target):
+        """
+        (status, body bytes) for a request target like '/api/search?q=x'.
+        """
+        self.requests += 1
+        url = urlsplit(target)
+        path = url.path.rstrip('/')
+        try:
+            if path.startswith('/api/projects/'):
+                position = self.projects.by_id.get(unquote(path[len('/api/projects/'):]))
+                if position is None:
+                    return 404, _error("project not found")
+                return 200, serialization.dumps(self._project_result(position), pretty=False)
+            if path == '/api/stats':
+                return 200, serialization.dumps(self.stats(), pretty=False)
+            endpoint = path[len('/api/'):] if path.startswith('/api/') else ''
+            if endpoint not in PARAMS:
+                return 404, _error("unknown endpoint")
+            params = normalize_params(endpoint, parse_qsl(url.query))
+            return 200, self.query(endpoint, params)
+        except BadRequest as e:
+            return 400, _error(str(e))
+
+    def stats(self):
+        info = self.query.cache_info()
+        return {
+            'projects': len(self.projects.projects),
+            'winners': len(self.winners.rows),
+            'students': len(self.students.rows),
+            'terms': len(self.projects.vocabulary),
+            'load_seconds': round(self.load_seconds, 3),
+            'requests': self.requests,
+            'cache': {'hits': info.hits, 'misses': info.misses, 'size': info.currsize},
+            'pid': os.getpid(),
+        }
+
+def _error(message):
+    return serialization.dumps({'error': message}, pretty=False)
+
+_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+def _response(status, body, keep_alive):
+    head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Cache-Control: {'no-store' if status >= 500 else 'public, max-age=60'}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+async def handle_connection(api, reader, writer):
+    """Serve requests on one connection until the client closes it"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(_response(413, _error("request too large"), False))
+                break
+
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                writer.write(_response(400, _error("malformed request line"), False))
+                break
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+            if method == 'OPTIONS':
+                writer.write(_response(204, b'', keep_alive))
+            elif method not in ('GET', 'HEAD'):
+                writer.write(_response(405, _error("only GET is supported"), keep_alive))
+            else:
+                try:
+                    status, body = api.handle(target)
+                except Exception:
+                    # A bug in one handler must not drop the connection without a reply
+                    print(f"Error handling {method} {target}:", file=sys.stderr)
+                    traceback.print_exc()
+                    status, body = 500, _error("internal server error")
+                response = _response(status, body, keep_alive)
+                writer.write(response[:len(response) - len(body)] if method == 'HEAD' else response)
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(api, host='127.0.0.1', port=8001, reuse_port=False):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(api, r, w), host, port,
+        limit=MAX_REQUEST_BYTES, reuse_port=reuse_port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+def _run_worker(args):
+    api = SearchAPI.from_files(args.projects, args.winners, args.students)
+    try:
+        asyncio.run(serve(api, args.host, args.port, reuse_port=args.workers > 1))
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and paging API over the data files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes sharing the port, one event loop each (default: 1)")
+    parser.add_argument('--projects', default=PROJECTS_FILE)
+    parser.add_argument('--winners', default=WINNERS_FILE)
+    parser.add_argument('--students', default=STUDENTS_FILE)
+    args = parser.parse_args(argv)
+
+    print(f"Serving the API on http://{args.host}:{args.port}/api/ ({args.workers} worker(s))")
+    if args.workers == 1:
+        _run_worker(args)
+        return
+
+    import multiprocessing
+    workers = [multiprocessing.Process(target=_run_worker, args=(args,)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+if __name__ == '__main__':
+    main()
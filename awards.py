@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Structured award parsing and an award index for winner queries
+- Splits award strings that list several awards back to back
+  ("Fourth Award of $500 American Statistical Association: Certificate ...")
+- Parses each award into sponsor, kind (ISEF grand award or sponsored
+  special award), tier, dollar amount, scholarship flag and university
+- Builds an inverted index from kind/tier/sponsor/year/category to awards
+  plus an amount-sorted list, so queries never re-scan or regex the projects
+
+Usage:
+    python awards.py build                       # data/projects.json -> data/awards.json
+    python awards.py query --kind grand --min-amount 5000 --category Physics --since 2018
+    python awards.py query --sponsor nasa --tier second
+    python awards.py parse "Third Award of \\$1,000 ADA Foundation: Third Award of \\$500"
+"""
+
+import argparse
+import bisect
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import serialization
+from jsonstream import iter_records
+from universities import resolve_award
+
+PROJECTS_FILE = "data/projects.json"
+AWARDS_FILE = "data/awards.json"
+
+# Checked in order; the first match is the tier
+TIERS = [
+    ('top', re.compile(r"Gordon E\. Moore|Young Scientist Award|Top Award|Grand Prize", re.I)),
+    ('best_of_category', re.compile(r"Best of Category", re.I)),
+    ('honorable_mention', re.compile(r"Honorable Mention", re.I)),
+    ('first', re.compile(r"\bFirst\b|\b1st\b", re.I)),
+    ('second', re.compile(r"\bSecond\b|\b2nd\b", re.I)),
+    ('third', re.compile(r"\bThird\b|\b3rd\b", re.I)),
+    ('fourth', re.compile(r"\bFourth\b|\b4th\b", re.I)),
+]
+
+INDEXED_FIELDS = ('kind', 'tier', 'sponsor', 'year', 'category', 'scholarship')
+
+_AMOUNT_RE = re.compile(r"\$\s?(\d[\d,]*)")
+_SCHOLARSHIP_RE = re.compile(r"scholarship|tuition", re.I)
+
+# Where an award's description can end and the next sponsor's name begin:
+# a dollar amount (with "in each ... Category"), a closing keyword, or a
+# sentence end (not an abbreviation like "U.S.")
+_AWARD_END_RE = re.compile(
+    r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s+in each [\w ]*?Category)?"
+    r"|\b(?:Award|Mention|Scholarship|Prize|trip)\b"
+    r"|(?<=[a-z]{2})\.(?=\s)")
+
+class Award(NamedTuple):
+    """One parsed award"""
+    text: str                 # the award itself, without its sponsor
+    sponsor: str              # '' for ISEF grand awards
+    kind: str                 # 'grand' or 'special'
+    tier: str                 # see TIERS, or ''
+    amount: Optional[int]     # largest dollar amount mentioned
+    scholarship: bool
+    uni: str                  # institution behind a university award, or ''
+
+def _clean(text):
+    text = text.replace('&amp;', '&').replace('&amp', '&')
+    return ' '.join(text.split()).strip(' ,;')
+
+def _make_award(sponsor, text):
+    sponsor, text = _clean(sponsor), _clean(text)
+    tier = next((name for name, pattern in TIERS if pattern.search(text)), '')
+    amounts = [int(a.replace(',', '')) for a in _AMOUNT_RE.findall(text)]
+    uni = resolve_award(f"{sponsor}: {text}" if sponsor else text)
+    return Award(text, sponsor, 'special' if sponsor else 'grand', tier,
+                 max(amounts) if amounts else None, bool(_SCHOLARSHIP_RE.search(text)), uni)
+
+def _split_sponsor(segment):
+    """(end of the previous award's text, sponsor) for the text before a colon"""
+    last_end = 0
+    for match in _AWARD_END_RE.finditer(segment):
+        last_end = match.end()
+    return segment[:last_end], segment[last_end:]
+
+@lru_cache(maxsize=None)
+def parse_award(raw):
+    """
+    Parse one scraped award string, which may hold several awards.
+
+    Returns:
+        Tuple of Award, in order
+    """
+    if not raw or not raw.strip():
+        return ()
+    segments = raw.split(':')
+    awards = []
+    # segments[0] is "[grand award] sponsor"; each later one is
+    # "award text [next sponsor]", except the last, which is only text
+    previous_text, sponsor = _split_sponsor(segments[0]) if len(segments) > 1 else (segments[0], '')
+    if _clean(previous_text):
+        awards.append(_make_award('', previous_text))
+    for i, segment in enumerate(segments[1:], start=1):
+        if i < len(segments) - 1:
+            text, next_sponsor = _split_sponsor(segment)
+        else:
+            text, next_sponsor = segment, ''
+        if _clean(text):
+            awards.append(_make_award(sponsor, text))
+        sponsor = next_sponsor
+    return tuple(awards)
+
+def parse_awards(awards):
+    """Every Award in a project's awards list"""
+    return [award for raw in awards or () for award in parse_award(raw)]
+
+def _record(project, award):
+    return {
+        'project_id': project.get('id'),
+        'year': project.get('year') or '',
+        'category': project.get('primary_category') or project.get('category') or '',
+        **award._asdict(),
+    }
+
+class AwardIndex:
+    """
+    Parsed awards with postings per field value and an amount-sorted list.
+
+    Args:
+        records: Award records as produced by from_projects / saved by save()
+    """
+
+    def __init__(self, records):
+        self.records = list(records)
+        self.postings = {field: defaultdict(set) for field in INDEXED_FIELDS}
+        by_amount = []
+        for position, record in enumerate(self.records):
+            for field in INDEXED_FIELDS:
+                self.postings[field][self._key(field, record[field])].add(position)
+            if record['amount'] is not None:
+                by_amount.append((record['amount'], position))
+        by_amount.sort()
+        self.amounts = [amount for amount, _ in by_amount]
+        self.amount_positions = [position for _, position in by_amount]
+
+    @staticmethod
+    def _key(field, value):
+        if field == 'sponsor':
+            return value.lower()
+        return value
+
+    @classmethod
+    def from_projects(cls, projects):
+        return cls(_record(project, award)
+                   for project in projects
+                   for award in parse_awards(project.get('awards')))
+
+    @classmethod
+    def load(cls, path=AWARDS_FILE):
+        return cls(serialization.load(path)['awards'])
+
+    def save(self, path=AWARDS_FILE):
+        serialization.save(path, {
+            'awards': self.records,
+            'summary': {
+                field: dict(Counter({value: len(positions) for value, positions in index.items()})
+                            .most_common(50))
+                for field, index in self.postings.items() if field != 'scholarship'
+            },
+        })
+
+    def _amount_range(self, low=None, high=None):
+        start = 0 if low is None else bisect.bisect_left(self.amounts, low)
+        end = len(self.amounts) if high is None else bisect.bisect_right(self.amounts, high)
+        return set(self.amount_positions[start:end])
+
+    def query(self, kind=None, tier=None, sponsor=None, category=None, scholarship=None,
+              since=None, until=None, min_amount=None, max_amount=None):
+        """
+        Awards matching every given condition, newest year first.
+
+        sponsor matches a substring of the sponsor name (case-insensitive);
+        since/until and min_amount/max_amount are inclusive.
+        """
+        selected = None
+
+        def narrow(positions):
+            nonlocal selected
+            selected = set(positions) if selected is None else selected & positions
+
+        for field, value in (('kind', kind), ('tier', tier), ('category', category)):
+            if value is not None:
+                narrow(self.postings[field].get(value, set()))
+        if scholarship is not None:
+            narrow(self.postings['scholarship'].get(scholarship, set()))
+        if sponsor:
+            needle = sponsor.lower()
+            narrow(set().union(*(positions for name, positions in self.postings['sponsor'].items()
+                                 if needle in name)))
+        if since is not None or until is not None:
+            narrow(set().union(*(positions for year, positions in self.postings['year'].items()
+                                 if year.isdigit()
+                                 and (since is None or int(year) >= since)
+                                 and (until is None or int(year) <= until))))
+        if min_amount is not None or max_amount is not None:
+            narrow(self._amount_range(min_amount, max_amount))
+
+        positions = range(len(self.records)) if selected is None else selected
+        results = [self.records[p] for p in positions]
+        results.sort(key=lambda r: (r['year'], r['amount'] or 0), reverse=True)
+        return results
+
+def build(projects_path=PROJECTS_FILE, awards_path=AWARDS_FILE):
+    """Parse every project's awards in one streaming pass and save the index"""
+    index = AwardIndex.from_projects(iter_records(projects_path))
+    index.save(awards_path)
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse awards and query the award index")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Parse all awards and write the index")
+    build_cmd.add_argument('--projects', default=PROJECTS_FILE)
+    build_cmd.add_argument('--output', default=AWARDS_FILE)
+
+    query = sub.add_parser('query', help="Query the award index")
+    query.add_argument('--index', default=AWARDS_FILE)
+    query.add_argument('--kind', choices=['grand', 'special'])
+    query.add_argument('--tier', choices=[name for name, _ in TIERS])
+    query.add_argument('--sponsor', help="Substring of the sponsor name")
+    query.add_argument('--category', help="Primary (or scraped) category, exactly")
+    query.add_argument('--scholarship', action='store_true', default=None)
+    query.add_argument('--since', type=int, help="First year, inclusive")
+    query.add_argument('--until', type=int, help="Last year, inclusive")
+    query.add_argument('--min-amount', type=int, help="In dollars, inclusive")
+    query.add_argument('--max-amount', type=int, help="In dollars, inclusive")
+    query.add_argument('--limit', type=int, default=20)
+
+    parse = sub.add_parser('parse', help="Show how award strings are parsed")
+    parse.add_argument('awards', nargs='+')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        index = build(args.projects, args.output)
+        grand = len(index.postings['kind'].get('grand', ()))
+        print(f"Parsed {len(index.records)} awards ({grand} grand, "
+              f"{len(index.records) - grand} special) into {args.output}")
+    elif args.command == 'query':
+        index = AwardIndex.load(args.index)
+        results = index.query(args.kind, args.tier, args.sponsor, args.category, args.scholarship,
+                              args.since, args.until, args.min_amount, args.max_amount)
+        print(f"{len(results)} awards")
+        for r in results[:args.limit]:
+            amount = f"${r['amount']:,}" if r['amount'] is not None else '-'
+            print(f"  {r['year']} {r['project_id']:>6} {amount:>9}  {r['sponsor'] or 'ISEF'}: {r['text'][:60]}")
+    elif args.command == 'parse':
+        for raw in args.awards:
+            print(repr(raw))
+            for award in parse_award(raw):
+                print(f"  {award.kind:<7} tier={award.tier or '-':<17} amount={award.amount} "
+                      f"scholarship={award.scholarship} uni={award.uni!r}")
+                print(f"          sponsor={award.sponsor!r} text={award.text!r}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the curiousmails pipeline (see benchmarks/run.py)
+"""
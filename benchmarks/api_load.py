@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Load test for api.py: requests per second and latency percentiles
+
+Usage:
+    python -m benchmarks.api_load                            # starts api.py on 16k synthetic projects
+    python -m benchmarks.api_load --size 100000 --workers 4 --connections 128
+    python -m benchmarks.api_load --url http://127.0.0.1:8001 --duration 30
+
+Each connection is a keep-alive client that sends the next request as soon as
+the previous response arrives, drawing URLs from a mix of searches, facets,
+detail pages and table pages. --distinct controls how many different
+queries the mix holds, so the share served from the response cache can be
+varied.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote_plus, urlsplit
+
+from jsonstream import write_json_array
+from benchmarks import synthetic
+
+def make_targets(distinct, seed=0):
+    """Request targets in the proportions the webapp would send them"""
+    rng = random.Random(seed)
+    words = synthetic.TOPICAL
+    years = synthetic.YEARS
+    categories = [name for _, name in synthetic.BOOTHS]
+    targets = []
+    for i in range(distinct):
+        kind = rng.random()
+        if kind < 0.5:
+            query = ' '.join(rng.sample(words, rng.randint(1, 2)))
+            if rng.random() < 0.3:
+                # Prefix of the term being typed
+                query = query[:max(3, len(query) - rng.randint(1, 3))]
+            target = f"/api/search?q={quote_plus(query)}&page={rng.randint(1, 3)}"
+            if rng.random() < 0.5:
+                target += f"&year={rng.choice(years)}"
+            if rng.random() < 0.3:
+                target += f"&category={quote_plus(rng.choice(categories))}"
+            if rng.random() < 0.2:
+                target += "&award=has"
+        elif kind < 0.65:
+            target = f"/api/facets?q={quote_plus(rng.choice(words))}"
+        elif kind < 0.8:
+            target = f"/api/projects/{rng.randint(1, 1000)}"
+        elif kind < 0.9:
+            target = f"/api/students?q={quote_plus(rng.choice(['an', 'li', 'yale', 'econ']))}&page={rng.randint(1, 5)}"
+        else:
+            target = f"/api/search?year={rng.choice(years)}&page={rng.randint(1, 20)}"
+        targets.append(target)
+    return targets
+
+async def _client(host, port, targets, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            target = rng.choice(targets)
+            start = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b'HTTP/1.1 200'):
+                errors.append(head.split(b'\r\n', 1)[0].decode('latin-1'))
+    finally:
+        writer.close()
+
+async def run_load(host, port, targets, connections, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, targets, deadline, latencies, errors, i)
+                           for i in range(connections)))
+    return latencies, errors, time.perf_counter() - started
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_for(host, port, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"api.py did not start listening on {host}:{port}")
+
+def start_server(size, workers, tmpdir, seed=0):
+    """Start api.py over size synthetic projects; returns (process, host, port)"""
+    projects = os.path.join(tmpdir, 'projects.json')
+    students = os.path.join(tmpdir, 'students.json')
+    write_json_array(projects, synthetic.iter_projects(size, seed))
+    write_json_array(students, synthetic.make_students(max(size // 2, 100), seed))
+    port = _free_port()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(root, 'api.py'), '--port', str(port),
+         '--workers', str(workers), '--projects', projects, '--students', students],
+        stdout=subprocess.DEVNULL, cwd=root)
+    _wait_for('127.0.0.1', port)
+    return proc, '127.0.0.1', port
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the search API")
+    parser.add_argument('--url', help="Running API to test (default: start one on synthetic data)")
+    parser.add_argument('--size', type=int, default=16000, help="Synthetic projects when starting the API")
+    parser.add_argument('--workers', type=int, default=1, help="api.py workers when starting the API")
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument('--distinct', type=int, default=2000, help="Distinct queries in the mix")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    targets = make_targets(args.distinct)
+    with tempfile.TemporaryDirectory(prefix='curiousmails-api-') as tmpdir:
+        proc = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            print(f"Starting api.py on {args.size} synthetic projects ({args.workers} worker(s))...")
+            proc, host, port = start_server(args.size, args.workers, tmpdir)
+            # The loader waits for every worker to bind; let their indexes finish
+            time.sleep(1)
+        try:
+            print(f"{args.connections} connections for {args.duration:.0f}s, {len(targets)} distinct queries")
+            latencies, errors, elapsed = asyncio.run(
+                run_load(host, port, targets, args.connections, args.duration))
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait()
+
+    qps = len(latencies) / elapsed
+    result = {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'qps': qps,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies, default=0) * 1000,
+    }
+    print(f"  {result['requests']} requests, {result['errors']} errors")
+    print(f"  {qps:,.0f} requests/s, p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+          f"max {result['max_ms']:.1f} ms")
+
+    if args.output:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'connections': args.connections,
+            'duration': args.duration,
+            'distinct': args.distinct,
+            'size': None if args.url else args.size,
+            'workers': None if args.url else args.workers,
+            **result,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
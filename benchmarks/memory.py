@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Peak memory of the projects pipeline, loading vs streaming
+
+Usage:
+    python -m benchmarks.memory                    # 1M synthetic projects
+    python -m benchmarks.memory --size 100000 --output memory.json
+
+Each stage runs in a fresh interpreter so its peak RSS isn't masked by an
+earlier stage. The "load" variants use json.load/json.dump like the scripts
+used to; the "stream" variants use jsonstream and the generator stages.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from jsonstream import write_json_array
+from benchmarks import synthetic
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def stage_load_categorize(path, out):
+    from categorizer import get_primary_category, find_cross_listings
+    with open(path, 'r') as f:
+        projects = json.load(f)
+    for project in projects:
+        primary = get_primary_category(project)
+        project['primary_category'] = primary
+        project['categories'] = [primary] + sorted(find_cross_listings(project, primary))
+    with open(out, 'w') as f:
+        json.dump(projects, f, indent=2)
+    return len(projects)
+
+def stage_stream_categorize(path, out):
+    from categorizer import categorize
+    from jsonstream import iter_records
+    return write_json_array(out, categorize(iter_records(path)))
+
+def stage_load_winners(path, out):
+    with open(path, 'r') as f:
+        projects = json.load(f)
+    winners = [p for p in projects if p.get('awards') and len(p.get('awards', [])) > 0]
+    return len(winners)
+
+def stage_stream_winners(path, out):
+    from email_scraper import iter_award_winners
+    from jsonstream import iter_records
+    return sum(1 for _ in iter_award_winners(iter_records(path)))
+
+def stage_load_ids(path, out):
+    with open(path, 'r') as f:
+        projects = json.load(f)
+    return len({p['id'] for p in projects})
+
+def stage_stream_ids(path, out):
+    from jsonstream import iter_records
+    return len({p['id'] for p in iter_records(path)})
+
+def stage_load_records(path, out):
+    from records import load_projects
+    return len(load_projects(path))
+
+STAGES = {
+    'load_categorize': stage_load_categorize,
+    'stream_categorize': stage_stream_categorize,
+    'load_winners': stage_load_winners,
+    'stream_winners': stage_stream_winners,
+    'load_ids': stage_load_ids,
+    'stream_ids': stage_stream_ids,
+    'load_records': stage_load_records,
+}
+
+def run_stage(name, path, out):
+    """Run one stage in this process and return its result dict"""
+    start = time.perf_counter()
+    records = STAGES[name](path, out)
+    return {
+        'records': records,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_in_subprocess(name, path, out):
+    """Run one stage in a fresh interpreter; None if its imports are missing"""
+    proc = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.memory', '--stage', name, '--input', path, '--out', out],
+        capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+        print(f"  {name:<20} skipped ({error})")
+        return None
+    return json.loads(proc.stdout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS of each pipeline stage, loading vs streaming")
+    parser.add_argument('--size', type=int, default=1000000,
+                        help="Synthetic projects in the corpus (default: 1000000)")
+    parser.add_argument('--only', action='append', choices=sorted(STAGES),
+                        help="Run only this stage; repeatable")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--stage', choices=sorted(STAGES), help=argparse.SUPPRESS)
+    parser.add_argument('--input', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    opts = parser.parse_args(argv)
+
+    if opts.stage:
+        # Child process: run one stage and report on stdout
+        print(json.dumps(run_stage(opts.stage, opts.input, opts.out)))
+        return
+
+    names = opts.only or list(STAGES)
+    with tempfile.TemporaryDirectory(prefix='curiousmails-mem-') as tmpdir:
+        path = os.path.join(tmpdir, 'projects.json')
+        print(f"Writing {opts.size} synthetic projects...")
+        write_json_array(path, synthetic.iter_projects(opts.size, opts.seed))
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Corpus: {size_mb:.0f} MB\n")
+
+        print(f"  {'stage':<20} {'records':>9} {'seconds':>9} {'peak RSS MB':>12}")
+        results = {}
+        for name in names:
+            result = run_in_subprocess(name, path, os.path.join(tmpdir, 'out.json'))
+            if result is None:
+                continue
+            results[name] = result
+            print(f"  {name:<20} {result['records']:>9} {result['seconds']:>9.1f} "
+                  f"{result['peak_rss_mb']:>12.0f}")
+
+    if opts.output:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'size': opts.size,
+            'corpus_mb': size_mb,
+            'results': results,
+        }
+        with open(opts.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {opts.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite for the pipeline stages
+
+Usage:
+    python -m benchmarks.run                          # 10k records
+    python -m benchmarks.run --size 100000 --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 0.25
+
+Each benchmark runs over a synthetic corpus scaled from the real schemas,
+including the abstract pages timed by the project-page parser. No real
+pages ship with the repo; to time the parser on them, save some
+FullAbstract pages as benchmarks/fixtures/<project id>.html (the directory
+is not created for you) and they are used instead.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# HTML parsing is orders of magnitude slower per record than the other
+# stages, so those benchmarks are capped at this many pages by default
+HTML_LIMIT = 2000
+
+def _project_pages(size, limit):
+    """Pages saved in benchmarks/fixtures/ if any, otherwise synthetic ones"""
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, 'r') as f:
+                pages.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+        # Cycle through the fixtures to reach the requested count
+        n = min(size, limit)
+        return [pages[i % len(pages)] for i in range(n)]
+    return [(p['id'], synthetic.project_html(p)) for p in synthetic.make_projects(min(size, limit))]
+
+def bench_parse_project(size, opts):
+    from scraper import parse_project
+    pages = _project_pages(size, opts.html_limit)
+
+    def run():
+        for project_id, html in pages:
+            parse_project(project_id, html)
+    return run, len(pages)
+
+def bench_primary_category(size, opts):
+    from categorizer import get_primary_category
+    projects = synthetic.make_projects(size, opts.seed)
+
+    def run():
+        for project in projects:
+            get_primary_category(project)
+    return run, len(projects)
+
+def bench_cross_listings(size, opts):
+    from categorizer import get_primary_category, find_cross_listings
+    projects = synthetic.make_projects(size, opts.seed)
+    primaries = [get_primary_category(p) for p in projects]
+
+    def run():
+        for project, primary in zip(projects, primaries):
+            find_cross_listings(project, primary)
+    return run, len(projects)
+
+def bench_extract_major(size, opts):
+    from enhance_students_data import extract_major_from_notes
+    notes = [s['notes'] for s in synthetic.make_students(size, opts.seed)]
+
+    def run():
+        for note in notes:
+            extract_major_from_notes(note)
+    return run, len(notes)
+
+def bench_extract_university(size, opts):
+    from universities import resolve_award
+    awards = [w['awards'] for w in synthetic.make_winners(size, opts.seed).values()]
+    # The synthetic awards repeat a few templates, so even a cache cleared per
+    # run would answer almost every call; time the parser itself instead
+    parse = resolve_award.__wrapped__
+
+    def run():
+        # extract_university() without the memo
+        for award_list in awards:
+            for award in award_list:
+                if parse(award):
+                    break
+    return run, len(awards)
+
+def bench_parse_student_html(size, opts):
+    from parse_student_html import parse_student_from_html
+    cards = [synthetic.student_html(s)
+             for s in synthetic.make_students(min(size, opts.html_limit), opts.seed)]
+
+    def run():
+        for card in cards:
+            parse_student_from_html(card)
+    return run, len(cards)
+
+def _json_file(opts, name, data):
+    path = os.path.join(opts.tmpdir, name)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+def bench_json_load_projects(size, opts):
+    path = _json_file(opts, 'projects.json', synthetic.make_projects(size, opts.seed))
+
+    def run():
+        with open(path, 'r') as f:
+            json.load(f)
+    return run, size
+
+def bench_json_save_projects(size, opts):
+    projects = synthetic.make_projects(size, opts.seed)
+    path = os.path.join(opts.tmpdir, 'projects_out.json')
+
+    def run():
+        # The stdlib call the scripts used before serialization.py
+        with open(path, 'w') as f:
+            json.dump(projects, f, indent=2)
+    return run, size
+
+def bench_json_load_winners(size, opts):
+    path = _json_file(opts, 'winner_emails.json', synthetic.make_winners(size, opts.seed))
+
+    def run():
+        with open(path, 'r') as f:
+            json.load(f)
+    return run, size
+
+def bench_json_load_students(size, opts):
+    path = _json_file(opts, 'students.json', synthetic.make_students(size, opts.seed))
+
+    def run():
+        with open(path, 'r') as f:
+            json.load(f)
+    return run, size
+
+def bench_fast_load_projects(size, opts):
+    import serialization
+    path = _json_file(opts, 'projects.json', synthetic.make_projects(size, opts.seed))
+
+    def run():
+        serialization.load(path, 'projects')
+    return run, size
+
+def bench_fast_save_projects(size, opts):
+    import serialization
+    projects = synthetic.make_projects(size, opts.seed)
+    path = os.path.join(opts.tmpdir, 'projects_out.json')
+
+    def run():
+        serialization.save(path, projects, pretty=False)
+    return run, size
+
+BENCHMARKS = {
+    'parse_project': bench_parse_project,
+    'primary_category': bench_primary_category,
+    'cross_listings': bench_cross_listings,
+    'extract_major': bench_extract_major,
+    'extract_university': bench_extract_university,
+    'parse_student_html': bench_parse_student_html,
+    'json_load_projects': bench_json_load_projects,
+    'json_save_projects': bench_json_save_projects,
+    'json_load_winners': bench_json_load_winners,
+    'json_load_students': bench_json_load_students,
+    'fast_load_projects': bench_fast_load_projects,
+    'fast_save_projects': bench_fast_save_projects,
+}
+
+def time_best(func, repeat):
+    """Best wall-clock time of repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmarks(names, size, opts):
+    """Run the named benchmarks and return {name: result}"""
+    results = {}
+    for name in names:
+        try:
+            func, records = BENCHMARKS[name](size, opts)
+        except ImportError as e:
+            print(f"  {name:<22} skipped ({e})")
+            continue
+
+        seconds = time_best(func, opts.repeat)
+        results[name] = {
+            'records': records,
+            'seconds': seconds,
+            'per_record_us': seconds / records * 1e6 if records else 0.0,
+        }
+        print(f"  {name:<22} {records:>9} records  {seconds * 1000:10.2f} ms  "
+              f"{results[name]['per_record_us']:10.2f} us/record")
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Compare per-record times against a baseline run.
+
+    Returns:
+        List of benchmark names that regressed by more than threshold
+    """
+    regressions = []
+    print(f"\nComparison with baseline (threshold +{threshold:.0%}):")
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base.get('per_record_us'):
+            print(f"  {name:<22} no baseline")
+            continue
+        ratio = result['per_record_us'] / base['per_record_us']
+        status = 'ok'
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        print(f"  {name:<22} {ratio:6.2f}x  {status}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data")
+    parser.add_argument('--size', type=int, default=10000,
+                        help="Records per synthetic corpus (10k-1M; default: 10000)")
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help="Run only this benchmark; repeatable")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark; the best is kept")
+    parser.add_argument('--html-limit', type=int, default=HTML_LIMIT,
+                        help=f"Cap on pages for the HTML parser benchmarks (default: {HTML_LIMIT})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Results JSON from an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed per-record slowdown vs the baseline before failing (default: 0.25)")
+    opts = parser.parse_args(argv)
+
+    names = opts.only or list(BENCHMARKS)
+    print(f"Running {len(names)} benchmarks at {opts.size} records (best of {opts.repeat})")
+
+    with tempfile.TemporaryDirectory(prefix='curiousmails-bench-') as tmpdir:
+        opts.tmpdir = tmpdir
+        results = run_benchmarks(names, opts.size, opts)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'size': opts.size,
+        'repeat': opts.repeat,
+        'results': results,
+    }
+
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {opts.output}")
+
+    if opts.baseline:
+        with open(opts.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, opts.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
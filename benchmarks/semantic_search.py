@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Latency and recall@10 of semantic.py's int8 brute-force and IVF search
+
+Usage:
+    python -m benchmarks.semantic_search                     # 16k synthetic projects
+    python -m benchmarks.semantic_search --size 1000000 --output semantic.json
+    python -m benchmarks.semantic_search --projects data/projects.json
+
+The synthetic corpus is generated as term counts directly, because the
+text generator in benchmarks/synthetic.py only has a few dozen distinct
+words. Each document mixes two of TOPICS topics (a few dozen terms each)
+with Zipf-distributed background terms, which gives the clustered
+structure real abstracts have. Queries are extra documents that are not
+indexed. Ground truth is exact cosine similarity on the float32 vectors,
+so recall includes the loss from int8 quantization.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+import semantic
+from jsonstream import iter_records
+
+VOCABULARY = 30000
+TOPICS = 400
+TOPIC_TERMS = 60
+TOKENS = 60
+CHUNK = 100000
+
+def topic_counts(n, seed=0):
+    """documents x VOCABULARY CSR term counts with topical structure"""
+    rng = np.random.default_rng(seed)
+    topic_terms = rng.integers(0, VOCABULARY, size=(TOPICS, TOPIC_TERMS))
+    zipf = 1 / np.arange(1, VOCABULARY + 1)
+    zipf /= zipf.sum()
+    chunks = []
+    for start in range(0, n, CHUNK):
+        rows = min(CHUNK, n - start)
+        topics = rng.integers(0, TOPICS, size=(rows, 2))
+        source = rng.random((rows, TOKENS))
+        picks = rng.integers(0, TOPIC_TERMS, size=(rows, TOKENS))
+        terms = np.where(source < 0.45, topic_terms[topics[:, :1], picks],
+                         topic_terms[topics[:, 1:], picks])
+        background = source >= 0.7
+        terms[background] = rng.choice(VOCABULARY, size=int(background.sum()), p=zipf)
+        matrix = sparse.csr_matrix(
+            (np.ones(rows * TOKENS, dtype=np.float32),
+             (np.repeat(np.arange(rows), TOKENS), terms.ravel())),
+            shape=(rows, VOCABULARY))
+        matrix.sum_duplicates()
+        chunks.append(matrix)
+    return sparse.vstack(chunks).tocsr()
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def measure(search, queries, truth, k):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(found[:k]) & expected)
+    return {
+        'recall': hits / (k * len(queries)),
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+def run(size, queries, dimensions, lists, nprobes, k, projects=None, seed=0):
+    started = time.perf_counter()
+    if projects:
+        ids, terms, counts = semantic.count_matrix(iter_records(projects))
+        terms, counts = semantic.prune_terms(terms, counts)
+        rng = np.random.default_rng(seed)
+        query_rows = rng.choice(counts.shape[0], min(queries, counts.shape[0]), replace=False)
+        query_counts = counts[query_rows]
+    else:
+        counts = topic_counts(size + queries, seed)
+        terms = [f"t{i}" for i in range(VOCABULARY)]
+        counts, query_counts = counts[:size], counts[size:]
+        ids = list(range(1, size + 1))
+    matrix, idf = semantic.tfidf(counts)
+    query_matrix, _ = semantic.tfidf(query_counts, idf)
+    generated = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dimensions = min(dimensions, len(terms) - 1, matrix.shape[0] - 1)
+    sample = matrix
+    if matrix.shape[0] > semantic.FIT_SAMPLE:
+        rng = np.random.default_rng(seed)
+        sample = matrix[np.sort(rng.choice(matrix.shape[0], semantic.FIT_SAMPLE, replace=False))]
+    components = semantic.randomized_svd(sample, dimensions, seed=seed)
+    vectors = semantic.embed(matrix, components)
+    query_vectors = semantic.embed(query_matrix, components)
+    fitted = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory(prefix='curiousmails-semantic-') as directory:
+        started = time.perf_counter()
+        semantic.save_index(directory, ids, vectors, components, terms, idf, lists, seed)
+        indexed = time.perf_counter() - started
+        index = semantic.SemanticIndex(directory)
+        id_array = np.asarray(ids)
+
+        def exact(vector):
+            return id_array[semantic.top_k(vectors @ vector, k)].tolist()
+
+        truth = [set(exact(q)) for q in query_vectors]
+        report = {
+            'size': matrix.shape[0],
+            'queries': len(query_vectors),
+            'dimensions': dimensions,
+            'lists': len(index.centroids),
+            'generate_s': generated,
+            'fit_s': fitted,
+            'index_s': indexed,
+            'float32_mb': vectors.nbytes / 1e6,
+            'int8_mb': index.embeddings.nbytes / 1e6,
+            'results': {'exact float32': measure(exact, query_vectors, truth, k)},
+        }
+        del vectors
+        for nprobe in [0] + nprobes:
+            name = 'int8 brute force' if nprobe == 0 else f"ivf nprobe={nprobe}"
+            search = lambda q, nprobe=nprobe: [i for i, _ in index.search_vector(q, k, nprobe)]
+            report['results'][name] = measure(search, query_vectors, truth, k)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LSA semantic search")
+    parser.add_argument('--size', type=int, default=16000, help="Synthetic projects")
+    parser.add_argument('--projects', help="Use a projects file instead of synthetic counts")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dimensions', type=int, default=semantic.DIMENSIONS)
+    parser.add_argument('--lists', type=int, help="IVF lists (default: about sqrt of the size)")
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.queries, args.dimensions, args.lists, args.nprobe, args.k, args.projects)
+    print(f"{report['size']:,} projects, {report['dimensions']} dimensions, {report['lists']} lists; "
+          f"{report['queries']} queries")
+    print(f"  fit {report['fit_s']:.1f}s, index {report['index_s']:.1f}s; "
+          f"vectors {report['int8_mb']:.0f} MB int8 (float32: {report['float32_mb']:.0f} MB)")
+    for name, r in report['results'].items():
+        print(f"  {name:<18} recall@{args.k} {r['recall']:6.1%}  p50 {r['p50_ms']:8.2f} ms  "
+              f"p99 {r['p99_ms']:8.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), **report}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
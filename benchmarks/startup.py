@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup cost of each curiousmails.py subcommand
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --output startup.json
+
+For every command this loads the command's module the way curiousmails.py
+does, in a fresh interpreter with -X importtime. It reports:
+- total import time: the cumulative time of the top-level imports,
+  interpreter startup included
+- which heavy third-party packages were imported
+- the wall time of `curiousmails.py <command> --help`
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from curiousmails import COMMANDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('requests', 'urllib3', 'bs4', 'docx', 'lxml', 'numpy', 'scipy', 'pyarrow')
+
+def import_profile(command):
+    """(total import microseconds, {module: cumulative us}) for one cold load of a command"""
+    code = f"import curiousmails; curiousmails.load({command!r})"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports are indented by one space, nested ones by more
+        if not name.startswith('  '):
+            total += int(cumulative)
+        modules[name.strip()] = int(cumulative)
+    return total, modules
+
+def help_wall(command):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'curiousmails.py'), command, '--help'],
+                   cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time per curiousmails.py command")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per command; medians are reported")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'command':<16} {'imports':>10} {'--help wall':>12}  heavy packages imported")
+    for command in COMMANDS:
+        totals, walls, heavy = [], [], set()
+        for _ in range(args.repeat):
+            total, modules = import_profile(command)
+            totals.append(total)
+            heavy |= {name for name in HEAVY if name in modules}
+            walls.append(help_wall(command))
+        results[command] = {
+            'import_ms': statistics.median(totals) / 1000,
+            'help_wall_ms': statistics.median(walls) * 1000,
+            'heavy': sorted(heavy),
+        }
+        r = results[command]
+        print(f"{command:<16} {r['import_ms']:8.1f}ms {r['help_wall_ms']:10.1f}ms  "
+              f"{', '.join(r['heavy']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': sys.version.split()[0], 'commands': results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
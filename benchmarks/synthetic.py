@@ -0,0 +1,185 @@
+"""
+Synthetic corpus generators matching the schemas of projects.json,
+winner_emails.json and students.json, plus HTML fixtures for the parsers
+"""
+
+import random
+from html import escape
+
+YEARS = [str(y) for y in range(2014, 2026)]
+STUDENT_YEARS = ['2026', '2027', '2028', '2029', '2030']
+
+BOOTHS = [
+    ('ANIM', 'Animal Sciences'), ('BEHA', 'Behavioral and Social Sciences'),
+    ('BICM', 'Biochemistry'), ('BMED', 'Biomedical and Health Sciences'),
+    ('CBIO', 'Computational Biology and Bioinformatics'), ('CELL', 'Cellular and Molecular Biology'),
+    ('CHEM', 'Chemistry'), ('EAEV', 'Earth and Environmental Sciences'),
+    ('EBED', 'Embedded Systems'), ('ENBM', 'Biomedical Engineering'),
+    ('ENEV', 'Environmental Engineering'), ('ENMC', 'Materials Science'),
+    ('ENMT', 'Engineering Mechanics'), ('EGSD', 'Energy: Sustainable Materials and Design'),
+    ('MATH', 'Mathematics'), ('MCRO', 'Microbiology'), ('PHYS', 'Physics and Astronomy'),
+    ('PLNT', 'Plant Sciences'), ('ROBO', 'Robotics and Intelligent Machines'),
+    ('SOFT', 'Systems Software'), ('TMED', 'Translational Medical Science'),
+]
+
+COUNTRIES = ['United States of America', 'China', 'India', 'Canada', 'Brazil',
+             'Germany', 'Japan', 'Korea, Republic of', 'Australia', 'Mexico']
+
+FIRST_NAMES = ['Jake', 'Mary', 'Anton', 'Neehal', 'Clara', 'Amy', 'Michael', 'Kavya',
+               'Lucas', 'Holly', 'Marc', 'Tanisha', 'Robert', 'Dana', 'Siva', 'Beatriz',
+               'José', 'Zoë', 'Mohamed', 'Abla', 'Kidus', 'Noa', 'Andy', 'Meenakshi']
+LAST_NAMES = ['Bringetto', 'Zhu', 'Wu', 'Tumma', 'Wagner', 'Jin', 'Lai', 'Kopparapu',
+              'Mayhew', 'Jackson', 'Huo', 'Martheswaran', 'Tacescu', 'Jian', 'da Silva Borges',
+              'Hase-Liu', 'Abdellall', 'Abebe', 'Ablow Measelle', 'Núñez', "O'Brien"]
+
+MAJORS = ['Economics', 'Computer Science', 'Mechanical Engineering', 'Global Affairs',
+          'Molecular, Cellular & Developmental Biology', 'Physics', 'History',
+          'Neuroscience', 'Applied Mathematics', 'Political Science', '']
+COLLEGES = ['Benjamin Franklin', 'Berkeley', 'Branford', 'Davenport', 'Trumbull', 'Saybrook']
+
+AWARD_TEMPLATES = [
+    'First Award of $5,000', 'Second Award of $2,000', 'Third Award of $1,000',
+    'Fourth Award of $500', 'Intel ISEF Best of Category Award of $5,000',
+    'University of Arizona: Tuition Scholarship Award',
+    'Arizona State University: Arizona State University Intel ISEF Scholarship',
+    'Drexel University: Full tuition scholarship $194,000',
+    'American Statistical Association: Certificate of Honorable Mention',
+    'NASA: Second Award of $750',
+    'Sigma Xi, The Scientific Research Honor Society: First Life Science Award of $2,000',
+    'Association for the Advancement of Artificial Intelligence: Honorable Mention',
+]
+
+FILLER = ('the of and to in a we this study results data method using was were '
+          'significant analysis sample effect model test measured increase decrease '
+          'compared observed proposed novel approach performance').split()
+TOPICAL = ('solar photovoltaic battery efficiency bacteria antibiotic biofilm enzyme '
+           'protein robot autonomous sensor arduino algorithm neural network machine '
+           'learning plant germination soil water treatment wastewater polymer '
+           'nanoparticle cancer patient diagnosis quantum laser graph theorem').split()
+
+_WORD_POOL = FILLER * 3 + TOPICAL
+
+def _words(rng, n):
+    return ' '.join(rng.choice(_WORD_POOL) for _ in range(n))
+
+def _sentence_pool(seed, size=2000):
+    """Pre-generated sentences, so large corpora don't pay per-word randomness"""
+    rng = random.Random(seed)
+    return [_words(rng, rng.randint(12, 30)).capitalize() + '.' for _ in range(size)]
+
+def _abstract(rng, sentences):
+    return ' '.join(rng.choice(sentences) for _ in range(rng.randint(7, 14)))
+
+def iter_projects(n, seed=0, start_id=1):
+    """Yield n projects with the projects.json schema, one at a time"""
+    rng = random.Random(seed)
+    sentences = _sentence_pool(seed)
+    for i in range(n):
+        prefix, category = rng.choice(BOOTHS)
+        awards = []
+        if rng.random() < 0.3:
+            awards = rng.sample(AWARD_TEMPLATES, rng.randint(1, 3))
+        yield {
+            'id': start_id + i,
+            'title': _words(rng, rng.randint(6, 14)).capitalize(),
+            'student_name': f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}",
+            'category': category,
+            'year': rng.choice(YEARS),
+            'booth': f"{prefix}{rng.randint(1, 99):03d}",
+            'country': rng.choice(COUNTRIES),
+            'abstract': _abstract(rng, sentences),
+            'awards': awards,
+        }
+
+def make_projects(n, seed=0, start_id=1):
+    """Generate n projects with the projects.json schema"""
+    return list(iter_projects(n, seed, start_id))
+
+def make_winners(n, seed=0, start_id=1):
+    """Generate n winner records with the winner_emails.json schema"""
+    rng = random.Random(seed)
+    winners = {}
+    for project in make_projects(n, seed, start_id):
+        if not project['awards']:
+            project['awards'] = [rng.choice(AWARD_TEMPLATES)]
+        name = project['student_name']
+        emails = []
+        if rng.random() < 0.2:
+            emails = [f"{name.split(', ')[1].lower()}.{rng.randint(1, 99)}@example.edu"]
+        winners[str(project['id'])] = {
+            'student_name': name,
+            'project_title': project['title'],
+            'year': project['year'],
+            'awards': project['awards'],
+            'emails': emails,
+            'linkedin_profiles': [],
+            'search_queries': [f'"{name}" email', f'"{name}" contact', f'"{name}" ISEF email'],
+            'category': project['category'],
+            'country': project['country'],
+        }
+    return winners
+
+def make_students(n, seed=0):
+    """Generate n student records with the students.json schema"""
+    rng = random.Random(seed)
+    students = []
+    for i in range(n):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        major = rng.choice(MAJORS)
+        parts = [f"Residential College: {rng.choice(COLLEGES)}",
+                 f"NetID {first[0].lower()}{last[0].lower()}{rng.randint(1, 999)}",
+                 f"UPI {rng.randint(10000000, 99999999)}"]
+        if major:
+            parts.append(major)
+        if rng.random() < 0.5:
+            parts.append(f"{rng.choice(['Sep', 'May', 'Jul'])} {rng.randint(1, 28)}")
+        if rng.random() < 0.3:
+            parts.append('Eugene, OR 97403-1447')
+        students.append({
+            'uni': 'Yale',
+            'year': rng.choice(STUDENT_YEARS),
+            'first': first,
+            'last': last,
+            'major': major,
+            'email': f"{first.lower()}.{last.lower().replace(' ', '')}@yale.edu",
+            'notes': ' | '.join(parts),
+            'source_file': 'synthetic.docx',
+        })
+    return students
+
+def project_html(project):
+    """Render a project as a FullAbstract page understood by scraper.parse_project"""
+    rows = [
+        ('Finalist Names', project.get('student_name', '')),
+        ('Category', project.get('category', '')),
+        ('Year', project.get('year', '')),
+        ('Booth Id', project.get('booth', '')),
+        ('Country', project.get('country', '')),
+    ]
+    fields = '\n'.join(f"<p><strong>{label}:</strong> {escape(value)}</p>" for label, value in rows)
+    awards = escape('; '.join(project.get('awards', [])))
+    return f"""<html><head><title>Abstract</title></head><body>
+<nav><a href="/">Home</a></nav>
+<div class="container">
+<h2>{escape(project.get('title', ''))}</h2>
+{fields}
+<p><strong>Abstract:</strong></p>
+<p>{escape(project.get('abstract', ''))}</p>
+<p><strong>Awards Won:</strong>
+{awards}
+</p>
+</div>
+</body></html>"""
+
+def student_html(student):
+    """Render a student as a directory card understood by parse_student_html"""
+    netid, upi = student['notes'].split(' | ')[1:3]
+    return f"""<div class="peoplegrid_person__AF9Sl">
+<h3 class="peoplegrid_name__h8uVB">{escape(student['last'])}, {escape(student['first'])}</h3>
+<a href="mailto:{student['email']}">{student['email']}</a>
+<div title="Graduation Year"><svg></svg><span>{student['year']}</span></div>
+<div title="Residential College"><svg></svg><span>{escape(student['notes'].split(' | ')[0].split(': ')[1])}</span></div>
+<button class="chip_chip__dJvnn">{netid}</button>
+<button class="chip_chip__dJvnn">{upi}</button>
+</div>"""
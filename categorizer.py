@@ -6,9 +6,13 @@ ISEF Project Categorizer
 - Maps old categories to new ones
 """
 
-import json
-import os
-import re
+import argparse
+import sys
+
+import metrics
+import serialization
+from jsonstream import JsonArrayWriter
+from records import iter_projects
 
 DATA_FILE = "data/projects.json"
 OUTPUT_FILE = "data/projects_categorized.json"
@@ -191,6 +195,25 @@ CATEGORY_KEYWORDS = {
     ],
 }
 
+# ISEF category names that differ from ours by more than '&' vs 'and'
+CATEGORY_ALIASES = {
+    'Materials Science': 'Engineering: Materials & Chemical',
+    'Translational Medical Science': 'Biomedical & Health Sciences',
+    'Systems Software': 'Software Systems',
+    'Energy: Chemical': 'Energy: Sustainable Materials & Design',
+    'Energy: Physical': 'Energy: Sustainable Materials & Design',
+    'Physics and Astronomy': 'Physics',
+    'Engineering Mechanics': 'Engineering: Mechanical',
+    'Technology Enhances the Arts': 'Software Systems',
+}
+
+def normalize_category(name):
+    """Our name for an ISEF category name, e.g. 'Physics and Astronomy' -> 'Physics'"""
+    if name in CATEGORY_ALIASES:
+        return CATEGORY_ALIASES[name]
+    ampersand = name.replace(' and ', ' & ')
+    return ampersand if ampersand in CATEGORY_KEYWORDS else name
+
 def extract_booth_prefix(booth_id):
     """Extract category prefix from booth ID like EBED001T -> EBED"""
     if not booth_id:
@@ -211,26 +234,7 @@ def get_primary_category(project):
         return BOOTH_TO_CATEGORY[prefix]
     # Fall back to existing category if it matches a valid one
     existing = project.get('category', '')
-    # Normalize some known variations
-    category_map = {
-        'Biomedical and Health Sciences': 'Biomedical & Health Sciences',
-        'Robotics and Intelligent Machines': 'Robotics & Intelligent Machines',
-        'Computational Biology and Bioinformatics': 'Computational Biology & Bioinformatics',
-        'Energy: Sustainable Materials and Design': 'Energy: Sustainable Materials & Design',
-        'Materials Science': 'Engineering: Materials & Chemical',
-        'Translational Medical Science': 'Biomedical & Health Sciences',
-        'Systems Software': 'Software Systems',
-        'Energy: Chemical': 'Energy: Sustainable Materials & Design',
-        'Energy: Physical': 'Energy: Sustainable Materials & Design',
-        'Physics and Astronomy': 'Physics',
-        'Earth and Environmental Sciences': 'Earth & Environmental Sciences',
-        'Cellular and Molecular Biology': 'Cellular & Molecular Biology',
-        'Engineering Mechanics': 'Engineering: Mechanical',
-        'Technology Enhances the Arts': 'Software Systems',
-    }
-    if existing in category_map:
-        return category_map[existing]
-    return existing if existing else 'Other'
+    return normalize_category(existing) if existing else 'Other'
 
 def find_cross_listings(project, primary_category):
     """Find additional categories based on keyword matching"""
@@ -267,77 +271,100 @@ def find_cross_listings(project, primary_category):
 
     return list(cross_listings)
 
-def main():
-    # Load projects
-    print("Loading projects...")
-    with open(DATA_FILE, 'r') as f:
-        projects = json.load(f)
-
-    print(f"Loaded {len(projects)} projects")
-
-    # Process each project
-    print("\nCategorizing projects...")
-
-    for i, project in enumerate(projects):
+def categorize(projects):
+    """Yield each project with primary_category and categories filled in"""
+    for project in projects:
         # Get primary category from booth ID
-        primary = get_primary_category(project)
+        with metrics.timer('primary_category'):
+            primary = get_primary_category(project)
         project['primary_category'] = primary
 
         # Find cross-listings using keyword NLP
-        cross_listings = find_cross_listings(project, primary)
+        with metrics.timer('cross_listings'):
+            cross_listings = find_cross_listings(project, primary)
+        metrics.incr('projects_categorized')
 
         # Combine into categories list (primary first, then cross-listings)
         project['categories'] = [primary] + sorted(cross_listings)
+        yield project
+
+class CategoryStats:
+    """Running category statistics, so projects don't have to be kept around"""
+
+    def __init__(self):
+        self.total = 0
+        self.primary_counts = {}
+        self.cat_dist = {}
+        self.total_cats = 0
+
+    def add(self, project):
+        self.total += 1
+        cat = project['primary_category']
+        self.primary_counts[cat] = self.primary_counts.get(cat, 0) + 1
+        n = len(project['categories'])
+        self.cat_dist[n] = self.cat_dist.get(n, 0) + 1
+        self.total_cats += n
 
-        if (i + 1) % 1000 == 0:
-            print(f"Processed {i + 1}/{len(projects)} projects...")
+    def report(self):
+        print("\nPrimary category distribution:")
+        for cat, count in sorted(self.primary_counts.items(), key=lambda x: -x[1])[:20]:
+            print(f"  {cat}: {count}")
+
+        if not self.total:
+            return
+
+        multi_cat = sum(count for n, count in self.cat_dist.items() if n > 1)
+        print(f"\nCross-listing statistics:")
+        print(f"  Projects with multiple categories: {multi_cat} ({multi_cat*100/self.total:.1f}%)")
+        print(f"  Average categories per project: {self.total_cats / self.total:.2f}")
+        print(f"  Maximum categories on single project: {max(self.cat_dist)}")
+
+        print(f"\n  Distribution by number of categories:")
+        for n in sorted(self.cat_dist.keys()):
+            print(f"    {n} categories: {self.cat_dist[n]} projects")
+
+def categorize_file():
+    """
+    Categorize DATA_FILE in one streaming pass.
+
+    Projects are read, categorized and written one at a time to both
+    OUTPUT_FILE and DATA_FILE, so memory use doesn't grow with the corpus.
+    """
+    print(f"Categorizing projects from {DATA_FILE}...")
+    stats = CategoryStats()
+
+    # Both writers go through temporary files, so DATA_FILE can be read
+    # while its replacement is written
+    indent = serialization.default_indent()
+    with JsonArrayWriter(OUTPUT_FILE, indent) as output, JsonArrayWriter(DATA_FILE, indent) as data:
+        for project in categorize(iter_projects(DATA_FILE)):
+            stats.add(project)
+            with metrics.timer('save'):
+                record = project.to_dict()
+                output.write(record)
+                data.write(record)
+
+            if stats.total % 1000 == 0:
+                print(f"Processed {stats.total} projects...")
 
     # Stats
     print("\n" + "="*50)
     print("CATEGORIZATION COMPLETE")
     print("="*50)
+    print(f"Categorized {stats.total} projects")
+    stats.report()
 
-    # Primary category distribution
-    primary_counts = {}
-    for p in projects:
-        cat = p['primary_category']
-        primary_counts[cat] = primary_counts.get(cat, 0) + 1
-
-    print("\nPrimary category distribution:")
-    for cat, count in sorted(primary_counts.items(), key=lambda x: -x[1])[:20]:
-        print(f"  {cat}: {count}")
-
-    # Cross-listing stats
-    multi_cat = sum(1 for p in projects if len(p['categories']) > 1)
-    avg_cats = sum(len(p['categories']) for p in projects) / len(projects)
-    max_cats = max(len(p['categories']) for p in projects)
-
-    print(f"\nCross-listing statistics:")
-    print(f"  Projects with multiple categories: {multi_cat} ({multi_cat*100/len(projects):.1f}%)")
-    print(f"  Average categories per project: {avg_cats:.2f}")
-    print(f"  Maximum categories on single project: {max_cats}")
-
-    # Distribution of number of categories
-    cat_dist = {}
-    for p in projects:
-        n = len(p['categories'])
-        cat_dist[n] = cat_dist.get(n, 0) + 1
-
-    print(f"\n  Distribution by number of categories:")
-    for n in sorted(cat_dist.keys()):
-        print(f"    {n} categories: {cat_dist[n]} projects")
-
-    # Save output
-    print(f"\nSaving to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(projects, f, indent=2)
-
-    # Also update the main projects.json with categories
-    print(f"Updating {DATA_FILE} with categories...")
-    with open(DATA_FILE, 'w') as f:
-        json.dump(projects, f, indent=2)
-
+    print(f"\nSaved to {OUTPUT_FILE} and updated {DATA_FILE}")
     print("\nDone!")
 
+def main(argv=None):
+    # --profile[=pyinstrument] and --metrics PATH
+    args, profiler, metrics_output = metrics.parse_flags(sys.argv[1:] if argv is None else argv)
+    argparse.ArgumentParser(description=f"Categorize {DATA_FILE} in place (and into {OUTPUT_FILE})",
+                            epilog=metrics.FLAGS_HELP).parse_args(args)
+
+    with metrics.session('categorizer', profiler, metrics_output):
+        categorize_file()
+
 if __name__ == "__main__":
     main()
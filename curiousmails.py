@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+One entry point for the curiousmails pipeline
+- Each subcommand runs an existing script's main() with the remaining
+  arguments, so `curiousmails.py scrape 8889 10000` is `scraper.py 8889 10000`
+- Only the chosen subcommand's module is imported, and those modules import
+  requests, bs4 and docx inside the functions that use them, so commands that
+  never touch the network or .docx files start without paying for them
+
+Usage:
+    python curiousmails.py scrape [START END] [--retry-failed]
+    python curiousmails.py emails [LIMIT] [--no-resolve]
+    python curiousmails.py categorize
+    python curiousmails.py ingest-students [FILE.docx ...]
+    python curiousmails.py enhance [--field category ...]
+    python curiousmails.py export winners winners.csv
+    python curiousmails.py table [--export]
+    python curiousmails.py <command> --help
+    python -m benchmarks.startup                    # import time per command
+"""
+
+import importlib
+import sys
+
+# command -> (module, default arguments, description)
+COMMANDS = {
+    'scrape': ('scraper', [], "Scrape ISEF project abstracts into data/projects.json"),
+    'emails': ('email_scraper', [], "Search for award winners' email addresses"),
+    'categorize': ('categorizer', [], "Assign primary and cross-listed categories"),
+    'ingest-students': ('parse_student_html', ['--majors'],
+                        "Parse student directory .docx exports into data/students.json"),
+    'enhance': ('enrich', [], "Copy project fields onto winner records"),
+    'export': ('export_data', [], "Export winners or students to CSV/TSV/JSONL/Parquet"),
+    'table': ('generate_table_data', [], "Print or export the winners table"),
+}
+
+def usage():
+    width = max(map(len, COMMANDS))
+    lines = ["usage: curiousmails.py <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {description}" for name, (_, _, description) in COMMANDS.items()]
+    lines += ["", "Run 'curiousmails.py <command> --help' for a command's options."]
+    return '\n'.join(lines)
+
+def load(command):
+    """The main() of a command's module, importing the module only now"""
+    module, defaults, _ = COMMANDS[command]
+    main = importlib.import_module(module).main
+    return lambda argv: main(defaults + list(argv))
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"curiousmails.py: unknown command '{command}'\n\n{usage()}", file=sys.stderr)
+        return 2
+    load(command)(rest)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Distributed ISEF scraping with a lease-based work queue
+- ID ranges live in a SQLite queue shared by every worker
+- A worker leases one range at a time; expired leases are handed out again
+- Each worker appends to its own shard file; merge folds shards into projects.json
+
+Usage:
+    python distributed_scraper.py init 1 30000 --chunk 500
+    python distributed_scraper.py worker --id node-a      # run on each process/host
+    python distributed_scraper.py status
+    python distributed_scraper.py merge
+
+The queue uses SQLite's rollback journal (not WAL, which needs shared
+memory between processes), so SQLite's file locks serialize the lease
+updates. Workers on several hosts sharing data/ over a network filesystem
+are only safe if that filesystem implements POSIX locks correctly; many NFS
+and SMB setups don't. Otherwise run the workers as processes on one host.
+"""
+
+import argparse
+import heapq
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import serialization
+from jsonstream import JsonArrayWriter, iter_json_array
+
+DATA_FILE = "data/projects.json"
+QUEUE_FILE = "data/queue.sqlite"
+SHARD_DIR = "data/shards"
+
+LEASE_SECONDS = 300
+CHUNK_SIZE = 500
+MERGE_RUN_SIZE = 50000      # records sorted in memory at a time by merge_shards
+
+class WorkQueue:
+    """SQLite-backed queue of [start, end] ID ranges with expiring leases"""
+
+    def __init__(self, path=QUEUE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # Autocommit mode; write transactions are opened explicitly below
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        # WAL's shared-memory index doesn't work across hosts
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ranges (
+                id INTEGER PRIMARY KEY,
+                start_id INTEGER NOT NULL,
+                end_id INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                found INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (start_id, end_id)
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def add_ranges(self, start_id, end_id, chunk=CHUNK_SIZE):
+        """Split [start_id, end_id] into chunks; existing ranges are kept as they are"""
+        rows = [(lo, min(lo + chunk - 1, end_id)) for lo in range(start_id, end_id + 1, chunk)]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO ranges (start_id, end_id) VALUES (?, ?)", rows)
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def acquire(self, worker, lease_seconds=LEASE_SECONDS, now=None):
+        """
+        Lease the lowest pending range, or one whose lease has expired.
+
+        Returns:
+            (range_id, start_id, end_id), or None when no work is left
+        """
+        now = time.time() if now is None else now
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't
+        # both see the same range as free
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("""
+                SELECT id, start_id, end_id FROM ranges
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY start_id LIMIT 1
+            """, (now,)).fetchone()
+            if row:
+                self.conn.execute("""
+                    UPDATE ranges SET status = 'leased', worker = ?, lease_expires = ?,
+                                      attempts = attempts + 1
+                    WHERE id = ?
+                """, (worker, now + lease_seconds, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def renew(self, range_id, worker, lease_seconds=LEASE_SECONDS, now=None):
+        """Extend a lease; returns False if the worker no longer holds it"""
+        now = time.time() if now is None else now
+        cur = self.conn.execute("""
+            UPDATE ranges SET lease_expires = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+        """, (now + lease_seconds, range_id, worker))
+        return cur.rowcount == 1
+
+    def complete(self, range_id, worker, found=0):
+        """Mark a leased range done; returns False if the lease was lost"""
+        cur = self.conn.execute("""
+            UPDATE ranges SET status = 'done', lease_expires = NULL, found = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+        """, (found, range_id, worker))
+        return cur.rowcount == 1
+
+    def release(self, range_id, worker):
+        """Give a range back to the queue without completing it"""
+        self.conn.execute("""
+            UPDATE ranges SET status = 'pending', worker = NULL, lease_expires = NULL
+            WHERE id = ? AND worker = ? AND status = 'leased'
+        """, (range_id, worker))
+
+    def status(self, now=None):
+        """Return counts of pending/leased/expired/done ranges and projects found"""
+        now = time.time() if now is None else now
+        counts = {'pending': 0, 'leased': 0, 'expired': 0, 'done': 0}
+        for status, expired, n in self.conn.execute("""
+            SELECT status, status = 'leased' AND lease_expires < ?, COUNT(*)
+            FROM ranges GROUP BY 1, 2
+        """, (now,)):
+            counts['expired' if expired else status] += n
+        counts['found'] = self.conn.execute("SELECT COALESCE(SUM(found), 0) FROM ranges").fetchone()[0]
+        return counts
+
+def shard_path(worker, shard_dir=SHARD_DIR):
+    return os.path.join(shard_dir, f"{worker}.jsonl")
+
+def append_shard(path, projects):
+    """Append projects to a worker's JSONL shard and flush them to disk"""
+    with open(path, 'ab') as f:
+        for project in projects:
+            f.write(serialization.dumps(project) + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def iter_shard(path):
+    """Yield projects from a shard, ignoring a torn final line"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield serialization.loads(line)
+            except ValueError:
+                continue
+
+def existing_ids(data_file):
+    """IDs already present in projects.json and in every shard"""
+    ids = set()
+    if os.path.exists(data_file):
+        ids.update(p['id'] for p in iter_json_array(data_file))
+    if os.path.isdir(SHARD_DIR):
+        for name in os.listdir(SHARD_DIR):
+            if name.endswith('.jsonl'):
+                ids.update(p['id'] for p in iter_shard(os.path.join(SHARD_DIR, name)))
+    return ids
+
+def scrape_leased_range(queue, worker, range_row, fetch, skip_ids, shard,
+                        max_workers=5, batch_size=50, lease_seconds=LEASE_SECONDS):
+    """
+    Scrape one leased range, renewing the lease after every batch.
+
+    Returns:
+        Number of projects found, or None if the lease was lost
+    """
+    range_id, start_id, end_id = range_row
+    ids = [i for i in range(start_id, end_id + 1) if i not in skip_ids]
+    found = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for offset in range(0, len(ids), batch_size):
+            batch = ids[offset:offset + batch_size]
+            projects = [p for p in executor.map(fetch, batch) if p]
+            if projects:
+                with metrics.timer('save'):
+                    append_shard(shard, projects)
+                found += len(projects)
+
+            if not queue.renew(range_id, worker, lease_seconds):
+                print(f"[{worker}] Lost lease on {start_id}-{end_id}; leaving it to its new owner")
+                return None
+
+    return found
+
+def run_worker(worker, queue_file=QUEUE_FILE, data_file=DATA_FILE, max_workers=5,
+               batch_size=50, lease_seconds=LEASE_SECONDS, fetch=None):
+    """Lease and scrape ranges until the queue is drained"""
+    if fetch is None:
+        from scraper import fetch_project as fetch
+
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    shard = shard_path(worker)
+    queue = WorkQueue(queue_file)
+
+    skip_ids = existing_ids(data_file)
+    print(f"[{worker}] Skipping {len(skip_ids)} already scraped IDs")
+
+    total = 0
+    try:
+        while True:
+            row = queue.acquire(worker, lease_seconds)
+            if row is None:
+                break
+
+            _, start_id, end_id = row
+            print(f"[{worker}] Leased {start_id}-{end_id}")
+            try:
+                found = scrape_leased_range(queue, worker, row, fetch, skip_ids, shard,
+                                            max_workers, batch_size, lease_seconds)
+            except BaseException:
+                queue.release(row[0], worker)
+                raise
+
+            if found is None:
+                continue
+            if queue.complete(row[0], worker, found):
+                metrics.incr('ranges_completed')
+                total += found
+                print(f"[{worker}] Finished {start_id}-{end_id}: {found} projects")
+    finally:
+        queue.close()
+
+    print(f"[{worker}] Queue drained. Found {total} projects; shard: {shard}")
+    return total
+
+def _sorted_runs(records, rank, tmpdir, run_size):
+    """
+    Spill records into id-sorted JSONL runs of at most run_size records.
+
+    Returns:
+        One iterator per run over (id, rank, seq, record); seq keeps a
+        source's file order, so its later copy of an id sorts last
+    """
+    paths, run = [], []
+
+    def flush():
+        run.sort(key=lambda item: (item[1]['id'], item[0]))
+        path = os.path.join(tmpdir, f"{rank}-{len(paths)}.jsonl")
+        with open(path, 'wb') as f:
+            for item in run:
+                f.write(serialization.dumps(item) + b'\n')
+        paths.append(path)
+        run.clear()
+
+    for seq, record in enumerate(records):
+        run.append((seq, record))
+        if len(run) >= run_size:
+            flush()
+    if run:
+        flush()
+
+    def read(path):
+        for seq, record in iter_shard(path):
+            yield record['id'], rank, seq, record
+    return [read(path) for path in paths]
+
+def merge_shards(data_file=DATA_FILE, shard_dir=SHARD_DIR, remove=False, run_size=MERGE_RUN_SIZE):
+    """
+    Merge projects.json and every shard, de-duplicated by ID and sorted.
+
+    Each source is sorted in runs of run_size records spilled to temporary
+    files, and the runs are merged by id, so memory stays bounded by
+    run_size rather than the archive. For a repeated id the copy from the
+    last shard wins, as shards are newer than projects.json.
+    """
+    shards = sorted(os.path.join(shard_dir, n) for n in os.listdir(shard_dir)
+                    if n.endswith('.jsonl')) if os.path.isdir(shard_dir) else []
+    sources = [iter_json_array(data_file) if os.path.exists(data_file) else iter(())]
+    sources += [iter_shard(path) for path in shards]
+
+    total = added = 0
+    with tempfile.TemporaryDirectory(prefix='merge-', dir=os.path.dirname(data_file) or None) as tmpdir:
+        runs = []
+        for rank, records in enumerate(sources):
+            runs += _sorted_runs(records, rank, tmpdir, run_size)
+
+        # Written to a temporary file first so a crash can't truncate projects.json
+        with metrics.timer('save'), JsonArrayWriter(data_file, serialization.default_indent()) as out:
+            current, in_data_file = None, False
+            for project_id, rank, _, project in heapq.merge(*runs, key=lambda item: item[:3]):
+                if current is not None and current['id'] != project_id:
+                    out.write(current)
+                    added += not in_data_file
+                    in_data_file = False
+                current = project
+                in_data_file = in_data_file or rank == 0
+            if current is not None:
+                out.write(current)
+                added += not in_data_file
+            total = out.count
+
+    if remove:
+        for path in shards:
+            os.remove(path)
+
+    return total, added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed scraping with a lease-based work queue")
+    parser.add_argument('--queue', default=QUEUE_FILE, help=f"Queue database (default: {QUEUE_FILE})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    init = sub.add_parser('init', help="Add ID ranges to the queue")
+    init.add_argument('start', type=int)
+    init.add_argument('end', type=int)
+    init.add_argument('--chunk', type=int, default=CHUNK_SIZE)
+
+    worker = sub.add_parser('worker', help="Lease and scrape ranges until none are left")
+    worker.add_argument('--id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Unique worker name (default: host-pid)")
+    worker.add_argument('--threads', type=int, default=5)
+    worker.add_argument('--lease', type=int, default=LEASE_SECONDS, help="Lease length in seconds")
+
+    sub.add_parser('status', help="Show queue progress")
+
+    merge = sub.add_parser('merge', help="Fold worker shards into projects.json")
+    merge.add_argument('--remove-shards', action='store_true')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'init':
+        queue = WorkQueue(args.queue)
+        added = queue.add_ranges(args.start, args.end, args.chunk)
+        queue.close()
+        print(f"Queued {added} new ranges covering {args.start}-{args.end}")
+    elif args.command == 'worker':
+        with metrics.session(f'worker {args.id}'):
+            run_worker(args.id, args.queue, max_workers=args.threads, lease_seconds=args.lease)
+    elif args.command == 'status':
+        queue = WorkQueue(args.queue)
+        counts = queue.status()
+        queue.close()
+        print(', '.join(f"{k}: {v}" for k, v in counts.items()))
+    elif args.command == 'merge':
+        total, added = merge_shards(remove=args.remove_shards)
+        print(f"Merged {added} new projects; {total} projects total")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Candidate email generation and scoring for award winners
+- Learns address patterns (first.last, f.last, ...) per domain from students.json
+- Generates candidates from the winner's name and the university domains named
+  in their awards or known from the student directory
+- Cross-matches candidates with directory entries and scraped search hits and
+  ranks every address by combined evidence
+
+Winners whose best candidate is already certain enough need no search
+queries at all.
+
+Usage:
+    python email_candidates.py score              # rank candidates for every winner
+    python email_candidates.py score --write      # store them in winner_emails.json
+    python email_candidates.py patterns           # show the learned patterns
+"""
+
+import argparse
+from collections import Counter, defaultdict
+
+import serialization
+from linkage import year_score
+from names import fold, parse_name, person
+from universities import DOMAINS, extract_university, resolve_award
+
+STUDENTS_FILE = "data/students.json"
+WINNERS_FILE = "data/winner_emails.json"
+
+# A top candidate at or above this score is used without searching
+RESOLVED_SCORE = 0.8
+
+# Evidence weights, combined with noisy-or. A directory name match alone
+# stays below RESOLVED_SCORE: common names need a second signal
+DIRECTORY_WEIGHT = 0.6       # same normalized name in the student directory
+DIRECTORY_UNI_WEIGHT = 0.5   # ... at a university named in the awards
+DIRECTORY_YEAR_WEIGHT = 0.5  # ... scaled by how plausible the graduation year is
+SCRAPED_EXACT_WEIGHT = 0.7   # a search hit equals a generated candidate
+SCRAPED_NAME_WEIGHT = 0.5    # a search hit's local part contains first and last name
+SCRAPED_LAST_WEIGHT = 0.25   # ... contains only the last name
+SCRAPED_OTHER_WEIGHT = 0.05  # any other search hit
+AWARD_DOMAIN_WEIGHT = 0.35   # a university named in the awards is only a guess
+
+# Used for domains with no directory entries to learn from
+DEFAULT_PATTERN_PRIORS = {
+    'first.last': 0.5,
+    'flast': 0.15,
+    'firstlast': 0.1,
+    'f.last': 0.1,
+    'first_last': 0.05,
+    'last.first': 0.05,
+}
+
+PATTERNS = {
+    'first.last': lambda f, l: f"{f}.{l}",
+    'f.last': lambda f, l: f"{f[0]}.{l}",
+    'firstlast': lambda f, l: f"{f}{l}",
+    'flast': lambda f, l: f"{f[0]}{l}",
+    'first_last': lambda f, l: f"{f}_{l}",
+    'last.first': lambda f, l: f"{l}.{f}",
+}
+
+def generate(first, last, domain, priors):
+    """Yield (address, pattern, prior) for each known pattern at domain"""
+    f, l = fold(first), fold(last)
+    if not f or not l:
+        return
+    seen = set()
+    for name, prior in priors.items():
+        if name not in PATTERNS:
+            continue
+        address = f"{PATTERNS[name](f, l)}@{domain}"
+        if address not in seen:
+            seen.add(address)
+            yield address, name, prior
+
+def _noisy_or(weights):
+    remaining = 1.0
+    for weight in weights:
+        remaining *= 1 - weight
+    return 1 - remaining
+
+class CandidateEngine:
+    """
+    Indexed directory and pattern priors, shared across every winner.
+
+    Args:
+        students: Records with first, last, email and uni fields
+    """
+
+    def __init__(self, students=()):
+        self.by_name = defaultdict(list)           # (last, first) -> [(email, grad year)]
+        pattern_counts = defaultdict(Counter)      # domain -> pattern -> count
+        self.uni_domains = {}                      # canonical uni -> domain
+
+        for student in students:
+            email = (student.get('email') or '').lower()
+            if '@' not in email:
+                continue
+            local, domain = email.split('@', 1)
+            name = person(student.get('first') or '', student.get('last') or '')
+            first, last = name.folded_first, name.folded_last.replace(' ', '')
+            if not first or not last:
+                continue
+            self.by_name[(last, first)].append((email, student.get('year')))
+
+            matched = [name for name, make in PATTERNS.items() if make(first, last) == local]
+            pattern_counts[domain][matched[0] if matched else 'other'] += 1
+
+            uni = resolve_award(student.get('uni', ''))
+            if uni:
+                self.uni_domains.setdefault(uni, domain)
+
+        self.priors = {}
+        for domain, counts in pattern_counts.items():
+            total = sum(counts.values())
+            self.priors[domain] = {name: count / total for name, count in counts.most_common()
+                                   if name != 'other'}
+
+    @classmethod
+    def from_file(cls, path=STUDENTS_FILE):
+        try:
+            return cls(serialization.load(path, 'students'))
+        except FileNotFoundError:
+            return cls()
+
+    def domains_for(self, awards=(), uni=''):
+        """{domain: weight} for the universities linked to a winner"""
+        domains = {}
+        names = {uni} if uni else set()
+        names.update(resolve_award(award) for award in awards or ())
+        for name in filter(None, names):
+            domain = DOMAINS.get(name) or self.uni_domains.get(name)
+            if domain:
+                domains[domain] = AWARD_DOMAIN_WEIGHT
+        return domains
+
+    def rank(self, student_name, awards=(), uni='', hits=(), year=None):
+        """
+        Rank candidate addresses for one winner.
+
+        Args:
+            hits: Addresses scraped from search results, if any
+            year: ISEF year, checked against directory graduation years
+
+        Returns:
+            [{'email', 'score', 'evidence'}] best first
+        """
+        name = parse_name(student_name).primary
+        first, last = name.first, name.last
+        f, l = name.folded_first, name.folded_last.replace(' ', '')
+        evidence = defaultdict(list)   # email -> [(weight, reason)]
+
+        award_domains = self.domains_for(awards, uni)
+        entries = self.by_name.get((l, f), ())
+        for email, grad_year in entries:
+            share = 1 / len(entries)
+            evidence[email].append((DIRECTORY_WEIGHT * share, 'directory name match'))
+            if email.split('@', 1)[1] in award_domains:
+                evidence[email].append((DIRECTORY_UNI_WEIGHT * share, 'directory entry at award university'))
+            if year and grad_year:
+                plausible = year_score(year, grad_year)
+                if plausible:
+                    evidence[email].append((DIRECTORY_YEAR_WEIGHT * plausible * share,
+                                            f"graduates {grad_year}, ISEF {year}"))
+
+        generated = set()
+        for domain, domain_weight in award_domains.items():
+            priors = self.priors.get(domain, DEFAULT_PATTERN_PRIORS)
+            for email, pattern, prior in generate(first, last, domain, priors):
+                generated.add(email)
+                evidence[email].append((domain_weight * prior, f"{pattern} pattern at {domain}"))
+
+        for hit in hits:
+            email = hit.lower()
+            local = email.split('@', 1)[0]
+            if email in generated:
+                evidence[email].append((SCRAPED_EXACT_WEIGHT, 'search hit matches candidate'))
+            elif l and l in local and (f in local or local.startswith(f[:1])):
+                evidence[email].append((SCRAPED_NAME_WEIGHT, 'search hit contains name'))
+            elif l and l in local:
+                evidence[email].append((SCRAPED_LAST_WEIGHT, 'search hit contains last name'))
+            else:
+                evidence[email].append((SCRAPED_OTHER_WEIGHT, 'search hit'))
+
+        ranked = [
+            {
+                'email': email,
+                'score': round(_noisy_or(w for w, _ in reasons), 4),
+                'evidence': [reason for _, reason in reasons],
+            }
+            for email, reasons in evidence.items()
+        ]
+        ranked.sort(key=lambda c: (-c['score'], c['email']))
+        return ranked
+
+    def rank_all(self, winners):
+        """Rank candidates for every {id: winner} record in one pass"""
+        return {
+            project_id: self.rank(winner.get('student_name'), winner.get('awards'),
+                                  winner.get('uni') or extract_university(winner.get('awards')),
+                                  winner.get('emails', ()), winner.get('year'))
+            for project_id, winner in winners.items()
+        }
+
+def resolved(ranked, threshold=RESOLVED_SCORE):
+    """The top candidate if it is certain enough to skip searching, else None"""
+    if ranked and ranked[0]['score'] >= threshold:
+        return ranked[0]
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and rank candidate emails for winners")
+    parser.add_argument('--students', default=STUDENTS_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    score = sub.add_parser('score', help="Rank candidates for every winner")
+    score.add_argument('file', nargs='?', default=WINNERS_FILE)
+    score.add_argument('--write', action='store_true', help="Store email_candidates on each record")
+    score.add_argument('--top', type=int, default=3, help="Candidates kept per winner (default: 3)")
+
+    sub.add_parser('patterns', help="Show the address patterns learned per domain")
+
+    args = parser.parse_args(argv)
+    engine = CandidateEngine.from_file(args.students)
+
+    if args.command == 'patterns':
+        for domain, priors in sorted(engine.priors.items()):
+            print(domain)
+            for name, prior in priors.items():
+                print(f"  {name:<12} {prior:6.1%}")
+    elif args.command == 'score':
+        winners = serialization.load(args.file, 'winners')
+        ranked = engine.rank_all(winners)
+        certain = sum(1 for r in ranked.values() if resolved(r))
+        with_candidates = sum(1 for r in ranked.values() if r)
+        print(f"{len(winners)} winners: {with_candidates} with candidates, "
+              f"{certain} resolved without searching (score >= {RESOLVED_SCORE})")
+        for project_id, candidates in list(ranked.items())[:10]:
+            if candidates:
+                best = candidates[0]
+                print(f"  {project_id}: {best['email']} ({best['score']:.2f}; {', '.join(best['evidence'])})")
+
+        if args.write:
+            for project_id, candidates in ranked.items():
+                winners[project_id]['email_candidates'] = candidates[:args.top]
+            serialization.save(args.file, winners)
+            print(f"Saved candidates to {args.file}")
+
+if __name__ == '__main__':
+    main()
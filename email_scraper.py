@@ -4,21 +4,31 @@ Email Scraper for ISEF Award Winners
 Searches for email addresses of award-winning project students
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
-import time
+import argparse
 import re
 import os
+import sys
+from itertools import islice
 from urllib.parse import quote_plus
-import urllib3
 
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+import metrics
+import serialization
+from records import iter_projects
+from resolve_names import resolve_missing_names
+from email_candidates import CandidateEngine, resolved, STUDENTS_FILE
+from names import parse_name
+from http_client import HttpClient, FetchError, CircuitOpen
 
 DATA_FILE = "data/projects.json"
 EMAILS_FILE = "data/winner_emails.json"
 
+# Ranked candidate addresses stored per winner
+CANDIDATES_KEPT = 3
+
+# Search engines rate-limit aggressively: retry once, then let the breaker
+# skip that engine for a while instead of hammering it
+search_client = HttpClient(retries=1, backoff=5.0, timeout=10, failure_threshold=3, reset_timeout=300.0)
+
 def extract_emails(text):
     """Extract email addresses from text using regex."""
     email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
@@ -34,11 +44,16 @@ def search_google(query, num_results=10):
     search_url = f"https://www.google.com/search?q={quote_plus(query)}&num={num_results}"
 
     try:
-        response = requests.get(search_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            return response.text
+        with metrics.timer('search_google'):
+            response = search_client.get(search_url, headers=headers)
+        metrics.incr('searches')
+        return response.text
+    except CircuitOpen:
         return ""
-    except Exception as e:
+    except FetchError as e:
+        metrics.incr('search_errors')
+        if e.status:
+            metrics.incr(f'search_http_{e.status}')
         print(f"Error searching Google: {e}")
         return ""
 
@@ -51,11 +66,16 @@ def search_duckduckgo(query):
     search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
 
     try:
-        response = requests.get(search_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            return response.text
+        with metrics.timer('search_duckduckgo'):
+            response = search_client.get(search_url, headers=headers)
+        metrics.incr('searches')
+        return response.text
+    except CircuitOpen:
         return ""
-    except Exception as e:
+    except FetchError as e:
+        metrics.incr('search_errors')
+        if e.status:
+            metrics.incr(f'search_http_{e.status}')
         print(f"Error searching DuckDuckGo: {e}")
         return ""
 
@@ -68,18 +88,23 @@ def search_linkedin(name):
     # Search LinkedIn via Google
     query = f"{name} site:linkedin.com"
     try:
-        response = requests.get(f"https://www.google.com/search?q={quote_plus(query)}",
-                              headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Extract LinkedIn URLs
-            links = []
-            for link in soup.find_all('a'):
-                href = link.get('href', '')
-                if 'linkedin.com/in/' in href:
-                    links.append(href)
-            return links[:3]  # Return top 3 LinkedIn profiles
-    except Exception as e:
+        with metrics.timer('search_linkedin'):
+            response = search_client.get(f"https://www.google.com/search?q={quote_plus(query)}",
+                                         headers=headers)
+        metrics.incr('searches')
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(response.text, 'html.parser')
+        # Extract LinkedIn URLs
+        links = []
+        for link in soup.find_all('a'):
+            href = link.get('href', '')
+            if 'linkedin.com/in/' in href:
+                links.append(href)
+        return links[:3]  # Return top 3 LinkedIn profiles
+    except CircuitOpen:
+        pass
+    except FetchError as e:
+        metrics.incr('search_errors')
         print(f"Error searching LinkedIn: {e}")
 
     return []
@@ -130,16 +155,18 @@ def find_email_for_person(name, project_title=None, year=None):
         html = search_duckduckgo(query)
 
         if html:
-            emails = extract_emails(html)
-            all_emails.extend(emails)
+            with metrics.timer('parse'):
+                emails = extract_emails(html)
+                all_emails.extend(emails)
 
-            # Also check for common academic/professional domains
-            soup = BeautifulSoup(html, 'html.parser')
-            text = soup.get_text()
-            emails_in_text = extract_emails(text)
-            all_emails.extend(emails_in_text)
+                # Also check for common academic/professional domains
+                from bs4 import BeautifulSoup
+                soup = BeautifulSoup(html, 'html.parser')
+                text = soup.get_text()
+                emails_in_text = extract_emails(text)
+                all_emails.extend(emails_in_text)
 
-        time.sleep(2)  # Be polite, don't hammer servers
+        metrics.sleep(2)  # Be polite, don't hammer servers
 
     # Search LinkedIn
     linkedin_profiles = search_linkedin(name)
@@ -166,78 +193,66 @@ def find_email_for_person(name, project_title=None, year=None):
 
     return result
 
-def scrape_winner_emails(limit=None, skip_existing=True):
+def iter_award_winners(projects):
+    """Yield only the projects that won at least one award"""
+    for project in projects:
+        if project.get('awards'):
+            yield project
+
+def scrape_winner_emails(limit=None, skip_existing=True, resolve=True):
     """
     Scrape emails for ISEF award winners.
 
     Args:
         limit: Maximum number of winners to process (None for all)
         skip_existing: Skip winners we've already processed
+        resolve: First fetch missing student names concurrently (resolve_names.py)
     """
     # Load projects
     if not os.path.exists(DATA_FILE):
         print(f"Error: {DATA_FILE} not found. Run scraper.py first.")
         return
 
-    with open(DATA_FILE, 'r') as f:
-        projects = json.load(f)
-
     # Load existing emails
     existing_emails = {}
     if skip_existing and os.path.exists(EMAILS_FILE):
-        with open(EMAILS_FILE, 'r') as f:
-            existing_emails = json.load(f)
+        with metrics.timer('load'):
+            existing_emails = serialization.load(EMAILS_FILE, 'winners')
 
-    # Filter for award winners
-    winners = [p for p in projects if p.get('awards') and len(p.get('awards', [])) > 0]
+    results = existing_emails.copy() if skip_existing else {}
+
+    def winners():
+        # Stream award winners from the projects file instead of loading it
+        return islice(iter_award_winners(iter_projects(DATA_FILE)), limit or None)
 
-    print(f"Found {len(winners)} award-winning projects")
+    if resolve:
+        # Only the unnamed winners this run will actually process
+        unnamed = [p['id'] for p in winners()
+                   if not p.get('student_name') and str(p['id']) not in results]
+        if unnamed:
+            resolve_missing_names(DATA_FILE, project_ids=unnamed)
 
     if limit:
-        winners = winners[:limit]
         print(f"Processing first {limit} winners")
 
-    results = existing_emails.copy() if skip_existing else {}
     processed = 0
+    found = 0
 
-    for project in winners:
+    engine = CandidateEngine.from_file(STUDENTS_FILE)
+
+    for project in winners():
+        found += 1
         project_id = str(project['id'])
 
         # Skip if already processed
         if skip_existing and project_id in results:
             continue
 
-        # Try to get student name from project data
-        # If not in data, we'll need to scrape it from the website
+        # Missing names were resolved by the pre-pass; never fetch pages here
         student_name = project.get('student_name')
 
         if not student_name:
-            # Scrape the project page to get student name
-            print(f"\nProject {project_id}: Fetching student name...")
-            url = f"https://abstracts.societyforscience.org/Home/FullAbstract?projectId={project_id}"
-            try:
-                response = requests.get(url, timeout=30, verify=False)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    content = soup.find('div', class_='container')
-                    if content:
-                        labels = content.find_all('strong')
-                        for label in labels:
-                            label_text = label.get_text(strip=True).lower()
-                            if 'finalist' in label_text or 'student' in label_text:
-                                # Use parent text approach
-                                parent = label.parent
-                                if parent and ':' in parent.get_text():
-                                    full_text = parent.get_text()
-                                    value = full_text.split(':', 1)[1].strip()
-                                    student_name = value.split('\n')[0].strip()
-                                    if student_name and len(student_name) < 100:
-                                        break
-                time.sleep(1)
-            except Exception as e:
-                print(f"  Error fetching student name: {e}")
-
-        if not student_name:
+            metrics.incr('winners_without_name')
             print(f"\nProject {project_id}: No student name found, skipping")
             continue
 
@@ -245,25 +260,49 @@ def scrape_winner_emails(limit=None, skip_existing=True):
         print(f"  Title: {project.get('title', 'N/A')[:60]}...")
         print(f"  Awards: {', '.join(project.get('awards', []))[:80]}")
 
-        # Search for email
-        email_result = find_email_for_person(
-            student_name,
-            project.get('title'),
-            project.get('year')
-        )
+        awards = list(project.get('awards', []))
+
+        # Candidates from the directory and address patterns; a certain one
+        # means no search queries are needed
+        with metrics.timer('candidates'):
+            candidates = engine.rank(student_name, awards, year=project.get('year'))
+        best = resolved(candidates)
+
+        if best:
+            metrics.incr('resolved_without_search')
+            email_result = {
+                'emails': [best['email']],
+                'linkedin_profiles': [],
+                'search_queries_used': [],
+            }
+        else:
+            # Search for email as "First Last", the way pages write it
+            email_result = find_email_for_person(
+                parse_name(student_name).display or student_name,
+                project.get('title'),
+                project.get('year')
+            )
+            # Rank the scraped addresses by evidence instead of set order
+            with metrics.timer('candidates'):
+                candidates = engine.rank(student_name, awards, hits=email_result['emails'],
+                                         year=project.get('year'))
+            hits = {e.lower() for e in email_result['emails']}
+            email_result['emails'] = [c['email'] for c in candidates if c['email'] in hits]
 
         # Save result
         results[project_id] = {
             'student_name': student_name,
             'project_title': project.get('title'),
             'year': project.get('year'),
-            'awards': project.get('awards', []),
+            'awards': awards,
             'emails': email_result['emails'],
+            'email_candidates': candidates[:CANDIDATES_KEPT],
             'linkedin_profiles': email_result['linkedin_profiles'],
             'search_queries': email_result['search_queries_used']
         }
 
         if email_result['emails']:
+            metrics.incr('winners_with_emails')
             print(f"  ✓ Found {len(email_result['emails'])} email(s): {', '.join(email_result['emails'])}")
         else:
             print(f"  ✗ No emails found")
@@ -272,21 +311,24 @@ def scrape_winner_emails(limit=None, skip_existing=True):
             print(f"  LinkedIn: {len(email_result['linkedin_profiles'])} profile(s) found")
 
         processed += 1
+        metrics.incr('winners_processed')
 
         # Save progress every 10 projects
         if processed % 10 == 0:
-            with open(EMAILS_FILE, 'w') as f:
-                json.dump(results, f, indent=2)
+            with metrics.timer('save'):
+                serialization.save(EMAILS_FILE, results)
             print(f"\n--- Saved progress: {processed} winners processed ---")
 
         # Rate limiting - be nice to servers
-        time.sleep(3)
+        if not best:
+            metrics.sleep(3)
 
     # Final save
-    with open(EMAILS_FILE, 'w') as f:
-        json.dump(results, f, indent=2)
+    with metrics.timer('save'):
+        serialization.save(EMAILS_FILE, results)
 
     print(f"\n=== Complete ===")
+    print(f"Award-winning projects seen: {found}")
     print(f"Processed: {processed} winners")
     print(f"Total results: {len(results)}")
     print(f"Results saved to: {EMAILS_FILE}")
@@ -295,12 +337,19 @@ def scrape_winner_emails(limit=None, skip_existing=True):
     with_emails = sum(1 for r in results.values() if r.get('emails'))
     print(f"Winners with emails found: {with_emails}/{len(results)}")
 
-if __name__ == "__main__":
-    import sys
+def main(argv=None):
+    # --profile[=pyinstrument] and --metrics PATH may appear anywhere
+    args, profiler, metrics_output = metrics.parse_flags(sys.argv[1:] if argv is None else argv)
+
+    parser = argparse.ArgumentParser(description="Find email addresses of ISEF award winners",
+                                     epilog=metrics.FLAGS_HELP)
+    parser.add_argument('limit', nargs='?', type=int, help="Stop after this many winners")
+    parser.add_argument('--no-resolve', dest='resolve', action='store_false',
+                        help="Skip the name-resolution pre-pass")
+    args = parser.parse_args(args)
 
-    # Allow specifying limit from command line
-    limit = None
-    if len(sys.argv) > 1:
-        limit = int(sys.argv[1])
+    with metrics.session('email_scraper', profiler, metrics_output):
+        scrape_winner_emails(limit=args.limit, resolve=args.resolve)
 
-    scrape_winner_emails(limit=limit)
+if __name__ == "__main__":
+    main()
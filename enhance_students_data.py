@@ -3,9 +3,10 @@
 Extract major from notes field and enhance student data
 """
 
-import json
 import re
 
+import serialization
+
 def extract_major_from_notes(notes):
     """Extract major from notes field"""
     if not notes:
@@ -49,19 +50,22 @@ def extract_major_from_notes(notes):
     # Return first major found, or empty string
     return majors[0] if majors else ''
 
+def add_majors(students):
+    """Set each student's major from their notes"""
+    for student in students:
+        student['major'] = extract_major_from_notes(student['notes'])
+    return students
+
 def main():
     """Enhance student data with extracted majors"""
 
     # Load student data
-    with open('data/students.json', 'r') as f:
-        students = json.load(f)
+    students = serialization.load('data/students.json', 'students')
 
     print(f"Processing {len(students)} student records...")
 
     # Extract majors
-    for student in students:
-        major = extract_major_from_notes(student['notes'])
-        student['major'] = major
+    add_majors(students)
 
     # Count majors
     major_counts = {}
@@ -75,8 +79,7 @@ def main():
         print(f"  {major}: {count}")
 
     # Save enhanced data
-    with open('data/students.json', 'w') as f:
-        json.dump(students, f, indent=2)
+    serialization.save('data/students.json', students)
 
     print(f"\nEnhanced student data saved to data/students.json")
 
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Join/enrichment stage for records keyed by project ID
+Streams projects.json, indexes only the IDs and fields that are needed,
+and copies them onto the target records (e.g. winner_emails.json)
+"""
+
+import argparse
+
+import serialization
+from jsonstream import iter_json_array
+
+PROJECTS_FILE = "data/projects.json"
+WINNERS_FILE = "data/winner_emails.json"
+
+# Project fields that can be copied onto target records
+ENRICHABLE_FIELDS = ('category', 'country', 'booth', 'primary_category', 'categories')
+DEFAULT_FIELDS = ('category', 'country')
+
+# Value used when the project exists but lacks the field
+FIELD_DEFAULTS = {
+    'categories': [],
+}
+
+def parse_field_mapping(specs):
+    """Parse ['category', 'primary_category:major'] into {source: target}"""
+    mapping = {}
+    for spec in specs:
+        source, _, target = spec.partition(':')
+        source = source.strip()
+        target = target.strip() or source
+        if source not in ENRICHABLE_FIELDS:
+            raise ValueError(f"Unknown field '{source}' (choose from {', '.join(ENRICHABLE_FIELDS)})")
+        mapping[source] = target
+    return mapping
+
+def build_index(projects, wanted_ids, fields):
+    """
+    Build {project_id: {field: value}} for the wanted IDs only.
+
+    Args:
+        projects: Iterable of project dicts (may be a stream)
+        wanted_ids: Set of project IDs as strings
+        fields: Project fields to keep
+
+    Returns:
+        Dictionary keyed by string project ID
+    """
+    index = {}
+    remaining = set(wanted_ids)
+
+    for project in projects:
+        project_id = str(project.get('id'))
+        if project_id not in remaining:
+            continue
+
+        index[project_id] = {
+            field: project.get(field, FIELD_DEFAULTS.get(field, ''))
+            for field in fields
+        }
+        remaining.discard(project_id)
+
+        # Stop reading once every wanted project has been seen
+        if not remaining:
+            break
+
+    return index
+
+def enrich_records(records, index, mapping, overwrite=False):
+    """
+    Copy indexed project fields onto records in place.
+
+    Args:
+        records: Dictionary of {project_id: record}
+        index: Output of build_index
+        mapping: {source_field: target_field}
+        overwrite: Replace values already present on the record
+
+    Returns:
+        Sorted list of project IDs whose record changed
+    """
+    changed = []
+
+    for project_id, record in records.items():
+        values = index.get(project_id)
+        if values is None:
+            continue
+
+        record_changed = False
+        for source, target in mapping.items():
+            if target in record and not overwrite:
+                continue
+            value = values[source]
+            if target in record and record[target] == value:
+                continue
+            record[target] = value
+            record_changed = True
+
+        if record_changed:
+            changed.append(project_id)
+
+    return sorted(changed)
+
+def save_records(path, records):
+    """Atomically write records to path"""
+    serialization.save(path, records)
+
+def enrich_file(target_file=WINNERS_FILE, projects_file=PROJECTS_FILE,
+                mapping=None, overwrite=False, dry_run=False):
+    """
+    Enrich a {project_id: record} JSON file with project fields.
+
+    The target file is only rewritten when at least one record changed.
+
+    Returns:
+        List of project IDs that were changed
+    """
+    if mapping is None:
+        mapping = {field: field for field in DEFAULT_FIELDS}
+
+    records = serialization.load(target_file)
+
+    # Only look up projects that still have something to fill in
+    if overwrite:
+        wanted_ids = set(records)
+    else:
+        wanted_ids = {
+            project_id for project_id, record in records.items()
+            if any(target not in record for target in mapping.values())
+        }
+
+    if not wanted_ids:
+        return []
+
+    index = build_index(iter_json_array(projects_file), wanted_ids, list(mapping))
+    changed = enrich_records(records, index, mapping, overwrite=overwrite)
+
+    if changed and not dry_run:
+        save_records(target_file, records)
+
+    return changed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy project fields onto records keyed by project ID")
+    parser.add_argument('target', nargs='?', default=WINNERS_FILE,
+                        help=f"JSON file of {{project_id: record}} to enrich (default: {WINNERS_FILE})")
+    parser.add_argument('--projects', default=PROJECTS_FILE,
+                        help=f"Projects file to join against (default: {PROJECTS_FILE})")
+    parser.add_argument('--field', '-f', action='append', dest='fields', metavar='SOURCE[:TARGET]',
+                        help=f"Field to copy, optionally renamed; repeatable. "
+                             f"Choices: {', '.join(ENRICHABLE_FIELDS)} (default: {', '.join(DEFAULT_FIELDS)})")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="Replace values that are already present")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Report changes without writing the file")
+    args = parser.parse_args(argv)
+
+    try:
+        mapping = parse_field_mapping(args.fields or DEFAULT_FIELDS)
+    except ValueError as e:
+        parser.error(str(e))
+
+    changed = enrich_file(args.target, args.projects, mapping,
+                          overwrite=args.overwrite, dry_run=args.dry_run)
+
+    action = "Would enhance" if args.dry_run else "Enhanced"
+    print(f"{action} {len(changed)} records in {args.target} "
+          f"with {', '.join(f'{s}->{t}' if s != t else s for s, t in mapping.items())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Streaming export of winners and students tables
+Writes CSV, TSV, JSONL or Parquet (optionally gzipped) one row at a time,
+so memory stays bounded regardless of the size of the source file
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+
+from generate_table_data import WINNERS_FILE, iter_formatted_winners
+from jsonstream import iter_json_array
+
+STUDENTS_FILE = 'data/students.json'
+
+WINNER_COLUMNS = ['uni', 'year', 'first', 'last', 'major', 'email', 'notes', 'project_title']
+STUDENT_COLUMNS = ['uni', 'year', 'first', 'last', 'major', 'email', 'notes', 'source_file']
+
+DATASETS = {
+    'winners': (WINNERS_FILE, WINNER_COLUMNS),
+    'students': (STUDENTS_FILE, STUDENT_COLUMNS),
+}
+
+FORMATS = ('csv', 'tsv', 'jsonl', 'parquet')
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_SIZE = 10000
+
+def iter_rows(dataset, path=None):
+    """Stream row dicts for a dataset ('winners' or 'students')"""
+    default_path, _ = DATASETS[dataset]
+    path = path or default_path
+    if dataset == 'winners':
+        return iter_formatted_winners(path)
+    return iter_json_array(path)
+
+def filter_rows(rows, years=None, has_email=False, categories=None):
+    """
+    Filter a stream of rows.
+
+    Args:
+        rows: Iterable of row dicts
+        years: Collection of years (strings) to keep, or None for all
+        has_email: Keep only rows with an email address
+        categories: Collection of categories/majors to keep (case-insensitive)
+    """
+    years = {str(y) for y in years} if years else None
+    categories = {c.lower() for c in categories} if categories else None
+
+    for row in rows:
+        if years is not None and str(row.get('year', '')) not in years:
+            continue
+        if has_email and not row.get('email'):
+            continue
+        if categories is not None and (row.get('major') or '').lower() not in categories:
+            continue
+        yield row
+
+def guess_format(path):
+    """Infer (format, gzip) from an output file name"""
+    name = path.lower()
+    compressed = name.endswith('.gz')
+    if compressed:
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith('.' + fmt):
+            return fmt, compressed
+    return None, compressed
+
+def _open_text(path, compress):
+    if path == '-':
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'),
+                                    encoding='utf-8', newline='')
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=True)
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def _cell(value):
+    if isinstance(value, list):
+        return '; '.join(str(v) for v in value)
+    return '' if value is None else value
+
+def write_delimited(rows, columns, out, delimiter=','):
+    """Write rows as CSV/TSV with a header line; returns the row count"""
+    writer = csv.writer(out, delimiter=delimiter, lineterminator='\n')
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_cell(row.get(col)) for col in columns])
+        count += 1
+    return count
+
+def write_jsonl(rows, columns, out):
+    """Write rows as one JSON object per line; returns the row count"""
+    count = 0
+    for row in rows:
+        out.write(json.dumps({col: row.get(col, '') for col in columns}, ensure_ascii=False))
+        out.write('\n')
+        count += 1
+    return count
+
+def write_parquet(rows, columns, path, compress=False, batch_size=PARQUET_BATCH_SIZE):
+    """Write rows to Parquet in bounded row groups; returns the row count"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    if path == '-':
+        raise ValueError("Parquet output cannot be written to stdout")
+
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    count = 0
+    batch = {col: [] for col in columns}
+
+    # Parquet compresses internally; --gzip selects gzip column compression
+    with pq.ParquetWriter(path, schema, compression='gzip' if compress else 'snappy') as writer:
+        for row in rows:
+            for col in columns:
+                value = _cell(row.get(col))
+                batch[col].append(str(value))
+            count += 1
+            if count % batch_size == 0:
+                writer.write_table(pa.table(batch, schema=schema))
+                batch = {col: [] for col in columns}
+        if batch[columns[0]]:
+            writer.write_table(pa.table(batch, schema=schema))
+
+    return count
+
+def export(dataset, output, fmt=None, columns=None, source=None,
+           years=None, has_email=False, categories=None, compress=None):
+    """
+    Stream a dataset to output.
+
+    Args:
+        dataset: 'winners' or 'students'
+        output: Output path, or '-' for stdout
+        fmt: One of FORMATS; inferred from the output name when None
+        columns: Columns to write (defaults to all columns of the dataset)
+        source: Source JSON file (defaults to the dataset's data file)
+        years, has_email, categories: Row filters, see filter_rows
+        compress: Gzip the output; inferred from a .gz suffix when None
+
+    Returns:
+        Number of rows written
+    """
+    guessed_fmt, guessed_gzip = guess_format(output)
+    fmt = fmt or guessed_fmt or 'csv'
+    compress = guessed_gzip if compress is None else compress
+
+    _, all_columns = DATASETS[dataset]
+    columns = columns or all_columns
+
+    rows = filter_rows(iter_rows(dataset, source), years, has_email, categories)
+
+    if fmt == 'parquet':
+        return write_parquet(rows, columns, output, compress)
+
+    out = _open_text(output, compress)
+    try:
+        if fmt == 'jsonl':
+            return write_jsonl(rows, columns, out)
+        return write_delimited(rows, columns, out, '\t' if fmt == 'tsv' else ',')
+    finally:
+        if output == '-' and not compress:
+            # Leave sys.stdout open for the caller
+            out.flush()
+            out.detach()
+        else:
+            out.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export winners or students tables")
+    parser.add_argument('dataset', choices=sorted(DATASETS))
+    parser.add_argument('output', help="Output file ('-' for stdout); format is inferred from the extension")
+    parser.add_argument('--format', choices=FORMATS, dest='fmt')
+    parser.add_argument('--gzip', action='store_true', default=None, help="Gzip the output")
+    parser.add_argument('--source', help="Source JSON file (default: the dataset's data file)")
+    parser.add_argument('--columns', help="Comma-separated columns to write")
+    parser.add_argument('--year', action='append', help="Keep only this year; repeatable")
+    parser.add_argument('--category', action='append',
+                        help="Keep only this category/major (case-insensitive); repeatable")
+    parser.add_argument('--has-email', action='store_true', help="Keep only rows with an email")
+    args = parser.parse_args(argv)
+
+    columns = None
+    if args.columns:
+        columns = [c.strip() for c in args.columns.split(',') if c.strip()]
+        unknown = [c for c in columns if c not in DATASETS[args.dataset][1]]
+        if unknown:
+            parser.error(f"unknown column(s) for {args.dataset}: {', '.join(unknown)}")
+
+    try:
+        count = export(args.dataset, args.output, args.fmt, columns, args.source,
+                       args.year, args.has_email, args.category, args.gzip)
+    except (RuntimeError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+
+    if args.output != '-':
+        print(f"Exported {count} {args.dataset} rows to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,12 @@ Extract student data from .docx files and convert to structured JSON
 
 import json
 import re
-from docx import Document
-from docx.table import Table
-from docx.text.paragraph import Paragraph
+
+import serialization
 
 def extract_tables_from_docx(filename):
     """Extract all tables from a .docx file"""
+    from docx import Document
     doc = Document(filename)
     tables_data = []
 
@@ -27,6 +27,7 @@ def extract_tables_from_docx(filename):
 
 def extract_text_from_docx(filename):
     """Extract all text from a .docx file"""
+    from docx import Document
     doc = Document(filename)
     full_text = []
 
@@ -134,8 +135,7 @@ def main():
 
     # Save to JSON
     output_file = 'data/students.json'
-    with open(output_file, 'w') as f:
-        json.dump(all_students, f, indent=2)
+    serialization.save(output_file, all_students)
 
     print(f"Saved to {output_file}")
 
@@ -4,78 +4,71 @@ Generate formatted table data from winner_emails.json
 Extracts university, major, and formats data for the winners table
 """
 
+import argparse
 import json
-import re
+import os
 
-def parse_name(name_str):
-    """Parse 'Last, First' format into separate fields"""
-    if not name_str or ',' not in name_str:
-        return '', name_str or ''
-
-    parts = name_str.split(',', 1)
-    return parts[0].strip(), parts[1].strip()
-
-def extract_university(awards):
-    """Extract university name from awards"""
-    if not awards:
-        return ''
-
-    for award in awards:
-        # Look for university patterns
-        patterns = [
-            r'([\w\s]+University(?: of [\w\s]+)?)',
-            r'([\w\s]+Institute(?: of [\w\s]+)?)',
-            r'([\w\s]+College)',
-            r'(MIT|Stanford|Harvard|Yale|Princeton|Cornell|Columbia|Penn State|UC Berkeley|UCLA|USC|Caltech|Carnegie Mellon)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, award, re.IGNORECASE)
-            if match:
-                uni = match.group(1).strip()
-                # Clean up common prefixes
-                uni = re.sub(r'^(The |A )', '', uni)
-                return uni
-
-    return ''
-
-def load_and_format_data():
-    """Load winner emails and format for table"""
-
-    with open('data/winner_emails.json', 'r') as f:
-        data = json.load(f)
-
-    formatted_winners = []
-
-    for project_id, winner in data.items():
-        last_name, first_name = parse_name(winner.get('student_name', ''))
-        uni = extract_university(winner.get('awards', []))
-        year = winner.get('year', '')
-
-        # Try to get category from project data
-        category = winner.get('category', '')
+from jsonstream import iter_json_object
+from names import parse_name as parse_student_name
+from universities import extract_university
 
-        # Get email
-        emails = winner.get('emails', [])
-        email = emails[0] if emails else ''
+WINNERS_FILE = 'data/winner_emails.json'
+TABLE_FILE = 'data/winners_table.json'
+PAGE_SIZE = 100
 
-        # Format notes from awards
-        awards = winner.get('awards', [])
-        notes = '; '.join(awards) if awards else ''
+# Columns shipped to winners-table.html, in display order
+TABLE_COLUMNS = ['uni', 'year', 'first', 'last', 'major', 'email', 'notes']
 
-        formatted_winners.append({
-            'uni': uni,
-            'year': year,
-            'first': first_name,
-            'last': last_name,
-            'major': category,
-            'email': email,
-            'notes': notes,
-            'project_title': winner.get('project_title', ''),
-            'linkedin': winner.get('linkedin_profiles', [])
-        })
+def parse_name(name_str):
+    """(last, first) of the first member of a 'Last, First' student_name"""
+    primary = parse_student_name(name_str).primary
+    first = ' '.join(filter(None, (primary.first, primary.middle)))
+    last = ' '.join(filter(None, (primary.last, primary.suffix)))
+    return last, first
+
+def format_winner(winner):
+    """Format a single winner_emails.json record as a table row dict"""
+    last_name, first_name = parse_name(winner.get('student_name', ''))
+    uni = winner.get('uni') or extract_university(winner.get('awards', []))
+    year = winner.get('year', '')
+
+    # Try to get category from project data
+    category = winner.get('category', '')
+
+    # Get email
+    emails = winner.get('emails', [])
+    email = emails[0] if emails else ''
+
+    # Format notes from awards
+    awards = winner.get('awards', [])
+    notes = '; '.join(awards) if awards else ''
+
+    # Team entries: the first member fills the name columns
+    teammates = parse_student_name(winner.get('student_name', '')).members[1:]
+    if teammates:
+        team = f"Team with {', '.join(m.display for m in teammates)}"
+        notes = f"{team}; {notes}" if notes else team
+
+    return {
+        'uni': uni,
+        'year': year,
+        'first': first_name,
+        'last': last_name,
+        'major': category,
+        'email': email,
+        'notes': notes,
+        'project_title': winner.get('project_title', ''),
+        'linkedin': winner.get('linkedin_profiles', [])
+    }
+
+def iter_formatted_winners(path=WINNERS_FILE):
+    """Stream formatted winners from path without loading the whole file"""
+    for project_id, winner in iter_json_object(path):
+        yield format_winner(winner)
 
-    return formatted_winners
+def load_and_format_data():
+    """Load winner emails and format for table"""
+    return list(iter_formatted_winners(WINNERS_FILE))
 
 def print_table(winners):
     """Print winners in tab-separated table format"""
@@ -94,6 +87,82 @@ def print_table(winners):
     print(f"\nTotal winners: {len(winners)}")
     print(f"With emails: {sum(1 for w in winners if w['email'])}")
 
-if __name__ == '__main__':
+def sort_permutation(rows, column_index):
+    """Row indices ordered by a column, compared case-insensitively like the browser did"""
+    return sorted(range(len(rows)), key=lambda i: rows[i][column_index].lower())
+
+def build_table(winners, page_size=PAGE_SIZE):
+    """
+    Build the slim, row-oriented table used by winners-table.html.
+
+    Returns:
+        (rows, pages, sort) where rows are lists in TABLE_COLUMNS order,
+        pages are row slices of page_size, and sort maps each column to
+        the ascending row permutation (descending is its reverse)
+    """
+    rows = [[str(w.get(col) or '') for col in TABLE_COLUMNS] for w in winners]
+    pages = [rows[i:i + page_size] for i in range(0, len(rows), page_size)] or [[]]
+    sort = {col: sort_permutation(rows, i) for i, col in enumerate(TABLE_COLUMNS)}
+    return rows, pages, sort
+
+def export_table(winners, path=TABLE_FILE, page_size=PAGE_SIZE):
+    """
+    Write the table as a small manifest plus page and sort files.
+
+    The manifest embeds the first page so the browser can render it from
+    a single request; the remaining pages and sort permutations live next
+    to it in a directory named after the manifest.
+    """
+    rows, pages, sort = build_table(winners, page_size)
+
+    base = os.path.splitext(path)[0]
+    chunk_dir = base
+    rel_dir = os.path.basename(base)
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    # Remove chunks left over from a larger previous export
+    for name in os.listdir(chunk_dir):
+        if name.startswith('page-') and name.endswith('.json'):
+            os.remove(os.path.join(chunk_dir, name))
+
+    chunks = []
+    for number, page in enumerate(pages[1:], start=1):
+        name = f'page-{number:04d}.json'
+        with open(os.path.join(chunk_dir, name), 'w') as f:
+            json.dump(page, f, separators=(',', ':'))
+        chunks.append(f'{rel_dir}/{name}')
+
+    with open(os.path.join(chunk_dir, 'sort.json'), 'w') as f:
+        json.dump(sort, f, separators=(',', ':'))
+
+    manifest = {
+        'columns': TABLE_COLUMNS,
+        'total': len(rows),
+        'with_email': sum(1 for w in winners if w.get('email')),
+        'page_size': page_size,
+        'first_page': pages[0],
+        'chunks': chunks,
+        'sort': f'{rel_dir}/sort.json',
+    }
+    with open(path, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Format winner_emails.json for the winners table")
+    parser.add_argument('--export', nargs='?', const=TABLE_FILE, metavar='PATH',
+                        help=f"Write the paginated table for winners-table.html (default: {TABLE_FILE})")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+
     winners = load_and_format_data()
-    print_table(winners)
+    if args.export:
+        manifest = export_table(winners, args.export, args.page_size)
+        print(f"Exported {manifest['total']} winners to {args.export} "
+              f"({len(manifest['chunks']) + 1} pages of {args.page_size})")
+    else:
+        print_table(winners)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for all outbound requests
+- Classifies failures: not found vs transient vs permanent
+- Retries transient failures with jittered exponential backoff
+- Per-host circuit breakers so a failing host is skipped instead of hammered
+- Dead-letter list of IDs to retry later
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import metrics
+
+DEAD_LETTER_FILE = "data/dead_letters.jsonl"
+
+# Status codes worth retrying; everything else >= 400 is permanent
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+class FetchError(Exception):
+    """Base class for classified HTTP failures"""
+
+    def __init__(self, message, url=None, status=None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+class NotFound(FetchError):
+    """The resource does not exist (404/410); don't retry"""
+
+class PermanentError(FetchError):
+    """A client error that retrying won't fix"""
+
+class TransientError(FetchError):
+    """Timeouts, connection errors, 429 and 5xx; worth retrying later"""
+
+class CircuitOpen(TransientError):
+    """The host's circuit breaker is open; the request was not sent"""
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive transient failures.
+    Open -> half-open after reset_timeout; one trial request decides whether
+    it closes again or re-opens.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without a verdict on the host"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a trial request through"""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    metrics.incr('circuit_opened')
+                self.opened_at = self.clock()
+            self.trial_in_flight = False
+
+def classify_status(status, url):
+    """Return the FetchError for a non-200 status, or None for success"""
+    if status == 200:
+        return None
+    if status in (404, 410):
+        return NotFound(f"{status} for {url}", url, status)
+    if status in TRANSIENT_STATUSES:
+        return TransientError(f"{status} for {url}", url, status)
+    return PermanentError(f"{status} for {url}", url, status)
+
+def _quiet_insecure_warnings():
+    """Silence urllib3's warning for the unverified retries ssl_fallback makes"""
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+def backoff_delay(attempt, base=1.0, cap=60.0, rng=random):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))"""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+class HttpClient:
+    """
+    Thread-safe GET client with retries and per-host circuit breakers.
+
+    Args:
+        retries: Retries after the first attempt for transient failures
+        backoff: Base delay in seconds for the exponential backoff
+        max_backoff: Upper bound for a single delay
+        timeout: Per-request timeout in seconds
+        failure_threshold, reset_timeout: Circuit breaker settings per host
+        headers: Default headers sent with every request
+        ssl_fallback: Retry without certificate verification on SSL errors
+        wait_when_open: Block until an open breaker allows a trial request
+            instead of raising CircuitOpen (for single-host scrapers)
+        session_factory: Returns a requests-like session; one is made per thread
+    """
+
+    def __init__(self, retries=4, backoff=1.0, max_backoff=60.0, timeout=30,
+                 failure_threshold=5, reset_timeout=60.0, headers=None,
+                 ssl_fallback=False, wait_when_open=False, session_factory=None, sleep=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.headers = headers or {}
+        self.ssl_fallback = ssl_fallback
+        self.wait_when_open = wait_when_open
+        self.session_factory = session_factory
+        self.sleep = sleep or metrics.sleep
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if self.session_factory is None:
+                import requests
+                self.session_factory = requests.Session
+            session = self._local.session = self.session_factory()
+        return session
+
+    def breaker(self, host):
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _send(self, url, headers, kwargs):
+        import requests
+
+        session = self._session()
+        try:
+            try:
+                return session.get(url, headers=headers, timeout=self.timeout, **kwargs)
+            except requests.exceptions.SSLError:
+                if not self.ssl_fallback:
+                    raise
+                metrics.incr('ssl_retries')
+                _quiet_insecure_warnings()
+                return session.get(url, headers=headers, timeout=self.timeout, verify=False, **kwargs)
+        # Chunked/content decoding errors mean the connection broke mid-body
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError) as e:
+            raise TransientError(f"{type(e).__name__} for {url}: {e}", url) from e
+        except requests.exceptions.RequestException as e:
+            raise PermanentError(f"{type(e).__name__} for {url}: {e}", url) from e
+
+    def get(self, url, headers=None, **kwargs):
+        """
+        GET url and return the 200 response.
+
+        Raises:
+            NotFound, PermanentError: not retried
+            TransientError: retries exhausted
+            CircuitOpen: the host's breaker is open
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker(host)
+        merged_headers = {**self.headers, **(headers or {})}
+
+        for attempt in range(self.retries + 1):
+            while not breaker.allow():
+                if not self.wait_when_open:
+                    metrics.incr('circuit_rejected')
+                    raise CircuitOpen(f"circuit open for {host}", url)
+                # Another request may hold the half-open trial; poll until it settles
+                self.sleep(max(0.5, breaker.retry_in()), 'circuit_wait')
+
+            try:
+                response = self._send(url, merged_headers, kwargs)
+                error = classify_status(response.status_code, url)
+            except FetchError as e:
+                response, error = None, e
+            except BaseException:
+                # Never leave a half-open breaker waiting on a trial that is gone
+                breaker.release_trial()
+                raise
+
+            if error is None or not isinstance(error, TransientError):
+                # Not-found and permanent errors mean the host itself is healthy
+                breaker.record_success()
+                if error is not None:
+                    raise error
+                return response
+
+            breaker.record_failure()
+            metrics.incr('http_transient_errors')
+            if attempt == self.retries:
+                raise error
+
+            delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+            retry_after = response.headers.get('Retry-After') if response is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = min(self.max_backoff, max(delay, float(retry_after)))
+            metrics.incr('http_retries')
+            self.sleep(delay, 'retry_backoff')
+
+class DeadLetters:
+    """
+    Append-only JSONL list of IDs whose fetch failed transiently.
+
+    Appending one short line per failure keeps concurrent writers (threads
+    or processes) from clobbering each other.
+    """
+
+    def __init__(self, path=DEAD_LETTER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, item_id, reason, kind='project'):
+        record = {'id': item_id, 'kind': kind, 'reason': str(reason), 'time': time.time()}
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        metrics.incr('dead_letters')
+
+    def _records(self):
+        """Every parseable record in file order; corrupt lines are skipped"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def load(self, kind='project'):
+        """Return {id: latest record} for the given kind"""
+        return {record['id']: record for record in self._records()
+                if record.get('kind', 'project') == kind}
+
+    def replace(self, records):
+        """Rewrite the list with only the given records"""
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            os.replace(tmp_path, self.path)
+
+    def discard(self, ids, kind='project', before=None):
+        """
+        Drop the records of one kind for the given ids, keeping the others.
+        With before, records added at or after that time are kept too.
+        """
+        ids = set(ids)
+        if not ids or not os.path.exists(self.path):
+            return
+        self.replace([record for record in self._records()
+                      if record.get('kind', 'project') != kind or record['id'] not in ids
+                      or (before is not None and record.get('time', 0) >= before)])
+
+    def clear(self, kind='project'):
+        """Drop every record of one kind, keeping the others"""
+        if not os.path.exists(self.path):
+            return
+        self.replace([record for record in self._records()
+                      if record.get('kind', 'project') != kind])
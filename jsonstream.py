@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON readers and writers for large data files
+- Yields the elements of a top-level JSON array (or the items of a top-level
+  JSON object) without loading the whole file
+- Reads JSON Lines files record by record
+- Writes arrays one element at a time, or appends to an existing array in place
+"""
+
+import json
+import os
+
+import serialization
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+def _skip(buf, pos, chars):
+    """Advance pos past any characters in chars"""
+    while pos < len(buf) and buf[pos] in chars:
+        pos += 1
+    return pos
+
+def _decode_value(buf, pos, closer, eof):
+    """Decode one value at pos, or return None if it may be cut off by the buffer end"""
+    try:
+        value, end = _decoder.raw_decode(buf, pos)
+    except json.JSONDecodeError:
+        if eof:
+            raise
+        return None
+
+    # A number or literal is only complete once a delimiter follows it
+    if not eof and not isinstance(value, (dict, list, str)):
+        if end == len(buf) or buf[end] not in _WHITESPACE + ',' + closer:
+            return None
+
+    return value, end
+
+def _decode_pair(buf, pos, eof):
+    """Decode one "key": value member at pos, or None if it is incomplete"""
+    decoded = _decode_value(buf, pos, '}', eof)
+    if decoded is None:
+        return None
+    key, pos = decoded
+    if not isinstance(key, str):
+        raise ValueError(f"expected a string key at offset {pos}")
+
+    pos = _skip(buf, pos, _WHITESPACE)
+    if pos >= len(buf):
+        if eof:
+            raise ValueError("unexpected end of file after object key")
+        return None
+    if buf[pos] != ':':
+        raise ValueError(f"expected ':' after object key {key!r}")
+
+    pos = _skip(buf, pos + 1, _WHITESPACE)
+    decoded = _decode_value(buf, pos, '}', eof)
+    if decoded is None:
+        return None
+    value, end = decoded
+    return (key, value), end
+
+def _iter_container(path, opener, closer, chunk_size):
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        pos = _skip(buf, 0, _WHITESPACE)
+        if pos >= len(buf) or buf[pos] != opener:
+            kind = 'array' if opener == '[' else 'object'
+            raise ValueError(f"{path}: expected a top-level JSON {kind}")
+        pos += 1
+        eof = False
+
+        while True:
+            pos = _skip(buf, pos, _WHITESPACE + ',')
+            if pos < len(buf) and buf[pos] == closer:
+                return
+
+            if opener == '[':
+                decoded = _decode_value(buf, pos, closer, eof)
+            else:
+                decoded = _decode_pair(buf, pos, eof)
+
+            if decoded is None:
+                # Element straddles the chunk boundary; read more and retry
+                more = f.read(chunk_size)
+                buf = buf[pos:] + more
+                pos = 0
+                eof = not more
+                continue
+
+            item, pos = decoded
+            yield item
+
+            # Drop consumed text so the buffer stays bounded
+            if pos > chunk_size:
+                buf = buf[pos:]
+                pos = 0
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """Yield each element of the top-level JSON array stored in path"""
+    return _iter_container(path, '[', ']', chunk_size)
+
+def iter_json_object(path, chunk_size=CHUNK_SIZE):
+    """Yield (key, value) for each member of the top-level JSON object stored in path"""
+    return _iter_container(path, '{', '}', chunk_size)
+
+def iter_jsonl(path):
+    """Yield each record of a JSON Lines file, skipping blank lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """Yield records from a .jsonl file or a top-level JSON array"""
+    if path.endswith('.jsonl'):
+        return iter_jsonl(path)
+    return iter_json_array(path, chunk_size)
+
+def _format_element(record, indent):
+    """Format one array element: compact, or the way json.dump(records, f, indent=indent) would"""
+    if indent is None:
+        return serialization.dumps(record).decode('utf-8')
+    pad = ' ' * indent
+    return pad + json.dumps(record, indent=indent).replace('\n', '\n' + pad)
+
+class JsonArrayWriter:
+    """
+    Write a JSON array one element at a time.
+
+    With an indent the output matches json.dump(records, f, indent=indent);
+    indent=None writes compact JSON. It is written to a temporary file and only replaces path when the block exits cleanly:
+
+        with JsonArrayWriter(path) as out:
+            for record in records:
+                out.write(record)
+    """
+
+    def __init__(self, path, indent=2):
+        self.path = path
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = path + '.tmp'
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write('[')
+        return self
+
+    def write(self, record):
+        sep = ''
+        if self.count:
+            sep = ',\n' if self.indent is not None else ','
+        elif self.indent is not None:
+            sep = '\n'
+        self._file.write(sep + _format_element(record, self.indent))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self._tmp_path)
+            return False
+        if self.count and self.indent is not None:
+            self._file.write('\n')
+        self._file.write(']')
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return False
+
+def write_json_array(path, records, indent=2):
+    """Stream records into path as a JSON array; returns the number written"""
+    with JsonArrayWriter(path, indent) as out:
+        for record in records:
+            out.write(record)
+    return out.count
+
+def append_json_array(path, records, indent=2):
+    """
+    Append records to the JSON array in path without reading it.
+
+    Only the tail of the file is touched: the closing bracket is overwritten
+    with the new elements. Creates the file if it doesn't exist.
+    """
+    records = list(records)
+    if not os.path.exists(path):
+        return write_json_array(path, records, indent)
+    if not records:
+        return 0
+
+    with open(path, 'rb+') as f:
+        # Find the closing bracket, then whatever precedes it
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        closing = None
+        while pos > 0:
+            pos -= 1
+            f.seek(pos)
+            char = f.read(1)
+            if closing is None:
+                if char == b']':
+                    closing = pos
+                elif char not in b' \t\r\n':
+                    raise ValueError(f"{path}: does not end with a JSON array")
+            elif char not in b' \t\r\n':
+                break
+        if closing is None:
+            raise ValueError(f"{path}: does not end with a JSON array")
+
+        empty = char == b'['
+        sep = ',\n' if indent is not None else ','
+        body = sep.join(_format_element(r, indent) for r in records)
+        if indent is not None:
+            body = '\n' + body + '\n'
+        if not empty:
+            body = ',' + body
+        f.seek(pos + 1)
+        f.truncate()
+        f.write((body + ']').encode('utf-8'))
+    return len(records)
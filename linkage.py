@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Record linkage between ISEF winners and university student directories
+- Names are parsed once by names.py; each member of a team entry
+  is matched separately
+- Blocking: students are indexed by (normalized last name, first initial) and
+  by (Soundex of last name, first initial), so each winner is only compared
+  with the few students sharing a block instead of the whole directory
+- Scoring: Jaro-Winkler name similarity, graduation-year plausibility and
+  ISEF category / declared major affinity
+- Output: the best match per winner with a confidence and its components
+
+Usage:
+    python linkage.py                         # report matches
+    python linkage.py --output data/winner_student_links.json
+    python linkage.py --bench 200000          # time linkage on a synthetic directory
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import serialization
+from categorizer import normalize_category
+from names import parse_name, person
+
+WINNERS_FILE = "data/winner_emails.json"
+STUDENTS_FILE = "data/students.json"
+LINKS_FILE = "data/winner_student_links.json"
+
+MIN_CONFIDENCE = 0.75
+MIN_NAME_SCORE = 0.85
+MIN_LAST_SCORE = 0.9
+MIN_FIRST_SCORE = 0.85
+
+# Component weights of the confidence
+NAME_WEIGHT = 0.65
+YEAR_WEIGHT = 0.2
+AFFINITY_WEIGHT = 0.15
+
+# Words in a declared major that fit each category, by categorizer.py name
+CATEGORY_MAJORS = {
+    'Animal Sciences': ['biology', 'ecology', 'evolutionary', 'zoology'],
+    'Behavioral & Social Sciences': ['psychology', 'cognitive', 'economics', 'sociology', 'political'],
+    'Biochemistry': ['biochemistry', 'chemistry', 'biophysics', 'molecular'],
+    'Biomedical & Health Sciences': ['biology', 'neuroscience', 'health', 'biomedical', 'molecular'],
+    'Biomedical Engineering': ['biomedical', 'engineering'],
+    'Cellular & Molecular Biology': ['molecular', 'cellular', 'biology', 'biophysics'],
+    'Chemistry': ['chemistry', 'chemical'],
+    'Computational Biology & Bioinformatics': ['computer', 'computational', 'biology', 'statistics', 'data'],
+    'Computational Science': ['computer', 'computing', 'mathematics', 'statistics', 'data'],
+    'Earth & Environmental Sciences': ['environmental', 'earth', 'geology', 'ecology', 'planetary'],
+    'Embedded Systems': ['electrical', 'computer', 'engineering'],
+    'Energy: Sustainable Materials & Design': ['engineering', 'environmental', 'physics', 'chemical'],
+    'Engineering Technology: Statics & Dynamics': ['engineering', 'mechanical', 'architecture'],
+    'Engineering: Materials & Chemical': ['chemical', 'materials', 'engineering', 'chemistry'],
+    'Engineering: Mechanical': ['mechanical', 'engineering'],
+    'Environmental Engineering': ['environmental', 'engineering'],
+    'Mathematics': ['mathematics', 'statistics', 'applied math'],
+    'Microbiology': ['biology', 'microbiology', 'molecular'],
+    'Physics': ['physics', 'astronomy', 'astrophysics'],
+    'Plant Sciences': ['biology', 'ecology', 'environmental'],
+    'Robotics & Intelligent Machines': ['computer', 'mechanical', 'electrical', 'engineering'],
+    'Software Systems': ['computer', 'computing', 'engineering'],
+}
+
+def jaro_winkler(a, b, prefix_scale=0.1):
+    """Jaro-Winkler similarity of two strings in [0, 1]"""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+
+    window = max(len(a), len(b)) // 2 - 1
+    a_flags = [False] * len(a)
+    b_flags = [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_flags[j] and b[j] == char:
+                a_flags[i] = b_flags[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i, char in enumerate(a):
+        if a_flags[i]:
+            while not b_flags[j]:
+                j += 1
+            if char != b[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions / 2) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+def last_name_score(last, student_last):
+    """
+    Similarity of folded last names, words separated by spaces.
+
+    One name being a word of the other ("measelle" / "ablow measelle")
+    scores 0.95: compound surnames are often shortened.
+    """
+    score = jaro_winkler(last.replace(' ', ''), student_last.replace(' ', ''))
+    if score < 0.95 and (last in student_last.split() or student_last in last.split()):
+        score = 0.95
+    return score
+
+def name_score(first, last, student_first, student_last):
+    """Weighted similarity of folded first and last names, or 0.0 if either clearly differs"""
+    last_score = last_name_score(last, student_last)
+    if last_score < MIN_LAST_SCORE:
+        return 0.0
+    if first and student_first and (student_first.startswith(first) or first.startswith(student_first)):
+        # Nicknames and initials: "sam" / "samuel", "a" / "alexander"
+        first_score = max(0.9, jaro_winkler(first, student_first))
+    else:
+        first_score = jaro_winkler(first, student_first)
+    if first_score < MIN_FIRST_SCORE:
+        return 0.0
+    return 0.6 * last_score + 0.4 * first_score
+
+def year_score(isef_year, grad_year):
+    """How plausible it is that an ISEF finalist of isef_year graduates in grad_year"""
+    try:
+        gap = int(grad_year) - int(isef_year)
+    except (TypeError, ValueError):
+        return 0.5
+    if 2 <= gap <= 6:
+        return 1.0
+    if gap in (1, 7):
+        return 0.6
+    if 0 <= gap <= 9:
+        return 0.3
+    return 0.0
+
+def affinity_score(category, major):
+    """1.0 if the declared major fits the ISEF category, 0.5 if unknown, 0.2 if not"""
+    if not category or not major:
+        return 0.5
+    # winner_emails.json carries ISEF names ('Physics and Astronomy')
+    words = CATEGORY_MAJORS.get(normalize_category(category))
+    if not words:
+        return 0.5
+    major = major.lower()
+    return 1.0 if any(word in major for word in words) else 0.2
+
+def blocking_keys(name):
+    """Keys shared by records that may be the same Person"""
+    first, last = name.folded_first, name.folded_last
+    if not first or not last:
+        return set()
+    initial = first[0]
+    keys = {('n', last, initial), ('s', name.phonetic, initial)}
+    # Compound last names: "ablow measelle" can appear as just "measelle"
+    for part in last.split():
+        if part != last and len(part) > 2:
+            keys.add(('n', part, initial))
+    return keys
+
+class StudentIndex:
+    """Students indexed by blocking key; each student is stored once"""
+
+    def __init__(self, students):
+        self.students = []
+        self.blocks = defaultdict(list)
+        for student in students:
+            name = person(student.get('first') or '', student.get('last') or '')
+            keys = blocking_keys(name)
+            if not keys:
+                continue
+            position = len(self.students)
+            self.students.append((name, student))
+            for key in keys:
+                self.blocks[key].append(position)
+
+    def candidates(self, name):
+        """Positions of the students sharing a block with a Person"""
+        positions = set()
+        for key in blocking_keys(name):
+            positions.update(self.blocks.get(key, ()))
+        return positions
+
+def link_winner(index, winner):
+    """
+    Best directory match for any member of one winner's entry.
+
+    Returns:
+        (match dict or None below MIN_CONFIDENCE, pairs compared)
+    """
+    category = winner.get('primary_category') or winner.get('category')
+    best = None
+    compared = 0
+    for member in parse_name(winner.get('student_name')).members:
+        candidates = index.candidates(member)
+        compared += len(candidates)
+        for position in candidates:
+            name, student = index.students[position]
+            names = name_score(member.folded_first, member.folded_last,
+                               name.folded_first, name.folded_last)
+            if names < MIN_NAME_SCORE:
+                continue
+            years = year_score(winner.get('year'), student.get('year'))
+            affinity = affinity_score(category, student.get('major'))
+            confidence = NAME_WEIGHT * names + YEAR_WEIGHT * years + AFFINITY_WEIGHT * affinity
+            if confidence >= MIN_CONFIDENCE and (best is None or confidence > best['confidence']):
+                best = {
+                    'member': member.display,
+                    'confidence': round(confidence, 4),
+                    'name_score': round(names, 4),
+                    'year_score': years,
+                    'affinity_score': affinity,
+                    'student': {k: student.get(k) for k in ('first', 'last', 'email', 'uni', 'year', 'major')},
+                }
+    return best, compared
+
+def link_all(winners, students):
+    """
+    Link every {id: winner} to the directory.
+
+    Returns:
+        ({project_id: match}, pairs_compared)
+    """
+    index = students if isinstance(students, StudentIndex) else StudentIndex(students)
+    links = {}
+    total = 0
+    for project_id, winner in winners.items():
+        match, compared = link_winner(index, winner)
+        total += compared
+        if match:
+            links[project_id] = match
+    return links, total
+
+_SYLLABLES = ['an', 'ber', 'cha', 'do', 'el', 'fin', 'gar', 'ho', 'is', 'ju', 'ka', 'lo',
+              'mar', 'ne', 'or', 'pa', 'qui', 'ro', 'sa', 'ti', 'u', 'ver', 'wen', 'ya', 'zo']
+
+def _name(rng):
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+def _typo(rng, name):
+    """Drop, double or swap one letter"""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.choice(('drop', 'double', 'swap'))
+    if edit == 'drop':
+        return name[:i] + name[i + 1:]
+    if edit == 'double':
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+def benchmark(directory_size, winner_count=5000, seed=0):
+    """
+    Time indexing and linkage against a synthetic directory.
+
+    synthetic.make_students draws from a few dozen names, which would put
+    thousands of students in every block; names are regenerated from
+    syllables so block sizes look like a real directory. Half the winners
+    are directory students (a third of them with a typo in the last name),
+    the rest are not in the directory.
+    """
+    from benchmarks import synthetic
+
+    rng = random.Random(seed)
+    students = synthetic.make_students(directory_size, seed)
+    for student in students:
+        student['first'], student['last'] = _name(rng), _name(rng)
+
+    winners = {}
+    for i in range(winner_count):
+        if i % 2 == 0:
+            student = rng.choice(students)
+            last = _typo(rng, student['last']) if rng.random() < 1 / 3 else student['last']
+            first, year = student['first'], str(int(student['year']) - 4)
+        else:
+            last, first, year = _name(rng), _name(rng), '2020'
+        winners[str(i)] = {'student_name': f"{last}, {first}", 'year': year}
+
+    start = time.perf_counter()
+    index = StudentIndex(students)
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    links, compared = link_all(winners, index)
+    linked = time.perf_counter() - start
+
+    true_links = sum(1 for project_id, match in links.items() if int(project_id) % 2 == 0)
+    print(f"{directory_size} students, {winner_count} winners")
+    print(f"  index: {indexed:.2f}s ({len(index.blocks)} blocks)")
+    print(f"  link:  {linked:.2f}s, {compared} pairs compared "
+          f"({compared / max(directory_size * winner_count, 1):.4%} of all pairs)")
+    print(f"  matched {true_links}/{(winner_count + 1) // 2} directory winners, "
+          f"{len(links) - true_links} outsiders")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Link ISEF winners to student directory records")
+    parser.add_argument('--winners', default=WINNERS_FILE)
+    parser.add_argument('--students', default=STUDENTS_FILE)
+    parser.add_argument('--output', help=f"Write matches to this file (e.g. {LINKS_FILE})")
+    parser.add_argument('--bench', type=int, metavar='N', help="Benchmark against N synthetic students")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        benchmark(args.bench)
+        return
+
+    winners = serialization.load(args.winners, 'winners')
+    students = serialization.load(args.students, 'students')
+    links, compared = link_all(winners, students)
+
+    print(f"Linked {len(links)}/{len(winners)} winners to {len(students)} directory records "
+          f"({compared} pairs compared)")
+    for project_id, match in sorted(links.items(), key=lambda item: -item[1]['confidence'])[:20]:
+        student = match['student']
+        print(f"  {project_id} {winners[project_id].get('student_name')!r} -> "
+              f"{student['first']} {student['last']} <{student['email']}> ({match['confidence']:.2f})")
+
+    if args.output:
+        serialization.save(args.output, links)
+        print(f"Matches written to {args.output}")
+
+if __name__ == '__main__':
+    main()
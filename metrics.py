@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Lightweight run instrumentation shared by the scrapers and the categorizer
+- Timers and counters around each stage (fetch, parse, save, search, sleep)
+- Optional cProfile/pyinstrument profiling
+- End-of-run summary table plus JSON or Prometheus text output
+
+Enable from the environment or the command line:
+    CURIOUSMAILS_PROFILE=cprofile|pyinstrument   or  --profile[=pyinstrument]
+    CURIOUSMAILS_METRICS=run.json|run.prom       or  --metrics run.json
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = 'CURIOUSMAILS_PROFILE'
+METRICS_ENV = 'CURIOUSMAILS_METRICS'
+PROFILERS = ('cprofile', 'pyinstrument')
+
+class Metrics:
+    """Thread-safe registry of stage timers and event counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # name -> [count, total_seconds, max_seconds]
+            self.timers = {}
+            self.counters = {}
+            self.started = time.perf_counter()
+            self.cpu_started = time.process_time()
+
+    def observe(self, name, seconds):
+        """Record one duration for a stage"""
+        with self._lock:
+            entry = self.timers.get(name)
+            if entry is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block as one occurrence of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name, amount=1):
+        """Increment an event counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def sleep(self, seconds, name='sleep'):
+        """time.sleep that is accounted for as its own stage"""
+        with self.timer(name):
+            time.sleep(seconds)
+
+    def snapshot(self):
+        """Return the current metrics as a plain dict"""
+        with self._lock:
+            wall = time.perf_counter() - self.started
+            cpu = time.process_time() - self.cpu_started
+            return {
+                'wall_seconds': wall,
+                'cpu_seconds': cpu,
+                'stages': {
+                    name: {'count': count, 'total_seconds': total, 'max_seconds': peak}
+                    for name, (count, total, peak) in sorted(self.timers.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def summary(self):
+        """Human-readable summary table"""
+        snap = self.snapshot()
+        wall = snap['wall_seconds'] or 1e-9
+        lines = [
+            f"{'stage':<20} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10} {'% wall':>7}",
+            '-' * 70,
+        ]
+        for name, stage in snap['stages'].items():
+            mean = stage['total_seconds'] / stage['count'] * 1000
+            lines.append(f"{name:<20} {stage['count']:>8} {stage['total_seconds']:>10.2f} "
+                         f"{mean:>10.1f} {stage['max_seconds'] * 1000:>10.1f} "
+                         f"{stage['total_seconds'] * 100 / wall:>6.1f}%")
+        lines.append('-' * 70)
+
+        # Stage totals can exceed wall time when worker threads overlap
+        cpu_share = snap['cpu_seconds'] * 100 / wall
+        bound = 'CPU bound' if cpu_share >= 50 else 'I/O or network bound'
+        lines.append(f"wall {snap['wall_seconds']:.2f}s, cpu {snap['cpu_seconds']:.2f}s "
+                     f"({cpu_share:.0f}% of wall: {bound})")
+
+        if snap['counters']:
+            lines.append('')
+            for name, value in snap['counters'].items():
+                lines.append(f"{name:<30} {value:>10}")
+        return '\n'.join(lines)
+
+    def to_prometheus(self, prefix='curiousmails'):
+        """Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, stage in snap['stages'].items():
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["total_seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+        lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+        for name, stage in snap['stages'].items():
+            lines.append(f'{prefix}_stage_max_seconds{{stage="{name}"}} {stage["max_seconds"]:.6f}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snap['counters'].items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        lines.append(f"# TYPE {prefix}_run_wall_seconds gauge")
+        lines.append(f"{prefix}_run_wall_seconds {snap['wall_seconds']:.6f}")
+        lines.append(f"# TYPE {prefix}_run_cpu_seconds gauge")
+        lines.append(f"{prefix}_run_cpu_seconds {snap['cpu_seconds']:.6f}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, run_name=None):
+        """Write metrics to path: Prometheus text for .prom, JSON otherwise"""
+        if path.endswith('.prom'):
+            content = self.to_prometheus()
+        else:
+            snap = self.snapshot()
+            if run_name:
+                snap = {'run': run_name, **snap}
+            content = json.dumps(snap, indent=2)
+        with open(path, 'w') as f:
+            f.write(content)
+
+# Default registry used by the scripts
+metrics = Metrics()
+timer = metrics.timer
+incr = metrics.incr
+observe = metrics.observe
+sleep = metrics.sleep
+
+# Epilog for the --help of scripts that call parse_flags()
+FLAGS_HELP = "Also accepts --profile[=cprofile|pyinstrument] and --metrics PATH."
+
+def parse_flags(argv):
+    """
+    Strip --profile[=NAME] and --metrics PATH from argv.
+
+    Returns:
+        (remaining_args, profiler_or_None, metrics_path_or_None), with the
+        environment variables used as defaults
+    """
+    profiler = os.environ.get(PROFILE_ENV) or None
+    output = os.environ.get(METRICS_ENV) or None
+    remaining = []
+
+    args = iter(argv)
+    for arg in args:
+        if arg == '--profile':
+            profiler = 'cprofile'
+        elif arg.startswith('--profile='):
+            profiler = arg.split('=', 1)[1]
+        elif arg == '--metrics':
+            output = next(args, None)
+        elif arg.startswith('--metrics='):
+            output = arg.split('=', 1)[1]
+        else:
+            remaining.append(arg)
+
+    if profiler is not None:
+        profiler = profiler.lower()
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}' (choose from {', '.join(PROFILERS)})")
+
+    return remaining, profiler, output
+
+def _start_profiler(profiler):
+    if profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        prof = Profiler()
+        prof.start()
+        return prof
+    import cProfile
+    prof = cProfile.Profile()
+    prof.enable()
+    return prof
+
+def _stop_profiler(profiler, prof, run_name):
+    if profiler == 'pyinstrument':
+        prof.stop()
+        print(prof.output_text(unicode=True, color=False))
+        return
+
+    import pstats
+    prof.disable()
+    stats_file = f"{run_name}.prof"
+    prof.dump_stats(stats_file)
+    print(f"\nProfile (main thread) saved to {stats_file}; top functions by cumulative time:")
+    pstats.Stats(prof).sort_stats('cumulative').print_stats(20)
+
+@contextmanager
+def session(run_name, profiler=None, output=None):
+    """
+    Instrument a whole run: reset metrics, optionally profile, and print the
+    summary (and write it to output) when the block exits.
+    """
+    metrics.reset()
+    prof = _start_profiler(profiler) if profiler else None
+    try:
+        yield metrics
+    finally:
+        if prof is not None:
+            _stop_profiler(profiler, prof, run_name)
+        print(f"\n=== {run_name} metrics ===")
+        print(metrics.summary())
+        if output:
+            metrics.write(output, run_name)
+            print(f"Metrics written to {output}")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Student name parsing shared by every script
+- Parses "Last, First", "First Middle Last" and team entries such as
+  "Aitken, Catherine Jian, Dana" into structured members
+- Keeps suffixes (Jr., III) apart from the last name
+- Precomputes folded (accent-free, lowercase) and Soundex keys per member
+- Memoized over distinct raw strings, so each name is parsed once per run
+  however many scripts and passes look at it
+
+Usage:
+    python names.py "de Melo Ramalho, Marcelo  da Costa Dantas, Beatriz"
+    python names.py --file data/winner_emails.json      # parse every winner
+"""
+
+import argparse
+import re
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Distinct raw strings kept parsed; a directory of this many names fits entirely
+CACHE_SIZE = 1 << 18
+
+SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+
+# Lowercase words that start a compound last name: "da Costa Dantas"
+PARTICLES = {'da', 'de', 'del', 'della', 'der', 'di', 'dos', 'du', 'la', 'le',
+             'van', 'von', 'bin', 'al', 'el', 'ter', 'ten'}
+
+# Explicit separators between team members
+_MEMBER_SEP_RE = re.compile(r"\s*(?:;|\s&\s|\sand\s)\s*")
+_FOLD_RE = re.compile(r"[^a-z0-9-]")
+_WORD_SPLIT_RE = re.compile(r"[\s-]+")
+
+_SOUNDEX_CODES = {}
+for _letters, _digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'),
+                         ('l', '4'), ('mn', '5'), ('r', '6')):
+    for _letter in _letters:
+        _SOUNDEX_CODES[_letter] = _digit
+
+def fold(text):
+    """Lowercase ASCII form of a name part: accents, spaces and apostrophes removed"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _FOLD_RE.sub('', text.lower())
+
+def fold_last(text):
+    """Folded last name with its words kept apart: 'Hase-Liu' -> 'hase liu'"""
+    return ' '.join(filter(None, (fold(word) for word in _WORD_SPLIT_RE.split(text or ''))))
+
+def soundex(name):
+    """American Soundex code of a folded name, e.g. 'robert' -> 'R163'"""
+    letters = [c for c in name if c.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code; vowels do
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+class Person(NamedTuple):
+    """One parsed person; the folded fields are what comparisons should use"""
+    first: str
+    middle: str
+    last: str
+    suffix: str
+    folded_first: str    # 'jose'
+    folded_last: str     # 'da silva borges', words kept apart
+    key: str             # 'dasilvaborges|jose', equal for the same normalized name
+    phonetic: str        # Soundex of the last name
+
+    @property
+    def display(self):
+        """'First Last' as the person would write it"""
+        return ' '.join(filter(None, (self.first, self.last, self.suffix)))
+
+class ParsedName(NamedTuple):
+    """A raw student_name and every member it lists, in order"""
+    raw: str
+    members: Tuple[Person, ...]
+
+    @property
+    def primary(self):
+        """The first listed member, or an empty Person"""
+        return self.members[0] if self.members else EMPTY
+
+    @property
+    def is_team(self):
+        return len(self.members) > 1
+
+    # The common case only needs the first member
+    first = property(lambda self: self.primary.first)
+    middle = property(lambda self: self.primary.middle)
+    last = property(lambda self: self.primary.last)
+    suffix = property(lambda self: self.primary.suffix)
+    key = property(lambda self: self.primary.key)
+    phonetic = property(lambda self: self.primary.phonetic)
+    display = property(lambda self: self.primary.display)
+
+def _clean(text):
+    return ' '.join((text or '').split())
+
+def _is_suffix(word):
+    return word.lower().rstrip('.') in SUFFIXES
+
+def _strip_suffix(words):
+    """(words without a trailing suffix, suffix)"""
+    if len(words) > 1 and _is_suffix(words[-1]):
+        return words[:-1], words[-1]
+    return words, ''
+
+@lru_cache(maxsize=CACHE_SIZE)
+def person(first, last, suffix=''):
+    """Build a Person from given names and a last name, e.g. a directory record"""
+    given, given_suffix = _strip_suffix(_clean(first).split())
+    last_words, last_suffix = _strip_suffix(_clean(last).split())
+    first = given[0] if given else ''
+    middle = ' '.join(given[1:])
+    last = ' '.join(last_words)
+    suffix = suffix or given_suffix or last_suffix
+
+    folded_first, folded_last = fold(first), fold_last(last)
+    compact = folded_last.replace(' ', '')
+    return Person(first, middle, last, suffix, folded_first, folded_last,
+                  f"{compact}|{folded_first}", soundex(compact))
+
+EMPTY = Person('', '', '', '', '', '', '', '')
+
+def _split_given_last(segment):
+    """
+    Split the middle part of a team entry, "First Next-Last", in two.
+
+    A double space or a particle (da, van, ...) marks where the next member's
+    last name starts; otherwise it is the final word.
+    """
+    if '  ' in segment.strip():
+        given, _, last = segment.strip().partition('  ')
+        return given, last
+    words = segment.split()
+    if len(words) < 2:
+        return segment, ''
+    for i in range(1, len(words) - 1):
+        if words[i] in PARTICLES:
+            return ' '.join(words[:i]), ' '.join(words[i:])
+    return ' '.join(words[:-1]), words[-1]
+
+def _parse_comma_list(text):
+    """Members of a "Last, First[ Last, First ...]" entry"""
+    segments = [s for s in (seg.strip() for seg in text.split(',')) if s]
+    # "Smith, John, Jr." - a segment that is only a suffix belongs to the one before
+    merged = []
+    for segment in segments:
+        if merged and _is_suffix(segment):
+            merged[-1] += ' ' + segment
+        else:
+            merged.append(segment)
+
+    members = []
+    last = merged[0]
+    for segment in merged[1:-1]:
+        given, next_last = _split_given_last(segment)
+        members.append(person(given, last))
+        last = next_last
+    members.append(person(merged[-1] if len(merged) > 1 else '', last))
+    return [m for m in members if m.last or m.first]
+
+def _parse_member(text):
+    text = _clean(text)
+    if not text:
+        return []
+    if ',' in text:
+        return _parse_comma_list(text)
+    words, suffix = _strip_suffix(text.split())
+    if len(words) == 1:
+        return [person('', words[0], suffix)]
+    # "Ana Maria de la Cruz": the last name starts at the first particle
+    for i in range(1, len(words) - 1):
+        if words[i] in PARTICLES:
+            return [person(' '.join(words[:i]), ' '.join(words[i:]), suffix)]
+    return [person(' '.join(words[:-1]), words[-1], suffix)]
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_name(raw):
+    """
+    Parse a student_name into its members.
+
+    Returns:
+        ParsedName; ParsedName.primary is the first member
+    """
+    members = []
+    for part in _MEMBER_SEP_RE.split(raw or ''):
+        members.extend(_parse_member(part))
+    return ParsedName(raw or '', tuple(members))
+
+def split_name(raw):
+    """(first, last) of the first member of a student_name; either may be ''"""
+    primary = parse_name(raw).primary
+    return primary.first, primary.last
+
+def cache_info():
+    """Hit/miss counts of the parse caches"""
+    return {'parse_name': parse_name.cache_info(), 'person': person.cache_info()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse student names")
+    parser.add_argument('names', nargs='*', help="Raw names to parse")
+    parser.add_argument('--file', help="Parse every student_name in a winners file")
+    args = parser.parse_args(argv)
+
+    raws = list(args.names)
+    if args.file:
+        import serialization
+        raws.extend(w.get('student_name') or '' for w in serialization.load(args.file).values())
+
+    teams = suffixes = 0
+    for raw in raws:
+        parsed = parse_name(raw)
+        teams += parsed.is_team
+        suffixes += any(m.suffix for m in parsed.members)
+        if args.names or parsed.is_team:
+            print(repr(raw))
+            for member in parsed.members:
+                print(f"  first={member.first!r} middle={member.middle!r} last={member.last!r} "
+                      f"suffix={member.suffix!r} key={member.key!r} phonetic={member.phonetic}")
+
+    info = parse_name.cache_info()
+    print(f"{len(raws)} names: {teams} teams, {suffixes} with suffixes "
+          f"(cache: {info.hits} hits, {info.misses} misses)")
+
+if __name__ == '__main__':
+    main()
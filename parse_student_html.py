@@ -3,13 +3,18 @@
 Parse HTML student data from .docx files and convert to structured JSON
 """
 
-import json
+import argparse
 import re
-from docx import Document
-from bs4 import BeautifulSoup
+
+import serialization
+from names import parse_name
+
+DOCX_FILES = ['grad.docx', '2026.docx', '2027.docx', '2028.docx', '2029.docx']
+STUDENTS_FILE = 'data/students.json'
 
 def extract_html_from_docx(filename):
     """Extract all text (HTML) from a .docx file"""
+    from docx import Document
     doc = Document(filename)
     full_text = []
 
@@ -21,6 +26,7 @@ def extract_html_from_docx(filename):
 
 def parse_student_from_html(student_html):
     """Parse a single student's data from HTML"""
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(student_html, 'html.parser')
 
     student = {
@@ -36,14 +42,10 @@ def parse_student_from_html(student_html):
     # Extract name
     name_elem = soup.find('h3', class_='peoplegrid_name__h8uVB')
     if name_elem:
-        name_text = name_elem.get_text(strip=True)
         # Format: "Last, First"
-        if ',' in name_text:
-            parts = name_text.split(',', 1)
-            student['last'] = parts[0].strip()
-            student['first'] = parts[1].strip() if len(parts) > 1 else ''
-        else:
-            student['last'] = name_text
+        name = parse_name(name_elem.get_text(strip=True)).primary
+        student['last'] = ' '.join(filter(None, (name.last, name.suffix)))
+        student['first'] = ' '.join(filter(None, (name.first, name.middle)))
 
     # Extract email
     email_link = soup.find('a', href=re.compile(r'^mailto:'))
@@ -90,6 +92,7 @@ def process_docx_file(filename):
     html_content = extract_html_from_docx(filename)
 
     # Parse HTML
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html_content, 'html.parser')
 
     # Find all student entries
@@ -111,13 +114,19 @@ def process_docx_file(filename):
 
     return students
 
-def main():
+def main(argv=None):
     """Extract data from all .docx files"""
-    docx_files = ['grad.docx', '2026.docx', '2027.docx', '2028.docx', '2029.docx']
+    parser = argparse.ArgumentParser(description="Parse student directory .docx exports into students.json")
+    parser.add_argument('files', nargs='*', default=DOCX_FILES,
+                        help=f"Directory exports (default: {' '.join(DOCX_FILES)})")
+    parser.add_argument('--output', default=STUDENTS_FILE)
+    parser.add_argument('--majors', action='store_true',
+                        help="Also extract majors from the notes (enhance_students_data.py)")
+    args = parser.parse_args(argv)
 
     all_students = []
 
-    for filename in docx_files:
+    for filename in args.files:
         try:
             students = process_docx_file(filename)
             all_students.extend(students)
@@ -133,9 +142,11 @@ def main():
     all_students.sort(key=lambda x: (x['year'], x['last']))
 
     # Save to JSON
-    output_file = 'data/students.json'
-    with open(output_file, 'w') as f:
-        json.dump(all_students, f, indent=2)
+    output_file = args.output
+    if args.majors:
+        from enhance_students_data import add_majors
+        add_majors(all_students)
+    serialization.save(output_file, all_students)
 
     print(f"Saved to {output_file}")
 
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+SQLite database of projects with full-text search
+- import streams data/projects_categorized.json (or projects.json) into
+  data/projects.sqlite. Projects without primary_category and categories
+  get them from categorizer.py on the way
+- FTS5 index on title and abstract (Porter stemming), ranked by BM25 with
+  title matches weighted higher
+- B-tree indexes on year, booth prefix, country, has_awards and each
+  listed category, so filters don't scan the table
+- Bulk import builds a fresh file with journaling off, in batched
+  transactions, creates the indexes after the rows are in, then swaps the
+  file into place
+
+Usage:
+    python projects_db.py import                     # -> data/projects.sqlite
+    python projects_db.py search "solar panel efficiency" --since 2018 --awards
+    python projects_db.py search --country "India" --category Chemistry --limit 50
+    python projects_db.py search "battery" --booth EGSD --snippet
+    python projects_db.py winners --year 2019
+
+Any SQLite client can query the file too:
+    sqlite3 data/projects.sqlite "SELECT year, count(*) FROM projects WHERE has_awards GROUP BY year"
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from categorizer import OUTPUT_FILE as CATEGORIZED_FILE, categorize, extract_booth_prefix
+from jsonstream import iter_records
+from spelling import tokenize
+
+PROJECTS_FILE = "data/projects.json"
+DB_FILE = "data/projects.sqlite"
+
+BATCH_SIZE = 5000
+
+# bm25() column weights: title, abstract
+TITLE_WEIGHT = 5.0
+ABSTRACT_WEIGHT = 1.0
+
+SCHEMA = """
+CREATE TABLE projects (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    student_name TEXT,
+    category TEXT,
+    primary_category TEXT,
+    year INTEGER,
+    booth TEXT,
+    booth_prefix TEXT,
+    country TEXT,
+    has_awards INTEGER NOT NULL,
+    awards TEXT,            -- JSON array
+    categories TEXT,        -- JSON array, primary first
+    abstract TEXT
+);
+CREATE TABLE project_categories (
+    project_id INTEGER NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE projects_fts USING fts5(
+    title, abstract, content='projects', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+
+INDEXES = """
+CREATE INDEX projects_year ON projects (year);
+CREATE INDEX projects_booth_prefix ON projects (booth_prefix);
+CREATE INDEX projects_country ON projects (country);
+CREATE INDEX projects_has_awards ON projects (has_awards, year);
+CREATE INDEX project_categories_category ON project_categories (category, project_id);
+"""
+
+# Safe for a file nobody else has open yet: a crash leaves a broken temp
+# file, never a broken database
+IMPORT_PRAGMAS = (
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",       # 256 MB
+)
+
+COLUMNS = ('id', 'title', 'student_name', 'category', 'primary_category', 'year', 'booth',
+           'booth_prefix', 'country', 'has_awards', 'awards', 'categories', 'abstract')
+
+def _categorized(projects):
+    """Projects with categorizer fields, computing them only where missing"""
+    for project in projects:
+        if project.get('primary_category') and project.get('categories'):
+            yield project
+        else:
+            yield from categorize([project])
+
+def _row(project):
+    year = str(project.get('year') or '')
+    awards = project.get('awards') or []
+    return (
+        project['id'], project.get('title'), project.get('student_name'),
+        project.get('category'), project.get('primary_category'),
+        int(year) if year.isdigit() else None,
+        project.get('booth'), extract_booth_prefix(project.get('booth')),
+        project.get('country'), int(bool(awards)),
+        json.dumps(awards, ensure_ascii=False),
+        json.dumps(project.get('categories') or [], ensure_ascii=False),
+        project.get('abstract'),
+    )
+
+def import_projects(projects, path=DB_FILE, batch_size=BATCH_SIZE):
+    """
+    Build the database from projects and replace path with it.
+
+    Returns:
+        Number of distinct projects imported; a repeated id keeps its last copy
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        for pragma in IMPORT_PRAGMAS:
+            conn.execute(pragma)
+        conn.executescript(SCHEMA)
+        insert = f"INSERT OR REPLACE INTO projects ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        rows, category_rows = [], []
+        seen = set()
+
+        def flush():
+            conn.execute("BEGIN")
+            conn.executemany(insert, rows)
+            conn.executemany("INSERT INTO project_categories VALUES (?, ?)", category_rows)
+            conn.execute("COMMIT")
+            rows.clear()
+            category_rows.clear()
+
+        for project in _categorized(projects):
+            if project['id'] in seen:
+                # INSERT OR REPLACE swaps the projects row; the category rows
+                # of the earlier copy have to go too. Duplicates are rare, so
+                # the unindexed delete is fine
+                flush()
+                conn.execute("DELETE FROM project_categories WHERE project_id = ?", (project['id'],))
+            seen.add(project['id'])
+            rows.append(_row(project))
+            category_rows.extend((project['id'], c) for c in dict.fromkeys(project.get('categories') or ()))
+            if len(rows) >= batch_size:
+                flush()
+        flush()
+
+        conn.execute("BEGIN")
+        for statement in filter(str.strip, INDEXES.split(';')):
+            conn.execute(statement)
+        # One pass over the content table is much faster than indexing row by row
+        conn.execute("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO projects_fts (projects_fts) VALUES ('optimize')")
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return len(seen)
+
+def fts_query(text, prefix=True):
+    """
+    FTS5 query matching every word of free text; the last word also
+    matches as a prefix, for search-as-you-type
+    """
+    words = tokenize(text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if prefix:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+class ProjectDB:
+    """Read-only queries against the projects database"""
+
+    def __init__(self, path=DB_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run: python projects_db.py import")
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def search(self, text=None, year=None, since=None, until=None, category=None, country=None,
+               booth_prefix=None, has_awards=None, limit=20, offset=0, snippet=False, raw=False):
+        """
+        Projects matching text (BM25-ranked) and every given filter.
+
+        category matches any listed category, not only the primary one.
+        raw passes text to FTS5 as query syntax instead of quoting its words.
+
+        Returns:
+            List of dicts; 'score' is the BM25 rank (lower is better) and
+            'snippet' a highlighted abstract excerpt when asked for
+        """
+        where, params = [], []
+        match = (text if raw else fts_query(text)) if text else None
+        for clause, value in (("p.year = ?", year), ("p.year >= ?", since), ("p.year <= ?", until),
+                              ("p.country = ?", country), ("p.booth_prefix = ?", booth_prefix)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if has_awards is not None:
+            where.append("p.has_awards = ?")
+            params.append(int(has_awards))
+        if category is not None:
+            where.append("p.id IN (SELECT project_id FROM project_categories WHERE category = ?)")
+            params.append(category)
+
+        columns = "p.*"
+        if match:
+            columns += f", bm25(projects_fts, {TITLE_WEIGHT}, {ABSTRACT_WEIGHT}) AS score"
+            if snippet:
+                columns += ", snippet(projects_fts, 1, '[', ']', '...', 16) AS snippet"
+            sql = f"SELECT {columns} FROM projects_fts JOIN projects p ON p.id = projects_fts.rowid"
+            where.insert(0, "projects_fts MATCH ?")
+            params.insert(0, match)
+            order = "score"
+        else:
+            sql = f"SELECT {columns} FROM projects p"
+            order = "p.year DESC, p.id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            record = dict(row)
+            record['awards'] = json.loads(record['awards'] or '[]')
+            record['categories'] = json.loads(record['categories'] or '[]')
+            results.append(record)
+        return results
+
+    def winners(self, year=None):
+        """Award-winning projects, newest first"""
+        return self.search(year=year, has_awards=True, limit=-1)
+
+def _print_results(results, elapsed):
+    print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+    for r in results:
+        score = f"{r['score']:7.2f}" if 'score' in r else '      -'
+        print(f"  {score} {r['id']:>6} {r['year'] or '':>4} {r['primary_category'] or '':<28.28} "
+              f"{r['title'] or '':.70}")
+        if r.get('snippet'):
+            print(f"          {r['snippet']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite full-text database of projects")
+    parser.add_argument('--db', default=DB_FILE, help=f"Database file (default: {DB_FILE})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    import_cmd = sub.add_parser('import', help="Rebuild the database from a projects file")
+    import_cmd.add_argument('--projects', help=f"Default: {CATEGORIZED_FILE} if it exists, else {PROJECTS_FILE}")
+    import_cmd.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    search = sub.add_parser('search', help="BM25-ranked search with filters")
+    search.add_argument('query', nargs='?', help="Words to match in titles and abstracts")
+    search.add_argument('--raw', action='store_true', help="Treat the query as FTS5 syntax")
+    search.add_argument('--year', type=int)
+    search.add_argument('--since', type=int)
+    search.add_argument('--until', type=int)
+    search.add_argument('--category', help="Any listed category")
+    search.add_argument('--country')
+    search.add_argument('--booth', help="Booth prefix, e.g. EBED")
+    awards = search.add_mutually_exclusive_group()
+    awards.add_argument('--awards', dest='has_awards', action='store_true', default=None)
+    awards.add_argument('--no-awards', dest='has_awards', action='store_false')
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--offset', type=int, default=0)
+    search.add_argument('--snippet', action='store_true', help="Show a highlighted excerpt")
+
+    winners = sub.add_parser('winners', help="Award-winning projects, newest first")
+    winners.add_argument('--year', type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        source = args.projects or (CATEGORIZED_FILE if os.path.exists(CATEGORIZED_FILE) else PROJECTS_FILE)
+        start = time.perf_counter()
+        count = import_projects(iter_records(source), args.db, args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"Imported {count} projects from {source} into {args.db} in {elapsed:.1f}s "
+              f"({count / max(elapsed, 1e-9):,.0f} projects/s, {os.path.getsize(args.db) / 1e6:.1f} MB)")
+    elif args.command == 'search':
+        db = ProjectDB(args.db)
+        start = time.perf_counter()
+        try:
+            results = db.search(args.query, args.year, args.since, args.until, args.category, args.country,
+                                args.booth.upper() if args.booth else None, args.has_awards,
+                                args.limit, args.offset, args.snippet, args.raw)
+        except sqlite3.OperationalError as e:
+            # Only --raw queries reach FTS5 unquoted
+            parser.error(f"invalid query {args.query!r}: {e}")
+        finally:
+            db.close()
+        _print_results(results, time.perf_counter() - start)
+    elif args.command == 'winners':
+        db = ProjectDB(args.db)
+        start = time.perf_counter()
+        results = db.winners(args.year)
+        db.close()
+        _print_results(results, time.perf_counter() - start)
+
+if __name__ == '__main__':
+    main()
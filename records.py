@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory project records
+- Project uses __slots__ instead of a per-record dict
+- Category, country, year and award strings are interned, so
+  thousands of projects share one copy of each
+- Mapping-style access (project['title'], project.get('booth', '')) so the
+  categorizer and filters work on records and dicts alike
+
+Usage:
+    python records.py memory data/projects.json
+"""
+
+import argparse
+import sys
+
+from jsonstream import iter_records
+
+# Fields that repeat across many projects and are worth interning
+INTERNED_FIELDS = ('category', 'country', 'year', 'primary_category')
+LIST_FIELDS = ('awards', 'categories')
+
+class Project:
+    """
+    One scraped project.
+
+    Fields the source record didn't have are left unset rather than stored
+    as None, so to_dict() gives back exactly what was loaded. Unknown
+    fields are kept in `extra`.
+    """
+
+    __slots__ = ('id', 'title', 'student_name', 'category', 'year', 'booth', 'country',
+                 'abstract', 'awards', 'primary_category', 'categories', 'extra')
+
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        project = cls.__new__(cls)
+        for key, value in data.items():
+            project[key] = value
+        return project
+
+    def to_dict(self):
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = list(value) if key in LIST_FIELDS else value
+        extra = getattr(self, 'extra', None)
+        if extra:
+            data.update(extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = getattr(self, 'extra', None)
+        if extra and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in LIST_FIELDS:
+                value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+            elif key in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            extra = getattr(self, 'extra', None)
+            if extra is None:
+                extra = self.extra = {}
+            extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Project(id={getattr(self, 'id', None)!r}, title={getattr(self, 'title', '')[:40]!r})"
+
+_MISSING = object()
+_FIELD_SET = frozenset(Project.FIELDS)
+_INTERNED = frozenset(INTERNED_FIELDS)
+
+def iter_projects(path):
+    """Yield Project records from a projects .json or .jsonl file"""
+    for data in iter_records(path):
+        yield Project.from_dict(data)
+
+def load_projects(path):
+    """Load every project in path as a list of compact records"""
+    return list(iter_projects(path))
+
+def measure(path):
+    """
+    Bytes allocated holding every project in path as dicts vs records.
+
+    Returns:
+        (count, dict_bytes, record_bytes)
+    """
+    import tracemalloc
+
+    def allocated(build):
+        tracemalloc.start()
+        items = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return len(items), current
+
+    count, dict_bytes = allocated(lambda: list(iter_records(path)))
+    _, record_bytes = allocated(lambda: load_projects(path))
+    return count, dict_bytes, record_bytes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact in-memory project records")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    memory = sub.add_parser('memory', help="Compare memory held by dicts vs Project records")
+    memory.add_argument('file', nargs='?', default='data/projects.json')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'memory':
+        count, dict_bytes, record_bytes = measure(args.file)
+        mb = 1024 * 1024
+        print(f"{count} projects from {args.file}")
+        print(f"  dicts:   {dict_bytes / mb:8.1f} MB  ({dict_bytes / max(count, 1):6.0f} B/project)")
+        print(f"  records: {record_bytes / mb:8.1f} MB  ({record_bytes / max(count, 1):6.0f} B/project)")
+        print(f"  saved:   {(dict_bytes - record_bytes) / mb:8.1f} MB  "
+              f"({(1 - record_bytes / max(dict_bytes, 1)) * 100:.0f}%)")
+
+if __name__ == '__main__':
+    main()
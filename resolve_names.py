@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Resolve missing student names for award winners before the email search
+- Collects every award-winning project without a student_name
+- Fetches their abstract pages concurrently (asyncio over the shared,
+  connection-pooled scraper client) and parses them with scraper.parse_project
+- Writes the names back to data/projects.json in one streaming pass
+
+Usage:
+    python resolve_names.py                 # resolve and save
+    python resolve_names.py --dry-run       # only report what would change
+    python resolve_names.py --concurrency 16
+"""
+
+import argparse
+import asyncio
+
+import metrics
+import serialization
+from jsonstream import JsonArrayWriter, iter_records
+
+DATA_FILE = "data/projects.json"
+CONCURRENCY = 8
+
+def find_unnamed_winners(path=DATA_FILE):
+    """IDs of award-winning projects that have no student_name"""
+    return [p['id'] for p in iter_records(path)
+            if p.get('awards') and not p.get('student_name')]
+
+def fetch_student_name(project_id):
+    """
+    Fetch one abstract page and return its student name, or None.
+
+    Transient failures go to the dead-letter list (kind 'name') so a later
+    run can retry them.
+    """
+    from scraper import client, dead_letters, parse_project
+    from http_client import FetchError, TransientError
+
+    url = f"https://abstracts.societyforscience.org/Home/FullAbstract?projectId={project_id}"
+    try:
+        with metrics.timer('fetch'):
+            response = client.get(url)
+    except TransientError as e:
+        dead_letters.add(project_id, e, kind='name')
+        return None
+    except FetchError as e:
+        metrics.incr('fetch_errors')
+        print(f"  Error fetching project {project_id}: {e}")
+        return None
+
+    with metrics.timer('parse'):
+        project = parse_project(project_id, response.text)
+    return project.get('student_name') if project else None
+
+async def resolve_names(project_ids, fetch_name=fetch_student_name, concurrency=CONCURRENCY):
+    """
+    Resolve names for project_ids with at most `concurrency` requests in flight.
+
+    fetch_name is a blocking function; each call runs in a worker thread so
+    the shared client's retries and circuit breaker still apply.
+
+    Returns:
+        {project_id: name} for the projects whose name was found
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(project_id):
+        async with semaphore:
+            return project_id, await asyncio.to_thread(fetch_name, project_id)
+
+    names = {}
+    for done in asyncio.as_completed([resolve(pid) for pid in project_ids]):
+        project_id, name = await done
+        if name:
+            names[project_id] = name
+            metrics.incr('names_resolved')
+        else:
+            metrics.incr('names_unresolved')
+    return names
+
+def write_names(names, path=DATA_FILE):
+    """Set student_name on the given projects, rewriting path in one pass"""
+    if not names:
+        return 0
+    updated = 0
+    # The writer goes through a temporary file, so path can be read meanwhile
+    with metrics.timer('save'), JsonArrayWriter(path, serialization.default_indent()) as out:
+        for project in iter_records(path):
+            name = names.get(project['id'])
+            if name and not project.get('student_name'):
+                project['student_name'] = name
+                updated += 1
+            out.write(project)
+    return updated
+
+def resolve_missing_names(path=DATA_FILE, concurrency=CONCURRENCY, dry_run=False, project_ids=None):
+    """
+    Pre-pass for the email scraper: resolve and store missing winner names.
+
+    project_ids limits the pass to those unnamed winners; by default every
+    unnamed winner in path is resolved.
+
+    Returns:
+        {project_id: name} for the names that were found
+    """
+    missing = find_unnamed_winners(path) if project_ids is None else list(project_ids)
+    if not missing:
+        return {}
+
+    print(f"Resolving student names for {len(missing)} winners ({concurrency} concurrent requests)...")
+    names = asyncio.run(resolve_names(missing, concurrency=concurrency))
+    print(f"Found {len(names)}/{len(missing)} names")
+
+    if not dry_run:
+        updated = write_names(names, path)
+        print(f"Updated {updated} projects in {path}")
+    return names
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve missing student names for award winners")
+    parser.add_argument('--projects', default=DATA_FILE, help=f"Projects file (default: {DATA_FILE})")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY,
+                        help=f"Requests in flight (default: {CONCURRENCY})")
+    parser.add_argument('--dry-run', action='store_true', help="Report names without saving them")
+    args = parser.parse_args(argv)
+
+    with metrics.session('resolve_names'):
+        names = resolve_missing_names(args.projects, args.concurrency, args.dry_run)
+    if args.dry_run:
+        for project_id, name in sorted(names.items()):
+            print(f"  {project_id}: {name}")
+
+if __name__ == '__main__':
+    main()
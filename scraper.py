@@ -4,148 +4,178 @@ ISEF Project Scraper
 Scrapes project data from abstracts.societyforscience.org
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
-import time
 import os
 import re
-import urllib3
+import sys
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 
-# Disable SSL warnings for retries
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+import metrics
+import serialization
+from http_client import HttpClient, DeadLetters, FetchError, NotFound, TransientError
+from jsonstream import append_json_array, iter_records
 
 DATA_FILE = "data/projects.json"
 PROGRESS_FILE = "data/progress.json"
 
+# One site, so wait out an open circuit instead of skipping IDs
+client = HttpClient(retries=3, backoff=2.0, timeout=30, ssl_fallback=True, wait_when_open=True)
+dead_letters = DeadLetters()
+
 def fetch_project(project_id):
-    """Fetch a single project's data."""
+    """
+    Fetch a single project's data.
+
+    Returns None when the project doesn't exist. Transient failures
+    (timeouts, 5xx, 429) are retried by the client and, if they persist,
+    recorded in the dead-letter list so the ID can be retried later.
+    """
     url = f"https://abstracts.societyforscience.org/Home/FullAbstract?projectId={project_id}"
 
     try:
-        # Try with SSL verification first, then without
-        try:
-            response = requests.get(url, timeout=30)
-        except requests.exceptions.SSLError:
-            response = requests.get(url, timeout=30, verify=False)
+        with metrics.timer('fetch'):
+            response = client.get(url)
+    except NotFound:
+        metrics.incr('projects_missing')
+        return None
+    except TransientError as e:
+        dead_letters.add(project_id, e)
+        print(f"Transient error fetching project {project_id}, queued for retry: {e}")
+        return None
+    except FetchError as e:
+        metrics.incr('fetch_errors')
+        print(f"Error fetching project {project_id}: {e}")
+        return None
 
-        if response.status_code != 200:
-            return None
+    # Time from sending the request until the headers arrived
+    metrics.observe('server', response.elapsed.total_seconds())
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    try:
+        with metrics.timer('parse'):
+            project = parse_project(project_id, response.text)
+    except Exception as e:
+        metrics.incr('parse_errors')
+        print(f"Error parsing project {project_id}: {e}")
+        return None
 
-        # Find the main content area
-        content = soup.find('div', class_='container')
-        if not content:
-            return None
+    metrics.incr('projects_found' if project else 'projects_missing')
+    return project
 
-        # Extract data using various methods
-        project = {'id': project_id}
+def parse_project(project_id, html):
+    """Parse a FullAbstract page into a project dict, or None if it isn't one."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
 
-        # Find all text content
-        text = content.get_text()
+    # Find the main content area
+    content = soup.find('div', class_='container')
+    if not content:
+        return None
 
-        # Check if it's a valid project page
-        if "Project not found" in text or "Error" in text:
-            return None
+    # Extract data using various methods
+    project = {'id': project_id}
 
-        # Extract title (usually in h2 or first heading after metadata)
-        title_elem = content.find('h2')
-        if title_elem:
-            project['title'] = title_elem.get_text(strip=True)
-        else:
-            # Try finding title in different ways
-            headings = content.find_all(['h1', 'h2', 'h3'])
-            for h in headings:
-                t = h.get_text(strip=True)
-                if t and len(t) > 10 and "ISEF" not in t:
-                    project['title'] = t
-                    break
-
-        # Extract metadata fields
-        labels = content.find_all('strong')
-        for label in labels:
-            label_text = label.get_text(strip=True).lower()
-            next_text = ""
-
-            # Get text after the label
-            next_sibling = label.next_sibling
-            if next_sibling:
-                if hasattr(next_sibling, 'get_text'):
-                    next_text = next_sibling.get_text(strip=True)
-                else:
-                    next_text = str(next_sibling).strip()
-
-            # Also check parent's text
-            parent = label.parent
-            if parent:
-                full_text = parent.get_text()
-                # Extract value after colon
-                if ':' in full_text:
-                    value = full_text.split(':', 1)[1].strip()
-                    if value:
-                        next_text = value.split('\n')[0].strip()
-
-            if 'category' in label_text:
-                project['category'] = next_text
-            elif 'year' in label_text:
-                project['year'] = next_text
-            elif 'booth' in label_text:
-                project['booth'] = next_text
-            elif 'country' in label_text or 'location' in label_text:
-                project['country'] = next_text
-            elif 'student' in label_text or 'finalist' in label_text or 'author' in label_text:
-                if next_text and len(next_text) > 2 and len(next_text) < 100:
-                    project['student_name'] = next_text
-
-        # Extract abstract
-        abstract_section = None
-        for elem in content.find_all(['p', 'div']):
-            prev = elem.find_previous(['strong', 'b'])
-            if prev and 'abstract' in prev.get_text().lower():
-                abstract_text = elem.get_text(strip=True)
-                if len(abstract_text) > 100:
-                    project['abstract'] = abstract_text
-                    break
-
-        # Alternative: find abstract by looking for long paragraphs
-        if 'abstract' not in project:
-            paragraphs = content.find_all('p')
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                if len(text) > 200:
-                    project['abstract'] = text
-                    break
-
-        # Extract awards - look for "Awards Won:" section
-        awards = []
-        full_text = content.get_text()
-        if 'Awards Won:' in full_text:
-            awards_text = full_text.split('Awards Won:')[1].strip()
-            # Get text until next section or end
-            awards_text = awards_text.split('\n')[0].strip()
-            if awards_text and len(awards_text) < 500:
-                # Split multiple awards
-                if ';' in awards_text:
-                    awards = [a.strip() for a in awards_text.split(';') if a.strip()]
-                elif awards_text:
-                    awards = [awards_text]
-
-        project['awards'] = awards
-
-        # Only return if we have at least title and abstract
-        if 'title' in project and 'abstract' in project:
-            return project
-        elif 'title' in project:
-            # Return even without abstract
-            return project
+    # Find all text content
+    text = content.get_text()
 
+    # Check if it's a valid project page
+    if "Project not found" in text or "Error" in text:
         return None
 
-    except Exception as e:
-        print(f"Error fetching project {project_id}: {e}")
-        return None
+    # Extract title (usually in h2 or first heading after metadata)
+    title_elem = content.find('h2')
+    if title_elem:
+        project['title'] = title_elem.get_text(strip=True)
+    else:
+        # Try finding title in different ways
+        headings = content.find_all(['h1', 'h2', 'h3'])
+        for h in headings:
+            t = h.get_text(strip=True)
+            if t and len(t) > 10 and "ISEF" not in t:
+                project['title'] = t
+                break
+
+    # Extract metadata fields
+    labels = content.find_all('strong')
+    for label in labels:
+        label_text = label.get_text(strip=True).lower()
+        next_text = ""
+
+        # Get text after the label
+        next_sibling = label.next_sibling
+        if next_sibling:
+            if hasattr(next_sibling, 'get_text'):
+                next_text = next_sibling.get_text(strip=True)
+            else:
+                next_text = str(next_sibling).strip()
+
+        # Also check parent's text
+        parent = label.parent
+        if parent:
+            full_text = parent.get_text()
+            # Extract value after colon
+            if ':' in full_text:
+                value = full_text.split(':', 1)[1].strip()
+                if value:
+                    next_text = value.split('\n')[0].strip()
+
+        if 'category' in label_text:
+            project['category'] = next_text
+        elif 'year' in label_text:
+            project['year'] = next_text
+        elif 'booth' in label_text:
+            project['booth'] = next_text
+        elif 'country' in label_text or 'location' in label_text:
+            project['country'] = next_text
+        elif 'student' in label_text or 'finalist' in label_text or 'author' in label_text:
+            if next_text and len(next_text) > 2 and len(next_text) < 100:
+                project['student_name'] = next_text
+
+    # Extract abstract
+    abstract_section = None
+    for elem in content.find_all(['p', 'div']):
+        prev = elem.find_previous(['strong', 'b'])
+        if prev and 'abstract' in prev.get_text().lower():
+            abstract_text = elem.get_text(strip=True)
+            if len(abstract_text) > 100:
+                project['abstract'] = abstract_text
+                break
+
+    # Alternative: find abstract by looking for long paragraphs
+    if 'abstract' not in project:
+        paragraphs = content.find_all('p')
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            if len(text) > 200:
+                project['abstract'] = text
+                break
+
+    # Extract awards - look for "Awards Won:" section
+    awards = []
+    full_text = content.get_text()
+    if 'Awards Won:' in full_text:
+        awards_text = full_text.split('Awards Won:')[1].strip()
+        # Get text until next section or end
+        awards_text = awards_text.split('\n')[0].strip()
+        if awards_text and len(awards_text) < 500:
+            # Split multiple awards
+            if ';' in awards_text:
+                awards = [a.strip() for a in awards_text.split(';') if a.strip()]
+            elif awards_text:
+                awards = [awards_text]
+
+    project['awards'] = awards
+
+    # Only return if we have at least title and abstract
+    if 'title' in project and 'abstract' in project:
+        return project
+    elif 'title' in project:
+        # Return even without abstract
+        return project
+
+    return None
 
 def load_progress():
     """Load scraping progress."""
@@ -163,26 +193,39 @@ def save_progress(progress):
 def load_projects():
     """Load existing projects."""
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
+        with metrics.timer('load'):
+            return serialization.load(DATA_FILE, 'projects')
     return []
 
 def save_projects(projects):
     """Save projects to file."""
     os.makedirs('data', exist_ok=True)
-    with open(DATA_FILE, 'w') as f:
-        json.dump(projects, f, indent=2)
+    with metrics.timer('save'):
+        serialization.save(DATA_FILE, projects)
+
+def load_project_ids():
+    """IDs of the projects already saved, streamed so the corpus isn't loaded."""
+    if not os.path.exists(DATA_FILE):
+        return set()
+    with metrics.timer('load'):
+        return {p['id'] for p in iter_records(DATA_FILE)}
+
+def append_projects(projects):
+    """Append new projects to the saved array without rewriting it."""
+    os.makedirs('data', exist_ok=True)
+    with metrics.timer('save'):
+        return append_json_array(DATA_FILE, projects, serialization.default_indent())
 
 def scrape_range(start_id, end_id, batch_size=100, delay=0.5):
     """Scrape a range of project IDs."""
     progress = load_progress()
-    projects = load_projects()
-    existing_ids = {p['id'] for p in projects}
+    existing_ids = load_project_ids()
+    total = len(existing_ids)
 
     start_id = max(start_id, progress['last_id'] + 1)
 
     print(f"Starting scrape from ID {start_id} to {end_id}")
-    print(f"Already have {len(projects)} projects")
+    print(f"Already have {total} projects")
 
     current_id = start_id
     batch_projects = []
@@ -202,78 +245,124 @@ def scrape_range(start_id, end_id, batch_size=100, delay=0.5):
 
         # Save every batch_size projects
         if len(batch_projects) >= batch_size:
-            projects.extend(batch_projects)
-            save_projects(projects)
+            total += append_projects(batch_projects)
             progress['last_id'] = current_id
-            progress['total_scraped'] = len(projects)
+            progress['total_scraped'] = total
             save_progress(progress)
-            print(f"Saved {len(projects)} projects total")
+            print(f"Saved {total} projects total")
             batch_projects = []
 
         current_id += 1
-        time.sleep(delay)
+        metrics.sleep(delay)
 
     # Save remaining
     if batch_projects:
-        projects.extend(batch_projects)
-        save_projects(projects)
+        total += append_projects(batch_projects)
         progress['last_id'] = current_id - 1
-        progress['total_scraped'] = len(projects)
+        progress['total_scraped'] = total
         save_progress(progress)
 
-    print(f"Scraping complete. Total projects: {len(projects)}")
-    return projects
+    print(f"Scraping complete. Total projects: {total}")
+    return total
 
 def scrape_parallel(start_id, end_id, max_workers=5, batch_size=100):
-    """Scrape using multiple threads."""
-    projects = load_projects()
-    existing_ids = {p['id'] for p in projects}
+    """
+    Scrape using multiple threads.
 
-    ids_to_scrape = [i for i in range(start_id, end_id + 1) if i not in existing_ids]
-    print(f"Scraping {len(ids_to_scrape)} project IDs with {max_workers} workers")
+    Only the set of saved IDs and the current batch are kept in memory;
+    each batch is appended to the saved array.
+    """
+    existing_ids = load_project_ids()
+    total = len(existing_ids)
+
+    ids_to_scrape = (i for i in range(start_id, end_id + 1) if i not in existing_ids)
+    print(f"Scraping IDs {start_id}-{end_id} with {max_workers} workers, skipping {total} saved projects")
 
     new_projects = []
+    found = 0
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_id = {executor.submit(fetch_project, pid): pid for pid in ids_to_scrape}
-
-        for i, future in enumerate(as_completed(future_to_id)):
-            pid = future_to_id[future]
-            try:
-                project = future.result()
-                if project:
-                    new_projects.append(project)
-                    print(f"[{len(new_projects)}] ID {pid}: {project.get('title', 'Unknown')[:40]}...")
-
-                # Save periodically
-                if len(new_projects) % batch_size == 0 and new_projects:
-                    projects.extend(new_projects)
-                    save_projects(projects)
-                    print(f"Saved {len(projects)} projects")
-                    new_projects = []
-
-            except Exception as e:
-                print(f"Error with ID {pid}: {e}")
+        # Submit in bounded windows so pending futures don't pile up
+        while True:
+            window = list(islice(ids_to_scrape, max_workers * batch_size))
+            if not window:
+                break
+            future_to_id = {executor.submit(fetch_project, pid): pid for pid in window}
+
+            for future in as_completed(future_to_id):
+                pid = future_to_id[future]
+                try:
+                    project = future.result()
+                    if project:
+                        found += 1
+                        new_projects.append(project)
+                        print(f"[{found}] ID {pid}: {project.get('title', 'Unknown')[:40]}...")
+
+                    # Save periodically
+                    if len(new_projects) >= batch_size:
+                        total += append_projects(new_projects)
+                        print(f"Saved {total} projects")
+                        new_projects = []
+
+                except Exception as e:
+                    print(f"Error with ID {pid}: {e}")
 
     # Save remaining
     if new_projects:
-        projects.extend(new_projects)
-        save_projects(projects)
+        total += append_projects(new_projects)
 
-    print(f"Complete. Total: {len(projects)} projects")
-    return projects
+    print(f"Complete. Total: {total} projects")
+    return total
 
-if __name__ == "__main__":
-    import sys
+def retry_failed(max_workers=5):
+    """Re-fetch the IDs in the dead-letter list; keep the ones that fail again"""
+    failed = dead_letters.load()
+    if not failed:
+        print("No failed project IDs to retry")
+        return []
 
-    if len(sys.argv) > 2:
-        start = int(sys.argv[1])
-        end = int(sys.argv[2])
-    else:
-        # Full range: 1-30000 to catch all years (2014-2025)
-        # ~16,199 projects expected
-        start = 1
-        end = 30000
+    existing_ids = load_project_ids()
+    ids = sorted(pid for pid in failed if pid not in existing_ids)
+    print(f"Retrying {len(ids)} failed project IDs")
+
+    # The list is only trimmed once the retries are saved, so an interrupted
+    # run loses nothing; fetch_project re-adds anything that fails again
+    started = time.time()
+
+    new_projects = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for project in executor.map(fetch_project, ids):
+            if project:
+                new_projects.append(project)
+
+    if new_projects:
+        append_projects(new_projects)
+    dead_letters.discard(failed, before=started)
+
+    remaining = dead_letters.load()
+    print(f"Recovered {len(new_projects)} projects; {len(remaining)} IDs still failing")
+    return new_projects
+
+def main(argv=None):
+    # --profile[=pyinstrument] and --metrics PATH may appear anywhere
+    args, profiler, metrics_output = metrics.parse_flags(sys.argv[1:] if argv is None else argv)
+
+    parser = argparse.ArgumentParser(description="Scrape ISEF project abstracts", epilog=metrics.FLAGS_HELP)
+    # Full range: 1-30000 to catch all years (2014-2025); ~16,199 projects expected
+    parser.add_argument('start', nargs='?', type=int, default=1)
+    parser.add_argument('end', nargs='?', type=int, default=30000)
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Re-fetch the IDs in the dead-letter file instead")
+    args = parser.parse_args(args)
+
+    if args.retry_failed:
+        with metrics.session('scraper', profiler, metrics_output):
+            retry_failed()
+        return
 
     # Use parallel scraping for speed
-    scrape_parallel(start, end, max_workers=10, batch_size=50)
+    with metrics.session('scraper', profiler, metrics_output):
+        scrape_parallel(args.start, args.end, max_workers=10, batch_size=50)
+
+if __name__ == "__main__":
+    main()
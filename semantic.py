@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Semantic project search with LSA embeddings, built offline
+- TF-IDF over titles and abstracts, reduced with a randomized truncated SVD
+  (latent semantic analysis), so related wordings land near each other
+  without any model download
+- Embeddings are stored int8-quantized (one scale per vector) in a .npy
+  file that is memory-mapped at query time
+- Vectors are grouped by a small k-means IVF index: a query scans the
+  lists of its nprobe nearest centroids, or every vector in blocks when
+  exact results are wanted (--nprobe 0)
+
+Usage:
+    python semantic.py build                          # data/projects.json -> data/semantic/
+    python semantic.py search "solar panel efficiency" --top 10 --nprobe 8
+    python -m benchmarks.semantic_search --size 1000000
+
+Needs NumPy and SciPy (pip install numpy scipy).
+"""
+
+import argparse
+import math
+import os
+import time
+from array import array
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+import serialization
+from jsonstream import iter_records
+from spelling import tokenize
+from trends import STOPWORDS
+
+PROJECTS_FILE = "data/projects.json"
+INDEX_DIR = "data/semantic"
+
+DIMENSIONS = 128
+MIN_DF = 2
+MAX_TERMS = 50000
+FIT_SAMPLE = 100000       # documents the SVD is fitted on
+POWER_ITERATIONS = 3
+KMEANS_SAMPLE = 50000
+KMEANS_ITERATIONS = 12
+NPROBE = 8
+BLOCK_ROWS = 1 << 16
+
+def _require():
+    if np is None:
+        raise RuntimeError("Semantic search needs NumPy and SciPy (pip install numpy scipy)")
+
+def project_tokens(project):
+    """Title and abstract terms, title terms counted twice"""
+    title = tokenize(project.get('title'))
+    return [t for t in title * 2 + tokenize(project.get('abstract'))
+            if len(t) > 2 and not t.isdigit() and t not in STOPWORDS]
+
+def count_matrix(projects):
+    """
+    One pass over the projects.
+
+    Returns:
+        (ids, terms, documents x terms CSR matrix of term counts)
+    """
+    _require()
+    ids, terms, term_ids = [], [], {}
+    indptr, indices = array('q', [0]), array('i')
+    for project in projects:
+        ids.append(project.get('id'))
+        for token in project_tokens(project):
+            column = term_ids.get(token)
+            if column is None:
+                column = term_ids[token] = len(terms)
+                terms.append(token)
+            indices.append(column)
+        indptr.append(len(indices))
+    indices = np.frombuffer(indices, dtype=np.int32)
+    counts = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices,
+                                np.frombuffer(indptr, dtype=np.int64)),
+                               shape=(len(ids), len(terms)))
+    counts.sum_duplicates()
+    return ids, terms, counts
+
+def prune_terms(terms, counts, min_df=MIN_DF, max_terms=MAX_TERMS):
+    """Keep the max_terms most common terms used by at least min_df documents"""
+    df = np.bincount(counts.indices, minlength=len(terms))
+    keep = np.flatnonzero(df >= min_df)
+    keep = keep[np.argsort(-df[keep], kind='stable')[:max_terms]]
+    keep.sort()
+    return [terms[i] for i in keep], counts[:, keep]
+
+def tfidf(counts, idf=None):
+    """Sublinear TF-IDF with unit-length rows; returns (matrix, idf)"""
+    if idf is None:
+        n = counts.shape[0]
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    weighted = counts.copy()
+    weighted.data = np.log1p(weighted.data, dtype=np.float32)
+    weighted = weighted @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    weighted = sparse.diags(1 / np.maximum(norms, 1e-12)) @ weighted
+    return weighted.astype(np.float32).tocsr(), idf
+
+def randomized_svd(matrix, dimensions, power_iterations=POWER_ITERATIONS, seed=0):
+    """Top right singular vectors of a sparse matrix (Halko et al.), as rows"""
+    rng = np.random.default_rng(seed)
+    sketch = dimensions + 10
+    q = matrix @ rng.standard_normal((matrix.shape[1], sketch)).astype(np.float32)
+    q, _ = np.linalg.qr(q)
+    for _ in range(power_iterations):
+        q, _ = np.linalg.qr(matrix.T @ q)
+        q, _ = np.linalg.qr(matrix @ q)
+    _, _, vt = np.linalg.svd(np.asarray(matrix.T @ q).T, full_matrices=False)
+    return vt[:dimensions].astype(np.float32)
+
+def embed(matrix, components):
+    """Unit-length LSA vectors of TF-IDF rows, computed in blocks"""
+    out = np.empty((matrix.shape[0], components.shape[0]), dtype=np.float32)
+    for start in range(0, matrix.shape[0], BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + BLOCK_ROWS] @ components.T)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        out[start:start + BLOCK_ROWS] = block / np.maximum(norms, 1e-12)
+    return out
+
+def quantize(vectors):
+    """int8 codes and one float32 scale per vector"""
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def nearest_centroids(vectors, centroids):
+    """Index of each vector's nearest centroid by cosine similarity, in blocks"""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        out[start:start + BLOCK_ROWS] = np.argmax(vectors[start:start + BLOCK_ROWS] @ centroids.T, axis=1)
+    return out
+
+def kmeans(vectors, k, iterations=KMEANS_ITERATIONS, sample=KMEANS_SAMPLE, seed=0):
+    """Spherical k-means centroids, trained on a sample of unit vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists with random vectors rather than leaving them dead
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+def top_k(scores, k):
+    """Positions of the k highest scores, best first"""
+    if len(scores) > k:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+def save_index(directory, ids, vectors, components, terms, idf, lists=None, seed=0):
+    """
+    Quantize unit vectors, group them into IVF lists and write the index.
+
+    lists defaults to about sqrt(len(vectors)) centroids.
+    """
+    n = len(vectors)
+    lists = lists or max(1, min(int(math.sqrt(n)), n))
+    centroids = kmeans(vectors, lists, seed=seed)
+    labels = nearest_centroids(vectors, centroids)
+    # Store each list contiguously, so probing reads a few ranges of the memmap
+    order = np.argsort(labels, kind='stable')
+    offsets = np.searchsorted(labels[order], np.arange(lists + 1)).astype(np.int64)
+    codes, scales = quantize(vectors[order])
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'embeddings.npy'), codes)
+    np.save(os.path.join(directory, 'scales.npy'), scales)
+    np.save(os.path.join(directory, 'ids.npy'), np.asarray(ids, dtype=np.int64)[order])
+    np.save(os.path.join(directory, 'centroids.npy'), centroids)
+    np.save(os.path.join(directory, 'offsets.npy'), offsets)
+    np.save(os.path.join(directory, 'components.npy'), components)
+    np.save(os.path.join(directory, 'idf.npy'), idf)
+    serialization.save(os.path.join(directory, 'meta.json'), {
+        'terms': terms,
+        'dimensions': int(components.shape[0]),
+        'vectors': n,
+        'lists': lists,
+    })
+
+def build(projects, directory=INDEX_DIR, dimensions=DIMENSIONS, lists=None, seed=0):
+    """Fit LSA on the projects and write the quantized IVF index"""
+    _require()
+    ids, terms, counts = count_matrix(projects)
+    terms, counts = prune_terms(terms, counts)
+    matrix, idf = tfidf(counts)
+    dimensions = max(1, min(dimensions, len(terms) - 1, len(ids) - 1))
+    rng = np.random.default_rng(seed)
+    sample = matrix
+    if matrix.shape[0] > FIT_SAMPLE:
+        sample = matrix[np.sort(rng.choice(matrix.shape[0], FIT_SAMPLE, replace=False))]
+    components = randomized_svd(sample, dimensions, seed=seed)
+    save_index(directory, ids, embed(matrix, components), components, terms, idf, lists, seed)
+    return SemanticIndex(directory)
+
+class SemanticIndex:
+    """A saved index; embeddings stay on disk and are paged in by the OS"""
+
+    def __init__(self, directory=INDEX_DIR):
+        _require()
+        path = lambda name: os.path.join(directory, name)
+        meta = serialization.load(path('meta.json'))
+        self.terms = meta['terms']
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self.embeddings = np.load(path('embeddings.npy'), mmap_mode='r')
+        self.scales = np.load(path('scales.npy'))
+        self.ids = np.load(path('ids.npy'))
+        self.centroids = np.load(path('centroids.npy'))
+        self.offsets = np.load(path('offsets.npy'))
+        self.components = np.load(path('components.npy'))
+        self.idf = np.load(path('idf.npy'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector(self, text):
+        """Unit LSA vector of free text, or None if it has no known terms"""
+        columns = [self.term_ids[t] for t in tokenize(text) if t in self.term_ids]
+        if not columns:
+            return None
+        counts = sparse.csr_matrix((np.ones(len(columns), dtype=np.float32),
+                                    (np.zeros(len(columns), dtype=np.int32), columns)),
+                                   shape=(1, len(self.terms)))
+        counts.sum_duplicates()
+        vector = embed(tfidf(counts, self.idf)[0], self.components)[0]
+        return vector if vector.any() else None
+
+    def _scan(self, vector, start, end):
+        scores = np.empty(end - start, dtype=np.float32)
+        for block in range(start, end, BLOCK_ROWS):
+            stop = min(block + BLOCK_ROWS, end)
+            scores[block - start:stop - start] = (
+                self.embeddings[block:stop].astype(np.float32) @ vector) * self.scales[block:stop]
+        return scores
+
+    def search_vector(self, vector, k=10, nprobe=NPROBE):
+        """
+        [(project id, cosine similarity)] of the k nearest vectors.
+
+        nprobe=0 (or >= the number of lists) scans every vector.
+        """
+        if not nprobe or nprobe >= len(self.centroids):
+            scores = self._scan(vector, 0, len(self.ids))
+            positions = top_k(scores, k)
+            return [(int(self.ids[p]), float(scores[p])) for p in positions]
+
+        probes = top_k(self.centroids @ vector, nprobe)
+        ranges = [(self.offsets[c], self.offsets[c + 1]) for c in probes]
+        scores = np.concatenate([self._scan(vector, start, end) for start, end in ranges])
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        positions = top_k(scores, k)
+        return [(int(self.ids[rows[p]]), float(scores[p])) for p in positions]
+
+    def search(self, text, k=10, nprobe=NPROBE):
+        vector = self.vector(text)
+        return [] if vector is None else self.search_vector(vector, k, nprobe)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LSA semantic search over project abstracts")
+    parser.add_argument('--index', default=INDEX_DIR, help=f"Index directory (default: {INDEX_DIR})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Fit LSA and write the index")
+    build_cmd.add_argument('--projects', default=PROJECTS_FILE)
+    build_cmd.add_argument('--dimensions', type=int, default=DIMENSIONS)
+    build_cmd.add_argument('--lists', type=int, help="IVF lists (default: about sqrt of the projects)")
+
+    search = sub.add_parser('search', help="Nearest projects to a query")
+    search.add_argument('query')
+    search.add_argument('--top', type=int, default=10)
+    search.add_argument('--nprobe', type=int, default=NPROBE, help="IVF lists to scan (0: all)")
+    search.add_argument('--projects', default=PROJECTS_FILE, help="For showing titles")
+
+    args = parser.parse_args(argv)
+    try:
+        _require()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        index = build(iter_records(args.projects), args.index, args.dimensions, args.lists)
+        print(f"Indexed {len(index)} projects: {len(index.terms)} terms, "
+              f"{index.components.shape[0]} dimensions, {len(index.centroids)} lists "
+              f"in {time.perf_counter() - start:.1f}s")
+    elif args.command == 'search':
+        index = SemanticIndex(args.index)
+        start = time.perf_counter()
+        results = index.search(args.query, args.top, args.nprobe)
+        elapsed = time.perf_counter() - start
+        wanted = {project_id for project_id, _ in results}
+        titles = {}
+        if wanted and os.path.exists(args.projects):
+            titles = {p['id']: p.get('title', '') for p in iter_records(args.projects) if p.get('id') in wanted}
+        print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+        for project_id, score in results:
+            print(f"  {score:.3f} {project_id:>7}  {titles.get(project_id, '')[:80]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Fast JSON serialization for the data files
+- msgspec (or orjson) encoders and decoders, falling back to the json module
+- Typed Project, Winner and Student schemas, validated on load
+- Compact output by default; pretty printing on request
+
+Set CURIOUSMAILS_PRETTY_JSON=1 to write the indented files every script
+used to produce.
+
+Usage:
+    python serialization.py validate data/students.json
+    python serialization.py bench data/students.json --repeat 5
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRETTY_ENV = 'CURIOUSMAILS_PRETTY_JSON'
+
+BACKEND = 'msgspec' if msgspec else 'orjson' if orjson else 'json'
+
+class SchemaError(ValueError):
+    """A record doesn't match its schema"""
+
+# Known fields per record type. Every field is optional except 'id', and
+# unknown fields are kept, so loading and saving never drops data.
+PROJECT_FIELDS = {
+    'id': int,
+    'title': str,
+    'student_name': str,
+    'category': str,
+    'year': str,
+    'booth': str,
+    'country': str,
+    'abstract': str,
+    'awards': List[str],
+    'primary_category': str,
+    'categories': List[str],
+}
+
+WINNER_FIELDS = {
+    'student_name': str,
+    'project_title': Optional[str],
+    'year': Optional[str],
+    'awards': List[str],
+    'emails': List[str],
+    'linkedin_profiles': List[str],
+    'search_queries': List[str],
+    'email_candidates': List[dict],
+    'uni': str,
+    'category': str,
+    'country': str,
+    'booth': str,
+    'primary_category': str,
+    'categories': List[str],
+}
+
+STUDENT_FIELDS = {
+    'uni': str,
+    'year': str,
+    'first': str,
+    'last': str,
+    'major': str,
+    'email': str,
+    'notes': str,
+    'source_file': str,
+}
+
+REQUIRED_FIELDS = {'id'}
+
+def _struct(name, fields, strict=False):
+    """
+    Build a msgspec Struct whose missing fields stay missing on re-encode;
+    strict ones reject unknown fields instead of dropping them
+    """
+    spec = []
+    for field, kind in fields.items():
+        if field in REQUIRED_FIELDS:
+            spec.append((field, kind))
+        else:
+            spec.append((field, kind | msgspec.UnsetType, msgspec.UNSET))
+    # Required fields must come before the ones with defaults
+    spec.sort(key=lambda item: len(item) == 3)
+    return msgspec.defstruct(name, spec, kw_only=True, omit_defaults=True,
+                             forbid_unknown_fields=strict)
+
+if msgspec is not None:
+    Project = _struct('Project', PROJECT_FIELDS)
+    Winner = _struct('Winner', WINNER_FIELDS)
+    Student = _struct('Student', STUDENT_FIELDS)
+
+    # Top-level shape of each data file
+    SCHEMAS = {
+        'projects': List[Project],
+        'winners': Dict[str, Winner],
+        'students': List[Student],
+    }
+
+    # Decoders straight into strict structs: validating while decoding is one
+    # pass, and a file whose records have no unknown fields comes back whole
+    _validating_decoders = {
+        'projects': msgspec.json.Decoder(List[_struct('Project', PROJECT_FIELDS, strict=True)]),
+        'winners': msgspec.json.Decoder(Dict[str, _struct('Winner', WINNER_FIELDS, strict=True)]),
+        'students': msgspec.json.Decoder(List[_struct('Student', STUDENT_FIELDS, strict=True)]),
+    }
+
+    _encoder = msgspec.json.Encoder()
+    _decoder = msgspec.json.Decoder()
+else:
+    Project = Winner = Student = None
+    SCHEMAS = {'projects': None, 'winners': None, 'students': None}
+
+_FIELDS = {'projects': PROJECT_FIELDS, 'winners': WINNER_FIELDS, 'students': STUDENT_FIELDS}
+
+def pretty_default():
+    """Whether files are written indented when the caller doesn't say"""
+    return os.environ.get(PRETTY_ENV, '').lower() in ('1', 'true', 'yes')
+
+def default_indent():
+    """Indent for streamed JSON arrays, matching pretty_default()"""
+    return 2 if pretty_default() else None
+
+def dumps(obj, pretty=False):
+    """Encode obj to UTF-8 JSON bytes"""
+    if msgspec is not None:
+        data = _encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def loads(data):
+    """Decode JSON bytes or str into plain Python objects"""
+    if msgspec is not None:
+        return _decoder.decode(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _matches(value, kind):
+    """isinstance() for the small set of types used in the field tables"""
+    if kind is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind is str:
+        return isinstance(value, str)
+    if kind == Optional[str]:
+        return value is None or isinstance(value, str)
+    if kind == List[str]:
+        return isinstance(value, list) and all(isinstance(v, str) for v in value)
+    return True
+
+def _validate_fallback(obj, schema):
+    """Pure-Python schema check used when msgspec isn't installed"""
+    fields = _FIELDS[schema]
+    if schema == 'winners':
+        if not isinstance(obj, dict):
+            raise SchemaError("Expected `object`, got `%s`" % type(obj).__name__)
+        items = obj.items()
+    else:
+        if not isinstance(obj, list):
+            raise SchemaError("Expected `array`, got `%s`" % type(obj).__name__)
+        items = enumerate(obj)
+
+    for key, record in items:
+        if not isinstance(record, dict):
+            raise SchemaError(f"Expected `object` - at `$[{key!r}]`")
+        for field in REQUIRED_FIELDS & fields.keys():
+            if field not in record:
+                raise SchemaError(f"Object missing required field `{field}` - at `$[{key!r}]`")
+        for field, value in record.items():
+            kind = fields.get(field)
+            if kind is not None and not _matches(value, kind):
+                raise SchemaError(f"Invalid type for `{field}` - at `$[{key!r}].{field}`")
+
+def validate(obj, schema):
+    """
+    Check decoded data against a schema ('projects', 'winners' or 'students').
+
+    Raises:
+        SchemaError: naming the first offending record and field
+    """
+    if schema not in _FIELDS:
+        raise ValueError(f"Unknown schema '{schema}' (choose from {', '.join(_FIELDS)})")
+    if msgspec is None:
+        _validate_fallback(obj, schema)
+        return
+    try:
+        msgspec.convert(obj, SCHEMAS[schema])
+    except msgspec.ValidationError as e:
+        raise SchemaError(str(e)) from None
+
+def _loads_validated(data, schema):
+    """
+    Decode and validate JSON bytes into plain Python objects.
+
+    With msgspec this decodes straight into the schema's structs and only
+    then builds dicts. Records with fields the schema doesn't know make that
+    fail; those files take the slower decode-then-validate path, which keeps
+    the unknown fields.
+    """
+    if msgspec is not None and schema in _FIELDS:
+        try:
+            return msgspec.to_builtins(_validating_decoders[schema].decode(data))
+        except msgspec.ValidationError:
+            pass
+    obj = loads(data)
+    validate(obj, schema)
+    return obj
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic GC; decoding only creates acyclic containers"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def load(path, schema=None, typed=False):
+    """
+    Load a JSON data file.
+
+    Args:
+        schema: Validate against 'projects', 'winners' or 'students'
+        typed: Return Project/Winner/Student structs instead of dicts
+            (needs msgspec; unknown fields are dropped)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if typed:
+        if msgspec is None:
+            raise RuntimeError("Typed records need msgspec. Install it with: pip install msgspec")
+        try:
+            with _gc_paused():
+                return msgspec.json.decode(data, type=SCHEMAS[schema])
+        except msgspec.ValidationError as e:
+            raise SchemaError(f"{path}: {e}") from None
+
+    with _gc_paused():
+        if not schema:
+            return loads(data)
+        try:
+            return _loads_validated(data, schema)
+        except SchemaError as e:
+            raise SchemaError(f"{path}: {e}") from None
+
+def save(path, obj, pretty=None):
+    """
+    Write obj to path atomically.
+
+    Compact unless pretty is True, or pretty is None and
+    CURIOUSMAILS_PRETTY_JSON is set.
+    """
+    if pretty is None:
+        pretty = pretty_default()
+    data = dumps(obj, pretty)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _guess_schema(path):
+    name = os.path.basename(path)
+    if 'winner' in name:
+        return 'winners'
+    if 'student' in name:
+        return 'students'
+    return 'projects'
+
+def benchmark(path, repeat=3):
+    """Best-of-repeat load and save times for the json module and this module"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    obj = json.loads(raw)
+    schema = _guess_schema(path)
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            # GC paused for every backend, as load() does
+            with _gc_paused():
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        return min(times)
+
+    return {
+        'json load': best(lambda: json.loads(raw)),
+        f'{BACKEND} load': best(lambda: loads(raw)),
+        f'{BACKEND} load+validate': best(lambda: _loads_validated(raw, schema)),
+        'json save (indent=2)': best(lambda: json.dumps(obj, indent=2)),
+        f'{BACKEND} save': best(lambda: dumps(obj)),
+        f'{BACKEND} save (pretty)': best(lambda: dumps(obj, pretty=True)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate data files and compare JSON backends")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    check = sub.add_parser('validate', help="Check a data file against its schema")
+    check.add_argument('file')
+    check.add_argument('--schema', choices=sorted(_FIELDS), help="Default: guessed from the file name")
+
+    bench = sub.add_parser('bench', help="Time load/save with the json module vs the fast backend")
+    bench.add_argument('file')
+    bench.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'validate':
+        schema = args.schema or _guess_schema(args.file)
+        try:
+            obj = load(args.file, schema)
+        except SchemaError as e:
+            raise SystemExit(f"Invalid: {e}")
+        print(f"{args.file}: {len(obj)} {schema} records OK ({BACKEND} backend)")
+    elif args.command == 'bench':
+        results = benchmark(args.file, args.repeat)
+        baseline_load = results['json load']
+        baseline_save = results['json save (indent=2)']
+        for name, seconds in results.items():
+            baseline = baseline_load if 'load' in name else baseline_save
+            print(f"  {name:<26} {seconds * 1000:9.2f} ms  {baseline / seconds:5.1f}x")
+
+if __name__ == '__main__':
+    main()
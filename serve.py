@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Static server for the webapp and its data files
+- build: precompresses data/*.json and the HTML pages to .gz (and .br when
+  the brotli package is installed) next to each file
+- run: serves them with Accept-Encoding negotiation, strong ETags and 304s,
+  single Range requests and one thread per connection
+- Routes come from vercel.json, so / and /students resolve like on Vercel
+
+Usage:
+    python serve.py build                  # precompress after regenerating data
+    python serve.py run --port 8000        # serve (builds stale files first)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Files worth precompressing, relative to the root
+COMPRESS_PATTERNS = [r'data/.+\.json', r'[^/]+\.html']
+
+# Responses that may change whenever the data is regenerated are revalidated
+# with their ETag; anything else can be cached for an hour
+REVALIDATE_PATTERNS = [r'data/.+', r'[^/]+\.html']
+MAX_AGE = 3600
+
+# Below this size compression doesn't pay for the extra header and CPU
+MIN_COMPRESS_SIZE = 1024
+
+CHUNK_SIZE = 64 * 1024
+
+# Preferred first when the client accepts both equally
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def iter_compressible(root='.'):
+    """Relative paths under root matching COMPRESS_PATTERNS"""
+    patterns = [re.compile(p) for p in COMPRESS_PATTERNS]
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+            if any(p.fullmatch(relpath) for p in patterns):
+                yield relpath
+
+def _is_fresh(source, sidecar):
+    try:
+        return os.stat(sidecar).st_mtime_ns >= os.stat(source).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def _write_sidecar(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def build(root='.', force=False):
+    """
+    Write .gz (and .br) files next to every compressible file that changed.
+
+    Returns:
+        [(relpath, original_bytes, {encoding: compressed_bytes})] for rebuilt files
+    """
+    brotli = _brotli()
+    built = []
+    for relpath in iter_compressible(root):
+        path = os.path.join(root, relpath)
+        size = os.path.getsize(path)
+        if size < MIN_COMPRESS_SIZE:
+            continue
+        targets = [('gzip', path + '.gz')]
+        if brotli:
+            targets.append(('br', path + '.br'))
+        stale = [(enc, target) for enc, target in targets if force or not _is_fresh(path, target)]
+        if not stale:
+            continue
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        sizes = {}
+        for encoding, target in stale:
+            if encoding == 'gzip':
+                # mtime=0 keeps the output (and so its ETag) stable across builds
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            else:
+                compressed = brotli.compress(data, quality=11)
+            _write_sidecar(target, compressed)
+            sizes[encoding] = len(compressed)
+        built.append((relpath, size, sizes))
+    return built
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def choose_encoding(header, available):
+    """Best coding in available the client accepts, or None for identity"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range.
+
+    Returns:
+        None if the header should be ignored (missing, malformed or
+        multiple ranges), 'unsatisfiable' if no byte of it exists
+    """
+    match = _RANGE_RE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, end
+
+class ETagCache:
+    """Strong ETags keyed by (path, size, mtime), hashed once per file version"""
+
+    def __init__(self):
+        self._etags = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, stat):
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            etag = self._etags.get(key)
+        if etag is None:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            etag = f'"{digest.hexdigest()}"'
+            with self._lock:
+                self._etags[key] = etag
+        return etag
+
+def load_routes(root='.'):
+    """[(compiled src, dest)] from vercel.json, or [] without one"""
+    try:
+        with open(os.path.join(root, 'vercel.json'), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return []
+    return [(re.compile(route['src']), route['dest']) for route in config.get('routes', [])]
+
+def apply_routes(routes, path):
+    """Rewrite a URL path with the first matching route"""
+    for pattern, dest in routes:
+        match = pattern.fullmatch(path)
+        if match:
+            return re.sub(r"\$(\d+)", lambda m: match.group(int(m.group(1))) or '', dest)
+    return path
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    """GET/HEAD of precompressed static files; no directory listings"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'curiousmails'
+    routes = []
+    etags = ETagCache()
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        url_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        url_path = apply_routes(self.routes, url_path)
+        if any(part.startswith('.') for part in url_path.split('/')):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        path = self.translate_path(url_path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        relpath = os.path.relpath(path, self.directory).replace(os.sep, '/')
+        range_header = self.headers.get('Range')
+
+        # Ranges are served from the identity representation only
+        encoding, body_path = None, path
+        if not range_header:
+            available = {coding: path + suffix for coding, suffix in ENCODINGS
+                         if _is_fresh(path, path + suffix)}
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'), list(available))
+            if encoding:
+                body_path = available[encoding]
+
+        stat = os.stat(body_path)
+        etag = self.etags.get(body_path, stat)
+        size = stat.st_size
+        last_modified = os.stat(path).st_mtime
+
+        if self._not_modified(etag, last_modified):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_common_headers(relpath, etag, last_modified)
+            self.end_headers()
+            return
+
+        status, start, end = HTTPStatus.OK, 0, size - 1
+        if range_header and self._if_range_matches(etag, last_modified):
+            byte_range = parse_range(range_header, size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range:
+                status, (start, end) = HTTPStatus.PARTIAL_CONTENT, byte_range
+
+        self.send_response(status)
+        self._send_common_headers(relpath, etag, last_modified)
+        self.send_header('Content-Type', self.guess_type(path))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(max(end - start + 1, 0)))
+        self.end_headers()
+
+        if send_body and end >= start:
+            with open(body_path, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    def _send_common_headers(self, relpath, etag, last_modified):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(last_modified, usegmt=True))
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Accept-Ranges', 'bytes')
+        if any(re.fullmatch(p, relpath) for p in REVALIDATE_PATTERNS):
+            self.send_header('Cache-Control', 'no-cache')
+        else:
+            self.send_header('Cache-Control', f'public, max-age={MAX_AGE}')
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        return self._modified_since_ok(self.headers.get('If-Modified-Since'), last_modified)
+
+    def _if_range_matches(self, etag, last_modified):
+        if_range = self.headers.get('If-Range')
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            return if_range == etag
+        return self._modified_since_ok(if_range, last_modified)
+
+    @staticmethod
+    def _modified_since_ok(header, last_modified):
+        """True if the file hasn't changed since the HTTP date in header"""
+        if not header:
+            return False
+        try:
+            since = parsedate_to_datetime(header).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+def make_server(root='.', host='127.0.0.1', port=8000):
+    """ThreadingHTTPServer serving root with vercel.json routes"""
+    root = os.path.abspath(root)
+
+    class Handler(StaticHandler):
+        routes = load_routes(root)
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=root, **kwargs)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+def _report(built):
+    if not _brotli():
+        print("brotli not installed: writing .gz only (pip install brotli for .br)")
+    for relpath, size, sizes in built:
+        parts = ', '.join(f"{enc} {n / 1024:.0f} KB" for enc, n in sizes.items())
+        print(f"  {relpath}: {size / 1024:.0f} KB -> {parts}")
+    print(f"Compressed {len(built)} files")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompress and serve the webapp")
+    parser.add_argument('--root', default='.', help="Directory to serve (default: .)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Precompress data files and pages")
+    build_cmd.add_argument('--force', action='store_true', help="Recompress unchanged files too")
+
+    run = sub.add_parser('run', help="Serve the webapp")
+    run.add_argument('--host', default='127.0.0.1')
+    run.add_argument('--port', type=int, default=8000)
+    run.add_argument('--no-build', action='store_true', help="Don't precompress stale files first")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        _report(build(args.root, args.force))
+    elif args.command == 'run':
+        if not args.no_build:
+            _report(build(args.root))
+        server = make_server(args.root, args.host, args.port)
+        print(f"Serving {os.path.abspath(args.root)} on http://{args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+if __name__ == '__main__':
+    main()
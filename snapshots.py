@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Versioned snapshots of the data files with delta files between versions
+- Each snapshot of a dataset (projects, winners, students) gets the next
+  version number, unless nothing changed since the last one
+- Records are identified by key (project id, winner object key, or a
+  student's university, year, name and email) and
+  content-addressed by a hash of their canonical JSON, so a snapshot streams
+  the file once and keeps only added and changed records
+- Every version writes its record hashes and a delta (added, changed,
+  removed) against the version before it; version 1's delta holds every
+  record, and a full base copy is written every BASE_INTERVAL versions
+- manifest.json lists the versions; clients and downstream jobs apply the
+  deltas newer than the version they hold instead of reloading everything
+- Any version can be rebuilt from the nearest base plus its deltas
+
+Usage:
+    python snapshots.py snapshot                    # every dataset file that exists
+    python snapshots.py snapshot projects --note "2025 scrape"
+    python snapshots.py list projects
+    python snapshots.py delta projects --since 3    # one combined delta, version 3 -> latest
+    python snapshots.py rebuild projects --version 3 --output /tmp/projects-v3.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import serialization
+from jsonstream import iter_json_object, iter_records
+
+SNAPSHOT_DIR = "data/versions"
+
+def _student_key(student):
+    return '|'.join(student.get(f) or '' for f in ('uni', 'year', 'last', 'first', 'email'))
+
+# dataset -> (source file, record key); winners are an object keyed by project id
+DATASETS = {
+    'projects': ("data/projects.json", lambda project: str(project['id'])),
+    'winners': ("data/winner_emails.json", None),
+    'students': ("data/students.json", _student_key),
+}
+
+# A full copy is kept every BASE_INTERVAL versions, so a rebuild applies at
+# most BASE_INTERVAL deltas
+BASE_INTERVAL = 10
+
+def record_hash(record):
+    """Content address of a record: blake2b of its canonical JSON"""
+    data = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=12).hexdigest()
+
+def iter_keyed(dataset, path):
+    """Yield (key, record) from a dataset file; keys are strings"""
+    _, key = DATASETS[dataset]
+    if key is None:
+        for name, record in iter_json_object(path):
+            yield str(name), record
+        return
+    seen = {}
+    for record in iter_records(path):
+        name = key(record)
+        # Identical keys (students listed twice) are told apart by position
+        count = seen[name] = seen.get(name, 0) + 1
+        yield (name if count == 1 else f"{name}#{count}"), record
+
+def apply_delta(records, delta):
+    """
+    Apply a delta to {key: record} in place.
+
+    Changed records keep their position; added records go at the end.
+    """
+    for key in delta['removed']:
+        records.pop(key, None)
+    records.update(delta['changed'])
+    records.update(delta['added'])
+    return records
+
+def to_dataset(dataset, records):
+    """{key: record} back into the file's shape"""
+    return records if DATASETS[dataset][1] is None else list(records.values())
+
+class Snapshots:
+    """
+    Versions of one dataset, stored under SNAPSHOT_DIR/<dataset>/.
+
+    Files:
+        manifest.json       versions, newest last
+        v<N>.hashes.json    {key: record hash} at version N
+        v<N>.delta.json     {'from', 'to', 'added', 'changed', 'removed'}
+        v<N>.base.json      every record at version N (every BASE_INTERVAL versions)
+    """
+
+    def __init__(self, dataset, root=SNAPSHOT_DIR):
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}' (choose from {', '.join(DATASETS)})")
+        self.dataset = dataset
+        self.directory = os.path.join(root, dataset)
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        if os.path.exists(self.manifest_path):
+            self.manifest = serialization.load(self.manifest_path)
+        else:
+            self.manifest = {'dataset': dataset, 'versions': []}
+
+    @property
+    def versions(self):
+        return self.manifest['versions']
+
+    @property
+    def latest(self):
+        return self.versions[-1]['version'] if self.versions else 0
+
+    def _path(self, version, kind):
+        return os.path.join(self.directory, f"v{version}.{kind}.json")
+
+    def _entry(self, version):
+        for entry in self.versions:
+            if entry['version'] == version:
+                return entry
+        raise KeyError(f"{self.dataset} has no version {version} (latest is {self.latest})")
+
+    def hashes(self, version):
+        return serialization.load(self._path(version, 'hashes')) if version else {}
+
+    def delta(self, version):
+        return serialization.load(self._path(version, 'delta'))
+
+    def snapshot(self, path=None, note=''):
+        """
+        Record the current dataset file as a new version.
+
+        Returns:
+            The new manifest entry, or None if nothing changed
+        """
+        path = path or DATASETS[self.dataset][0]
+        previous = self.hashes(self.latest)
+        hashes = {}
+        added, changed = {}, {}
+        for key, record in iter_keyed(self.dataset, path):
+            digest = record_hash(record)
+            hashes[key] = digest
+            old = previous.get(key)
+            if old is None:
+                added[key] = record
+            elif old != digest:
+                changed[key] = record
+        removed = [key for key in previous if key not in hashes]
+        if self.versions and not (added or changed or removed):
+            return None
+
+        version = self.latest + 1
+        delta = {'from': self.latest, 'to': version,
+                 'added': added, 'changed': changed, 'removed': removed}
+        base = version > 1 and (version - 1) % BASE_INTERVAL == 0
+        serialization.save(self._path(version, 'hashes'), hashes)
+        serialization.save(self._path(version, 'delta'), delta)
+        if base:
+            self._save_base(version, path)
+
+        entry = {
+            'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'note': note,
+            'records': len(hashes),
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'base': base,
+            'delta_bytes': os.path.getsize(self._path(version, 'delta')),
+        }
+        self.versions.append(entry)
+        # The manifest is written last, so readers never see a version whose files are missing
+        serialization.save(self.manifest_path, self.manifest)
+        return entry
+
+    def _save_base(self, version, path):
+        serialization.save(self._path(version, 'base'), dict(iter_keyed(self.dataset, path)))
+
+    def combined_delta(self, since, until=None):
+        """
+        One delta taking a client from version `since` to `until` (default latest).
+
+        Records changed several times appear once, with their final content;
+        records added and then removed in between are left out.
+        """
+        until = self.latest if until is None else until
+        self._entry(until)
+        if since:
+            self._entry(since)
+        if since > until:
+            raise ValueError(f"since (v{since}) is after until (v{until})")
+        old = self.hashes(since)
+        upserts, removed = {}, set()
+        for version in range(since + 1, until + 1):
+            delta = self.delta(version)
+            for key in delta['removed']:
+                upserts.pop(key, None)
+                removed.add(key)
+            for key, record in (*delta['changed'].items(), *delta['added'].items()):
+                removed.discard(key)
+                upserts[key] = record
+        new = self.hashes(until)
+        return {
+            'from': since,
+            'to': until,
+            'added': {k: r for k, r in upserts.items() if k not in old},
+            'changed': {k: r for k, r in upserts.items() if k in old and old[k] != new[k]},
+            'removed': sorted(k for k in removed if k in old),
+        }
+
+    def rebuild(self, version=None):
+        """{key: record} at a version, from the nearest base at or before it plus deltas"""
+        version = self.latest if version is None else version
+        self._entry(version)
+        base = max((e['version'] for e in self.versions if e['base'] and e['version'] <= version), default=0)
+        records = serialization.load(self._path(base, 'base')) if base else {}
+        for v in range(base + 1, version + 1):
+            apply_delta(records, self.delta(v))
+        return records
+
+    def verify(self, version):
+        """Whether a rebuilt version matches its stored record hashes"""
+        records = self.rebuild(version)
+        return {key: record_hash(r) for key, r in records.items()} == self.hashes(version)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned dataset snapshots and deltas")
+    parser.add_argument('--root', default=SNAPSHOT_DIR, help=f"Snapshot directory (default: {SNAPSHOT_DIR})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    snap = sub.add_parser('snapshot', help="Record new versions of the data files")
+    snap.add_argument('datasets', nargs='*', metavar='dataset',
+                      help=f"Datasets to snapshot ({', '.join(DATASETS)}; default: all that exist)")
+    snap.add_argument('--path', help="Read this file instead of the dataset's usual one")
+    snap.add_argument('--note', default='')
+
+    listing = sub.add_parser('list', help="Show a dataset's versions")
+    listing.add_argument('dataset', choices=DATASETS)
+
+    delta = sub.add_parser('delta', help="Write one delta between two versions")
+    delta.add_argument('dataset', choices=DATASETS)
+    delta.add_argument('--since', type=int, required=True, help="Version the client has (0: none)")
+    delta.add_argument('--until', type=int, help="Target version (default: latest)")
+    delta.add_argument('--output', help="Write here instead of printing a summary")
+
+    rebuild = sub.add_parser('rebuild', help="Rebuild a dataset file as of a version")
+    rebuild.add_argument('dataset', choices=DATASETS)
+    rebuild.add_argument('--version', type=int, help="Default: latest")
+    rebuild.add_argument('--output', required=True)
+    rebuild.add_argument('--verify', action='store_true', help="Check the result against the stored hashes")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'snapshot':
+        unknown = [d for d in args.datasets if d not in DATASETS]
+        if unknown:
+            parser.error(f"unknown dataset(s) {', '.join(unknown)} (choose from {', '.join(DATASETS)})")
+        datasets = args.datasets or [d for d, (path, _) in DATASETS.items() if os.path.exists(path)]
+        if args.path and len(datasets) != 1:
+            parser.error("--path needs exactly one dataset")
+        for dataset in datasets:
+            entry = Snapshots(dataset, args.root).snapshot(args.path, args.note)
+            if entry is None:
+                print(f"{dataset}: unchanged")
+            else:
+                print(f"{dataset}: version {entry['version']} ({entry['records']} records, "
+                      f"+{entry['added']} ~{entry['changed']} -{entry['removed']}, "
+                      f"delta {entry['delta_bytes']:,} bytes{', base' if entry['base'] else ''})")
+        return
+
+    snapshots = Snapshots(args.dataset, args.root)
+    if args.command == 'list':
+        for e in snapshots.versions:
+            print(f"  v{e['version']:<4} {e['created']}  {e['records']:>7} records  "
+                  f"+{e['added']} ~{e['changed']} -{e['removed']}{'  base' if e['base'] else ''}"
+                  f"{'  ' + e['note'] if e['note'] else ''}")
+    elif args.command == 'delta':
+        try:
+            combined = snapshots.combined_delta(args.since, args.until)
+        except (KeyError, ValueError) as e:
+            parser.error(e.args[0])
+        if args.output:
+            serialization.save(args.output, combined)
+        print(f"v{combined['from']} -> v{combined['to']}: +{len(combined['added'])} "
+              f"~{len(combined['changed'])} -{len(combined['removed'])}"
+              f"{' written to ' + args.output if args.output else ''}")
+    elif args.command == 'rebuild':
+        version = snapshots.latest if args.version is None else args.version
+        try:
+            snapshots._entry(version)
+        except KeyError as e:
+            parser.error(e.args[0])
+        serialization.save(args.output, to_dataset(args.dataset, snapshots.rebuild(version)))
+        print(f"Rebuilt {args.dataset} v{version} into {args.output}")
+        if args.verify:
+            ok = snapshots.verify(version)
+            print("  matches stored hashes" if ok else "  DOES NOT match stored hashes")
+            if not ok:
+                raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant query terms for project search
+- Vocabulary of every title and abstract term with its document frequency
+- SymSpell deletion index: each term is stored under the strings left after
+  deleting up to MAX_DISTANCE of its first PREFIX_LENGTH characters, so a
+  misspelling is corrected with a few dict lookups instead of a scan
+- Corrections are expanded into exact postings lookups by api.py
+  (/api/search?fuzzy=1 and /api/suggest)
+- export writes the vocabulary for the webapp, which can build the same
+  index in the browser
+
+Usage:
+    python spelling.py suggest photovoltiac antibotic
+    python spelling.py export                      # data/spelling.json
+    python spelling.py bench --queries 2000        # latency and accuracy
+"""
+
+import argparse
+import random
+import re
+import time
+from collections import Counter
+
+import serialization
+from jsonstream import iter_records
+
+PROJECTS_FILE = "data/projects.json"
+EXPORT_FILE = "data/spelling.json"
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_TERM_LENGTH = 3
+TEXT_FIELDS = ('title', 'abstract')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """Lowercase alphanumeric terms of text"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+def edit_distance(a, b, limit=MAX_DISTANCE):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), or limit + 1 as soon as it must exceed limit.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+def _deletes(word, distance):
+    """Every string left after deleting up to `distance` characters of word"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        results |= frontier
+    return results
+
+class SymSpell:
+    """
+    Deletion index over a {term: count} vocabulary.
+
+    Args:
+        counts: Document frequency per term; more frequent terms win ties
+    """
+
+    def __init__(self, counts, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.counts = dict(counts)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = {}        # deleted prefix -> term or [terms]
+        for term in self.counts:
+            for key in _deletes(term[:prefix_length], max_distance):
+                entry = self.deletes.get(key)
+                if entry is None:
+                    # Most keys point at one term; only collisions get a list
+                    self.deletes[key] = term
+                elif isinstance(entry, list):
+                    entry.append(term)
+                else:
+                    self.deletes[key] = [entry, term]
+
+    @classmethod
+    def from_projects(cls, path=PROJECTS_FILE, **kwargs):
+        return cls(build_vocabulary(iter_records(path)), **kwargs)
+
+    def __contains__(self, term):
+        return term in self.counts
+
+    def lookup(self, word, max_distance=None, limit=3):
+        """
+        Closest vocabulary terms to word.
+
+        Returns:
+            [(term, distance, count)], nearest then most frequent first;
+            [(word, 0, count)] if word is itself a term
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if word in self.counts:
+            return [(word, 0, self.counts[word])]
+
+        prefix = word[:self.prefix_length]
+        # Characters beyond the prefix still count towards the distance
+        seen = set()
+        found = []
+        best = max_distance
+        for key in _deletes(prefix, max_distance):
+            entry = self.deletes.get(key)
+            if entry is None:
+                continue
+            for term in (entry if isinstance(entry, list) else (entry,)):
+                if term in seen:
+                    continue
+                seen.add(term)
+                distance = edit_distance(word, term, best)
+                if distance <= best:
+                    if distance < best:
+                        # Only keep candidates at the best distance seen so far
+                        found = [c for c in found if c[1] <= distance]
+                        best = distance
+                    found.append((term, distance, self.counts[term]))
+        found.sort(key=lambda c: (c[1], -c[2], c[0]))
+        return found[:limit]
+
+    def correct(self, word):
+        """Best correction of word, or None"""
+        candidates = self.lookup(word, limit=1)
+        return candidates[0][0] if candidates else None
+
+    def to_dict(self):
+        """Vocabulary export; the deletion index is rebuilt by whoever loads it"""
+        terms = sorted(self.counts, key=lambda t: (-self.counts[t], t))
+        return {
+            'max_distance': self.max_distance,
+            'prefix_length': self.prefix_length,
+            'terms': terms,
+            'counts': [self.counts[t] for t in terms],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(zip(data['terms'], data['counts'])),
+                   data['max_distance'], data['prefix_length'])
+
+def build_vocabulary(projects, fields=TEXT_FIELDS, min_length=MIN_TERM_LENGTH):
+    """{term: number of projects using it} over the given text fields"""
+    counts = Counter()
+    for project in projects:
+        terms = set()
+        for field in fields:
+            terms.update(tokenize(project.get(field)))
+        counts.update(t for t in terms if len(t) >= min_length and not t.isdigit())
+    return counts
+
+def misspell(rng, word, edits):
+    """Apply `edits` random deletions, insertions, substitutions or swaps"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        kind = rng.choice(('delete', 'insert', 'substitute', 'transpose'))
+        if kind == 'delete' and len(word) > 3:
+            word = word[:i] + word[i + 1:]
+        elif kind == 'insert':
+            word = word[:i] + rng.choice(letters) + word[i:]
+        elif kind == 'transpose' and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(letters.replace(word[i], '')) + word[i + 1:]
+    return word
+
+def _synthetic_vocabulary(size, seed):
+    """Zipf-weighted made-up terms when there is no projects file"""
+    rng = random.Random(seed)
+    syllables = ['an', 'ber', 'cha', 'do', 'el', 'fin', 'gar', 'ho', 'is', 'ju', 'ka', 'lo', 'mar',
+                 'ne', 'or', 'pa', 'qui', 'ro', 'sa', 'ti', 'un', 'ver', 'wen', 'yx', 'zo', 'tion']
+    counts = {}
+    while len(counts) < size:
+        term = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        counts.setdefault(term, max(1, int(size / (len(counts) + 1))))
+    return counts
+
+def benchmark(counts, queries=2000, seed=0):
+    """
+    Correction latency and accuracy on misspelled vocabulary terms, against
+    a brute-force scan of the whole vocabulary.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    index = SymSpell(counts)
+    build = time.perf_counter() - start
+
+    terms = [t for t in counts if len(t) >= 5]
+    weights = [counts[t] for t in terms]
+    cases = []
+    for _ in range(queries):
+        word = rng.choices(terms, weights)[0]
+        cases.append((word, misspell(rng, word, rng.choice((1, 1, 2)))))
+
+    def scan(word):
+        best = None
+        for term, count in counts.items():
+            d = edit_distance(word, term)
+            if d <= MAX_DISTANCE and (best is None or (d, -count) < best[0]):
+                best = ((d, -count), term)
+        return best[1] if best else None
+
+    print(f"{len(counts)} terms, {len(index.deletes)} deletion keys, built in {build:.2f}s")
+    scan_cases = cases[:max(queries // 20, 10)]
+    for name, correct, sample in (('symspell', index.correct, cases), ('scan', scan, scan_cases)):
+        latencies = []
+        hits = 0
+        for original, typo in sample:
+            started = time.perf_counter()
+            suggestion = correct(typo)
+            latencies.append(time.perf_counter() - started)
+            hits += suggestion == original
+        latencies.sort()
+        print(f"  {name:<9} {len(sample):>6} queries  p50 {latencies[len(latencies) // 2] * 1e6:9.0f} us  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:9.0f} us  "
+              f"accuracy {hits / len(sample):.1%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Typo-tolerant vocabulary for project search")
+    parser.add_argument('--projects', default=PROJECTS_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    suggest = sub.add_parser('suggest', help="Correct words against the vocabulary")
+    suggest.add_argument('words', nargs='+')
+
+    export = sub.add_parser('export', help="Write the vocabulary for the webapp")
+    export.add_argument('--output', default=EXPORT_FILE)
+
+    bench = sub.add_parser('bench', help="Correction latency and accuracy")
+    bench.add_argument('--queries', type=int, default=2000)
+    bench.add_argument('--synthetic', type=int, metavar='N',
+                       help="Use N made-up terms instead of the projects file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        if args.synthetic:
+            counts = _synthetic_vocabulary(args.synthetic, 0)
+        else:
+            counts = build_vocabulary(iter_records(args.projects))
+        benchmark(counts, args.queries)
+        return
+
+    index = SymSpell.from_projects(args.projects)
+    if args.command == 'suggest':
+        for word in args.words:
+            candidates = index.lookup(word.lower())
+            shown = ', '.join(f"{term} (d={d}, {count} projects)" for term, d, count in candidates)
+            print(f"{word}: {shown or 'no suggestion'}")
+    elif args.command == 'export':
+        serialization.save(args.output, index.to_dict())
+        print(f"Saved {len(index.counts)} terms to {args.output}")
+
+if __name__ == '__main__':
+    main()
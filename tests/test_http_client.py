@@ -0,0 +1,226 @@
+"""
+HttpClient against a local flaky server: retries, circuit breaker states
+and dead letters
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import (CircuitOpen, DeadLetters, HttpClient, NotFound,  # noqa: E402
+                         PermanentError, TransientError)
+
+class FlakyServer:
+    """
+    Local HTTP server answering each path from a script of
+    (status, headers) responses; the last one repeats.
+    """
+
+    def __init__(self):
+        self.scripts = {}
+        self.hits = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers = server.next_response(self.path)
+                body = f"{status} {self.path}".encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def next_response(self, path):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            script = self.scripts.get(path, [(404, {})])
+            return script.pop(0) if len(script) > 1 else script[0]
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class HttpClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FlakyServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.sleeps = []
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.dead_letters = DeadLetters(os.path.join(self.tmpdir.name, 'dead_letters.jsonl'))
+
+    def client(self, **kwargs):
+        options = dict(retries=3, backoff=0.01, max_backoff=5.0, timeout=5,
+                       sleep=lambda seconds, name='sleep': self.sleeps.append((name, seconds)))
+        options.update(kwargs)
+        return HttpClient(**options)
+
+    def test_retries_transient_statuses_then_succeeds(self):
+        self.server.scripts['/flaky'] = [(503, {}), (429, {'Retry-After': '2'}), (200, {})]
+        response = self.client().get(self.server.url('/flaky'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits['/flaky'], 3)
+        self.assertEqual([name for name, _ in self.sleeps], ['retry_backoff', 'retry_backoff'])
+        # Retry-After sets a floor under the jittered backoff
+        self.assertEqual(self.sleeps[1][1], 2.0)
+
+    def test_not_found_is_not_retried(self):
+        self.server.scripts['/gone'] = [(503, {}), (404, {})]
+        client = self.client()
+        with self.assertRaises(NotFound):
+            client.get(self.server.url('/gone'))
+
+        self.assertEqual(self.server.hits['/gone'], 2)
+        self.assertEqual(client.breaker(f"127.0.0.1:{self.server.httpd.server_port}").state, 'closed')
+
+    def test_exhausted_retries_go_to_dead_letters(self):
+        self.server.scripts['/down'] = [(503, {'Retry-After': '1'})]
+        with self.assertRaises(TransientError) as caught:
+            self.client(retries=2, failure_threshold=10).get(self.server.url('/down'))
+        self.assertEqual(self.server.hits['/down'], 3)
+        self.assertEqual(caught.exception.status, 503)
+
+        self.dead_letters.add(8893, caught.exception)
+        self.dead_letters.add('x', 'name lookup failed', kind='name')
+        records = self.dead_letters.load()
+        self.assertEqual(list(records), [8893])
+        self.assertIn('503', records[8893]['reason'])
+
+    def test_breaker_opens_half_opens_and_closes(self):
+        host = f"127.0.0.1:{self.server.httpd.server_port}"
+        self.server.scripts['/down'] = [(503, {}), (503, {}), (200, {})]
+        client = self.client(retries=1, failure_threshold=2, reset_timeout=0.2)
+        breaker = client.breaker(host)
+
+        with self.assertRaises(TransientError):
+            client.get(self.server.url('/down'))
+        self.assertEqual(breaker.state, 'open')
+
+        # Open: rejected without a request reaching the server
+        with self.assertRaises(CircuitOpen):
+            client.get(self.server.url('/down'))
+        self.assertEqual(self.server.hits['/down'], 2)
+
+        time.sleep(0.25)
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertEqual(client.get(self.server.url('/down')).status_code, 200)
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_half_open_trial_reopens(self):
+        host = f"127.0.0.1:{self.server.httpd.server_port}"
+        self.server.scripts['/down'] = [(500, {})]
+        client = self.client(retries=0, failure_threshold=1, reset_timeout=0.2)
+
+        with self.assertRaises(TransientError):
+            client.get(self.server.url('/down'))
+        time.sleep(0.25)
+        with self.assertRaises(TransientError):
+            client.get(self.server.url('/down'))
+        self.assertEqual(client.breaker(host).state, 'open')
+
+class FakeSession:
+    """requests-like session raising each scripted exception in turn, then answering 200"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+
+    def get(self, url, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        return type('Response', (), {'status_code': 200, 'headers': {}})()
+
+class HalfOpenTrialTest(unittest.TestCase):
+    def client(self, errors):
+        return HttpClient(retries=0, failure_threshold=1, reset_timeout=0.05,
+                          session_factory=lambda: FakeSession(errors), sleep=lambda *args: None)
+
+    def test_permanent_error_settles_the_trial(self):
+        import requests
+        client = self.client([requests.exceptions.ConnectionError('down'),
+                              requests.exceptions.TooManyRedirects('loop')])
+        breaker = client.breaker('example.org')
+        with self.assertRaises(TransientError):
+            client.get('http://example.org/a')
+        time.sleep(0.06)
+
+        with self.assertRaises(PermanentError):
+            client.get('http://example.org/a')
+        self.assertFalse(breaker.trial_in_flight)
+        self.assertEqual(client.get('http://example.org/a').status_code, 200)
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_unexpected_error_releases_the_trial(self):
+        import requests
+        client = self.client([requests.exceptions.ConnectionError('down'), RuntimeError('bug')])
+        breaker = client.breaker('example.org')
+        with self.assertRaises(TransientError):
+            client.get('http://example.org/a')
+        time.sleep(0.06)
+
+        with self.assertRaises(RuntimeError):
+            client.get('http://example.org/a')
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertEqual(client.get('http://example.org/a').status_code, 200)
+
+    def test_broken_body_is_transient(self):
+        import requests
+        client = self.client([requests.exceptions.ChunkedEncodingError('cut off')])
+        with self.assertRaises(TransientError):
+            client.get('http://example.org/a')
+
+class DeadLettersTest(unittest.TestCase):
+    def test_clear_skips_corrupt_lines_like_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dead_letters = DeadLetters(os.path.join(tmpdir, 'dead_letters.jsonl'))
+            dead_letters.add(1, 'timeout')
+            with open(dead_letters.path, 'a') as f:
+                f.write('{"id": 2, "kind": \n')
+            dead_letters.add('a', 'timeout', kind='name')
+
+            self.assertEqual(list(dead_letters.load()), [1])
+            dead_letters.clear()
+            self.assertEqual(dead_letters.load(), {})
+            self.assertEqual(list(dead_letters.load('name')), ['a'])
+
+    def test_discard_keeps_failures_added_after_the_cutoff(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dead_letters = DeadLetters(os.path.join(tmpdir, 'dead_letters.jsonl'))
+            for project_id in (1, 2, 3):
+                dead_letters.add(project_id, 'timeout')
+            dead_letters.add(1, 'timeout', kind='name')
+            cutoff = time.time()
+            dead_letters.add(2, 'timeout again')
+
+            dead_letters.discard([1, 2], before=cutoff)
+            self.assertEqual(sorted(dead_letters.load()), [2, 3])
+            self.assertEqual(dead_letters.load()[2]['reason'], 'timeout again')
+            self.assertEqual(list(dead_letters.load('name')), [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Topic trends across ISEF years from the abstract corpus
+- One pass over the projects builds a sparse term x (year, category) matrix
+  of project counts, plus the same counts for award winners (NumPy/SciPy)
+- Rising and declining terms: least-squares slope of each term's share of
+  projects per year, computed for every term at once
+- Category growth and award rates per term
+- update only counts projects that aren't in the saved state yet
+- export writes a compact data/trends.json for the explore page
+
+Usage:
+    python trends.py build                 # data/projects.json -> data/trends/
+    python trends.py update                # add newly scraped projects
+    python trends.py rising --top 20 [--category "Physics and Astronomy"]
+    python trends.py export
+"""
+
+import argparse
+import os
+from array import array
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+import serialization
+from jsonstream import iter_records
+from spelling import tokenize
+
+PROJECTS_FILE = "data/projects.json"
+STATE_DIR = "data/trends"
+EXPORT_FILE = "data/trends.json"
+
+# Projects counted per sparse chunk before it is folded into the totals
+CHUNK_PROJECTS = 50000
+
+# Terms in fewer projects than this are too noisy to rank
+MIN_PROJECTS = 20
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be been before being below
+between both but by can could did do does during each few for from further had has
+have having here how i if in into is it its itself more most no nor not of off on once
+only or other our out over own same should so some such than that the their them then
+there these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your using used use based study
+results result data however two one three new different may well project research
+""".split())
+
+def _require():
+    if np is None:
+        raise RuntimeError("Trend analytics need NumPy and SciPy (pip install numpy scipy)")
+
+def project_terms(project):
+    """Distinct content terms of a project's title and abstract"""
+    terms = set(tokenize(project.get('title')))
+    terms.update(tokenize(project.get('abstract')))
+    return {t for t in terms if len(t) > 2 and not t.isdigit() and t not in STOPWORDS}
+
+class TrendState:
+    """
+    Counts of projects per term and (year, category) cell.
+
+    counts[t, c] is the number of projects in cell c using term t; awarded
+    is the same for projects with awards. Rows and cells only ever grow, so
+    new projects are added without recomputing the old ones.
+    """
+
+    def __init__(self):
+        _require()
+        self.terms = []                 # row -> term
+        self.term_ids = {}
+        self.cells = []                 # column -> (year, category)
+        self.cell_ids = {}
+        self.cell_projects = []         # projects per cell
+        self.cell_awarded = []          # award-winning projects per cell
+        self.project_ids = set()
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.awarded = sparse.csr_matrix((0, 0), dtype=np.int32)
+
+    def _cell(self, project):
+        key = (str(project.get('year') or ''),
+               project.get('primary_category') or project.get('category') or '')
+        cell = self.cell_ids.get(key)
+        if cell is None:
+            cell = self.cell_ids[key] = len(self.cells)
+            self.cells.append(key)
+            self.cell_projects.append(0)
+            self.cell_awarded.append(0)
+        return cell
+
+    def _fold(self, rows, cols, awarded_rows, awarded_cols):
+        shape = (len(self.terms), len(self.cells))
+        self.counts = _resize(self.counts, shape)
+        self.awarded = _resize(self.awarded, shape)
+        for matrix, r, c in (('counts', rows, cols), ('awarded', awarded_rows, awarded_cols)):
+            if not r:
+                continue
+            r = np.frombuffer(r, dtype=np.int32)
+            c = np.frombuffer(c, dtype=np.int32)
+            chunk = sparse.csr_matrix((np.ones(len(r), dtype=np.int32), (r, c)), shape=shape)
+            setattr(self, matrix, getattr(self, matrix) + chunk)
+
+    def add(self, projects):
+        """Count every project not counted before; returns how many were added"""
+        added = 0
+        rows, cols, awarded_rows, awarded_cols = array('i'), array('i'), array('i'), array('i')
+        for project in projects:
+            project_id = project.get('id')
+            if project_id in self.project_ids:
+                continue
+            self.project_ids.add(project_id)
+            cell = self._cell(project)
+            has_awards = bool(project.get('awards'))
+            self.cell_projects[cell] += 1
+            self.cell_awarded[cell] += has_awards
+            for term in project_terms(project):
+                row = self.term_ids.get(term)
+                if row is None:
+                    row = self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                rows.append(row)
+                cols.append(cell)
+                if has_awards:
+                    awarded_rows.append(row)
+                    awarded_cols.append(cell)
+            added += 1
+            if added % CHUNK_PROJECTS == 0:
+                self._fold(rows, cols, awarded_rows, awarded_cols)
+                rows, cols, awarded_rows, awarded_cols = array('i'), array('i'), array('i'), array('i')
+        self._fold(rows, cols, awarded_rows, awarded_cols)
+        return added
+
+    def save(self, directory=STATE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        sparse.save_npz(os.path.join(directory, 'counts.npz'), self.counts)
+        sparse.save_npz(os.path.join(directory, 'awarded.npz'), self.awarded)
+        np.save(os.path.join(directory, 'project_ids.npy'),
+                np.array(sorted(self.project_ids), dtype=np.int64))
+        serialization.save(os.path.join(directory, 'meta.json'), {
+            'terms': self.terms,
+            'cells': [list(cell) for cell in self.cells],
+            'cell_projects': self.cell_projects,
+            'cell_awarded': self.cell_awarded,
+        })
+
+    @classmethod
+    def load(cls, directory=STATE_DIR):
+        state = cls()
+        meta = serialization.load(os.path.join(directory, 'meta.json'))
+        state.terms = meta['terms']
+        state.term_ids = {term: i for i, term in enumerate(state.terms)}
+        state.cells = [tuple(cell) for cell in meta['cells']]
+        state.cell_ids = {cell: i for i, cell in enumerate(state.cells)}
+        state.cell_projects = meta['cell_projects']
+        state.cell_awarded = meta['cell_awarded']
+        state.project_ids = set(np.load(os.path.join(directory, 'project_ids.npy')).tolist())
+        state.counts = sparse.load_npz(os.path.join(directory, 'counts.npz')).tocsr()
+        state.awarded = sparse.load_npz(os.path.join(directory, 'awarded.npz')).tocsr()
+        return state
+
+    # Aggregations: a sparse indicator matrix maps cells onto years or categories
+
+    def _group(self, position, keep=None):
+        """(labels, cells x labels indicator) for cell field 0 (year) or 1 (category)"""
+        labels = sorted({cell[position] for cell in self.cells if cell[position]
+                         and (keep is None or keep(cell))})
+        index = {label: i for i, label in enumerate(labels)}
+        rows = [c for c, cell in enumerate(self.cells)
+                if cell[position] in index and (keep is None or keep(cell))]
+        cols = [index[self.cells[c][position]] for c in rows]
+        indicator = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                      shape=(len(self.cells), len(labels)))
+        return labels, indicator
+
+    def by_year(self, category=None):
+        """(years, term x year project counts, projects per year)"""
+        keep = (lambda cell: cell[1] == category) if category else None
+        years, indicator = self._group(0, keep)
+        counts = (self.counts @ indicator).toarray()
+        totals = np.asarray(indicator.T @ np.array(self.cell_projects, dtype=float)).ravel()
+        return years, counts, totals
+
+def _resize(matrix, shape):
+    if matrix.shape == shape:
+        return matrix
+    matrix = matrix.tocoo()
+    return sparse.csr_matrix((matrix.data, (matrix.row, matrix.col)), shape=shape)
+
+def slopes(shares, years):
+    """Least-squares slope of every row of shares against the year axis"""
+    x = np.array([int(y) for y in years], dtype=float)
+    x -= x.mean()
+    denominator = (x ** 2).sum() or 1.0
+    return (shares - shares.mean(axis=1, keepdims=True)) @ x / denominator
+
+def rising_terms(state, top=20, category=None, min_projects=MIN_PROJECTS):
+    """
+    Terms whose share of projects grows or shrinks fastest.
+
+    Returns:
+        (years, rising, declining) where each entry is
+        {'term', 'slope', 'growth', 'projects', 'shares'}; growth is the
+        slope relative to the term's mean share (per year)
+    """
+    years, counts, totals = state.by_year(category)
+    if len(years) < 2:
+        return years, [], []
+    shares = counts / np.maximum(totals, 1)
+    support = counts.sum(axis=1)
+    eligible = np.flatnonzero(support >= min_projects)
+    if not len(eligible):
+        return years, [], []
+    slope = slopes(shares[eligible], years)
+    growth = slope / np.maximum(shares[eligible].mean(axis=1), 1e-12)
+
+    def entries(order):
+        return [{
+            'term': state.terms[eligible[i]],
+            'slope': float(slope[i]),
+            'growth': float(growth[i]),
+            'projects': int(support[eligible[i]]),
+            'shares': [round(float(s), 5) for s in shares[eligible[i]]],
+        } for i in order]
+
+    order = np.argsort(growth)
+    return years, entries(order[::-1][:top]), entries(order[:top])
+
+def category_growth(state):
+    """{category: {'shares': per-year share of projects, 'growth': relative slope}}"""
+    years, indicator = state._group(0)
+    categories, cat_indicator = state._group(1)
+    cell_projects = np.array(state.cell_projects, dtype=float)
+    # category x year project counts
+    grid = (cat_indicator.T @ sparse.diags(cell_projects) @ indicator).toarray()
+    totals = np.maximum(grid.sum(axis=0), 1)
+    shares = grid / totals
+    growth = slopes(shares, years) / np.maximum(shares.mean(axis=1), 1e-12)
+    return {
+        category: {'shares': [round(float(s), 5) for s in shares[i]], 'growth': float(growth[i])}
+        for i, category in enumerate(categories)
+    }
+
+def award_rates(state, top=20, min_projects=MIN_PROJECTS):
+    """Terms whose projects win awards most often, with their lift over the overall rate"""
+    counts = np.asarray(state.counts.sum(axis=1)).ravel()
+    awarded = np.asarray(state.awarded.sum(axis=1)).ravel()
+    overall = sum(state.cell_awarded) / max(sum(state.cell_projects), 1)
+    eligible = np.flatnonzero(counts >= min_projects)
+    rates = awarded[eligible] / counts[eligible]
+    order = np.argsort(rates)[::-1][:top]
+    return overall, [{
+        'term': state.terms[eligible[i]],
+        'award_rate': round(float(rates[i]), 4),
+        'lift': round(float(rates[i] / overall), 3) if overall else None,
+        'projects': int(counts[eligible[i]]),
+    } for i in order]
+
+def export(state, path=EXPORT_FILE, top=30):
+    """Write precomputed series for charts"""
+    years, rising, declining = rising_terms(state, top)
+    overall, rates = award_rates(state, top)
+    serialization.save(path, {
+        'years': years,
+        'projects': len(state.project_ids),
+        'rising': rising,
+        'declining': declining,
+        'categories': category_growth(state),
+        'award_rate': round(overall, 4),
+        'award_terms': rates,
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Topic trends across ISEF years")
+    parser.add_argument('--projects', default=PROJECTS_FILE)
+    parser.add_argument('--state', default=STATE_DIR, help=f"State directory (default: {STATE_DIR})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('build', help="Count every project from scratch")
+    sub.add_parser('update', help="Add projects missing from the saved state")
+    rising = sub.add_parser('rising', help="Show rising and declining terms")
+    rising.add_argument('--top', type=int, default=15)
+    rising.add_argument('--category')
+    rising.add_argument('--min-projects', type=int, default=MIN_PROJECTS)
+    export_cmd = sub.add_parser('export', help="Write precomputed trend series")
+    export_cmd.add_argument('--output', default=EXPORT_FILE)
+
+    args = parser.parse_args(argv)
+    try:
+        _require()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+    if args.command in ('build', 'update'):
+        state = TrendState() if args.command == 'build' else TrendState.load(args.state)
+        added = state.add(iter_records(args.projects))
+        state.save(args.state)
+        print(f"Added {added} projects: {len(state.project_ids)} projects, "
+              f"{len(state.terms)} terms, {len(state.cells)} year/category cells, "
+              f"{state.counts.nnz} nonzero counts")
+        return
+
+    state = TrendState.load(args.state)
+    if args.command == 'rising':
+        years, up, down = rising_terms(state, args.top, args.category, args.min_projects)
+        print(f"{len(state.project_ids)} projects, {years[0] if years else '-'}-{years[-1] if years else '-'}")
+        for title, entries in (('Rising', up), ('Declining', down)):
+            print(f"\n{title}:")
+            for entry in entries:
+                print(f"  {entry['term']:<24} {entry['growth'] * 100:+6.1f}%/year  "
+                      f"({entry['projects']} projects)")
+    elif args.command == 'export':
+        export(state, args.output)
+        print(f"Trends written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+University resolution for award strings
+- Precompiled gazetteer of institutions matched with an Aho-Corasick automaton
+- Alias normalization (MIT, UC Berkeley, Caltech, ...)
+- Memoized per distinct award string
+"""
+
+import argparse
+import re
+import time
+from collections import deque
+from functools import lru_cache
+
+import serialization
+
+WINNERS_FILE = "data/winner_emails.json"
+PROJECTS_FILE = "data/projects.json"
+
+# Canonical institution name -> aliases seen in award text.
+# The canonical name itself is always matched.
+INSTITUTIONS = {
+    'Arizona State University': ['ASU'],
+    'Boston University': [],
+    'Brown University': [],
+    'California Institute of Technology': ['Caltech', 'Cal Tech'],
+    'Carnegie Mellon University': ['Carnegie Mellon', 'CMU'],
+    'Case Western Reserve University': ['Case Western'],
+    'Columbia University': [],
+    'Cornell University': ['Cornell'],
+    'Dartmouth College': ['Dartmouth'],
+    'Drexel University': [],
+    'Duke University': [],
+    'Emory University': [],
+    'Florida Institute of Technology': ['Florida Tech'],
+    'Georgetown University': [],
+    'Georgia Institute of Technology': ['Georgia Tech'],
+    'Harvard University': ['Harvard'],
+    'Harvey Mudd College': [],
+    'Johns Hopkins University': ['Johns Hopkins'],
+    'Massachusetts Institute of Technology': ['MIT'],
+    'Michigan State University': [],
+    'New Mexico Institute of Mining and Technology': ['New Mexico Tech'],
+    'New York University': ['NYU'],
+    'Northeastern University': [],
+    'Northwestern University': [],
+    'Ohio State University': ['The Ohio State University'],
+    'Pennsylvania State University': ['Penn State', 'Penn State University'],
+    'Princeton University': ['Princeton'],
+    'Purdue University': ['Purdue'],
+    'Rensselaer Polytechnic Institute': ['RPI'],
+    'Rice University': [],
+    'Rochester Institute of Technology': [],
+    'Stanford University': ['Stanford'],
+    'Stevens Institute of Technology': [],
+    'Texas A&M University': ['Texas A&M'],
+    'Tufts University': [],
+    'University of Arizona': [],
+    'University of California, Berkeley': ['UC Berkeley', 'University of California Berkeley'],
+    'University of California, Los Angeles': ['UCLA', 'University of California Los Angeles'],
+    'University of California, San Diego': ['UCSD', 'UC San Diego'],
+    'University of Chicago': ['UChicago'],
+    'University of Florida': [],
+    'University of Illinois Urbana-Champaign': ['UIUC', 'University of Illinois'],
+    'University of Michigan': [],
+    'University of Notre Dame': ['Notre Dame'],
+    'University of Pennsylvania': ['UPenn'],
+    'University of Pittsburgh': [],
+    'University of Southern California': ['USC'],
+    'University of Texas at Austin': ['UT Austin'],
+    'University of Texas at Dallas': ['UT Dallas'],
+    'University of Washington': [],
+    'University of Wisconsin-Madison': ['University of Wisconsin'],
+    'Vanderbilt University': [],
+    'Villanova University': [],
+    'Washington University in St. Louis': ['Washington University in St Louis', 'WashU'],
+    'Worcester Polytechnic Institute': ['WPI'],
+    'Yale University': ['Yale'],
+}
+
+# Canonical institution name -> the domain its student addresses use
+DOMAINS = {
+    'Arizona State University': 'asu.edu',
+    'Boston University': 'bu.edu',
+    'Brown University': 'brown.edu',
+    'California Institute of Technology': 'caltech.edu',
+    'Carnegie Mellon University': 'andrew.cmu.edu',
+    'Case Western Reserve University': 'case.edu',
+    'Columbia University': 'columbia.edu',
+    'Cornell University': 'cornell.edu',
+    'Dartmouth College': 'dartmouth.edu',
+    'Drexel University': 'drexel.edu',
+    'Duke University': 'duke.edu',
+    'Emory University': 'emory.edu',
+    'Florida Institute of Technology': 'fit.edu',
+    'Georgetown University': 'georgetown.edu',
+    'Georgia Institute of Technology': 'gatech.edu',
+    'Harvard University': 'college.harvard.edu',
+    'Harvey Mudd College': 'hmc.edu',
+    'Johns Hopkins University': 'jhu.edu',
+    'Massachusetts Institute of Technology': 'mit.edu',
+    'Michigan State University': 'msu.edu',
+    'New Mexico Institute of Mining and Technology': 'nmt.edu',
+    'New York University': 'nyu.edu',
+    'Northeastern University': 'northeastern.edu',
+    'Northwestern University': 'u.northwestern.edu',
+    'Ohio State University': 'osu.edu',
+    'Pennsylvania State University': 'psu.edu',
+    'Princeton University': 'princeton.edu',
+    'Purdue University': 'purdue.edu',
+    'Rensselaer Polytechnic Institute': 'rpi.edu',
+    'Rice University': 'rice.edu',
+    'Rochester Institute of Technology': 'rit.edu',
+    'Stanford University': 'stanford.edu',
+    'Stevens Institute of Technology': 'stevens.edu',
+    'Texas A&M University': 'tamu.edu',
+    'Tufts University': 'tufts.edu',
+    'University of Arizona': 'arizona.edu',
+    'University of California, Berkeley': 'berkeley.edu',
+    'University of California, Los Angeles': 'g.ucla.edu',
+    'University of California, San Diego': 'ucsd.edu',
+    'University of Chicago': 'uchicago.edu',
+    'University of Florida': 'ufl.edu',
+    'University of Illinois Urbana-Champaign': 'illinois.edu',
+    'University of Michigan': 'umich.edu',
+    'University of Notre Dame': 'nd.edu',
+    'University of Pennsylvania': 'upenn.edu',
+    'University of Pittsburgh': 'pitt.edu',
+    'University of Southern California': 'usc.edu',
+    'University of Texas at Austin': 'utexas.edu',
+    'University of Texas at Dallas': 'utdallas.edu',
+    'University of Washington': 'uw.edu',
+    'University of Wisconsin-Madison': 'wisc.edu',
+    'Vanderbilt University': 'vanderbilt.edu',
+    'Villanova University': 'villanova.edu',
+    'Washington University in St. Louis': 'wustl.edu',
+    'Worcester Polytechnic Institute': 'wpi.edu',
+    'Yale University': 'yale.edu',
+}
+
+# Fallback for institutions missing from the gazetteer: a bounded run of
+# capitalized words ending in University/College/Institute/Polytechnic,
+# optionally followed by "of <Place>". The bounded repeats keep matching
+# linear in the award length.
+_WORD = r"[A-Z][\w.'&-]*"
+_FALLBACK_RE = re.compile(
+    rf"\b((?:{_WORD}\s){{0,4}}(?:University|College|Institute|Polytechnic)\b"
+    rf"(?:\sof(?:\s{_WORD}){{1,3}})?)"
+)
+_FALLBACK_STRIP_RE = re.compile(r"^(?:The|A)\s")
+
+# Acronym aliases must match with exact case (e.g. "MIT" but not "submit")
+_ACRONYM_RE = re.compile(r'^[A-Z&]{2,5}$')
+
+def _normalize(text):
+    """Lowercase text without changing its length, and unescape &amp"""
+    text = text.replace('&amp;', '&').replace('&amp', '&')
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    return text, lowered
+
+class _Automaton:
+    """Aho-Corasick automaton over lowercased patterns"""
+
+    def __init__(self, patterns):
+        # patterns: iterable of (key, payload)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for key, payload in patterns:
+            node = 0
+            for ch in key:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append((len(key), payload))
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """Yield (start, end, payload) for every pattern occurrence in text"""
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, payload in out[node]:
+                yield i + 1 - length, i + 1, payload
+
+def _build_gazetteer():
+    patterns = []
+    for canonical, aliases in INSTITUTIONS.items():
+        for alias in [canonical] + aliases:
+            exact = alias if _ACRONYM_RE.match(alias) else None
+            patterns.append((alias.lower(), (canonical, exact)))
+    return _Automaton(patterns)
+
+_GAZETTEER = _build_gazetteer()
+
+def _is_boundary(text, start, end):
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() or after.isalnum())
+
+def match_institutions(award):
+    """Return [(start, canonical)] for every gazetteer institution in award"""
+    original, lowered = _normalize(award)
+    matches = []
+    for start, end, (canonical, exact) in _GAZETTEER.find(lowered):
+        if not _is_boundary(lowered, start, end):
+            continue
+        if exact is not None and original[start:end] != exact:
+            continue
+        matches.append((start, end, canonical))
+
+    # Leftmost-longest, dropping matches nested inside an earlier one
+    matches.sort(key=lambda m: (m[0], -m[1]))
+    result = []
+    last_end = -1
+    for start, end, canonical in matches:
+        if start >= last_end:
+            result.append((start, canonical))
+            last_end = end
+    return result
+
+@lru_cache(maxsize=None)
+def resolve_award(award):
+    """Resolve the institution named in a single award string, or ''"""
+    if not award:
+        return ''
+
+    matches = match_institutions(award)
+    if matches:
+        return matches[0][1]
+
+    match = _FALLBACK_RE.search(award.replace('&amp;', '&').replace('&amp', '&'))
+    if match:
+        return _FALLBACK_STRIP_RE.sub('', match.group(1).strip())
+
+    return ''
+
+def extract_university(awards):
+    """Extract university name from a list of awards"""
+    for award in awards or []:
+        uni = resolve_award(award)
+        if uni:
+            return uni
+    return ''
+
+def annotate_winners(winners):
+    """Set the 'uni' field on every winner record; return IDs that changed"""
+    changed = []
+    for project_id, winner in winners.items():
+        uni = extract_university(winner.get('awards', []))
+        if winner.get('uni') != uni:
+            winner['uni'] = uni
+            changed.append(project_id)
+    return changed
+
+def _legacy_extract_university(awards):
+    """Original per-call regex extraction, kept for benchmarking"""
+    for award in awards or []:
+        patterns = [
+            r'([\w\s]+University(?: of [\w\s]+)?)',
+            r'([\w\s]+Institute(?: of [\w\s]+)?)',
+            r'([\w\s]+College)',
+            r'(MIT|Stanford|Harvard|Yale|Princeton|Cornell|Columbia|Penn State|UC Berkeley|UCLA|USC|Caltech|Carnegie Mellon)'
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, award, re.IGNORECASE)
+            if match:
+                return re.sub(r'^(The |A )', '', match.group(1).strip())
+    return ''
+
+def load_award_lists(path):
+    """Load award lists from a projects list or a {id: winner} mapping"""
+    data = serialization.load(path)
+    records = data.values() if isinstance(data, dict) else data
+    return [r.get('awards', []) for r in records if r.get('awards')]
+
+def benchmark(award_lists, repeat=5):
+    """Time legacy vs gazetteer extraction over every award list"""
+    total_awards = sum(len(a) for a in award_lists)
+    distinct = len({award for awards in award_lists for award in awards})
+    print(f"Benchmarking {len(award_lists)} award lists "
+          f"({total_awards} awards, {distinct} distinct), best of {repeat}")
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for awards in award_lists:
+                func(awards)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    legacy = best(_legacy_extract_university)
+
+    resolve_award.cache_clear()
+    start = time.perf_counter()
+    for awards in award_lists:
+        extract_university(awards)
+    cold = time.perf_counter() - start
+    warm = best(extract_university)
+
+    print(f"  legacy regex:        {legacy * 1000:8.2f} ms")
+    print(f"  gazetteer (cold):    {cold * 1000:8.2f} ms")
+    print(f"  gazetteer (cached):  {warm * 1000:8.2f} ms")
+
+    differing = [(a, _legacy_extract_university(a), extract_university(a))
+                 for a in award_lists
+                 if _legacy_extract_university(a) != extract_university(a)]
+    print(f"  results differ on {len(differing)} award lists")
+    for awards, old, new in differing[:10]:
+        print(f"    {old[:50]!r} -> {new!r}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve universities named in award strings")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    annotate = sub.add_parser('annotate', help="Write a 'uni' field onto each winner record")
+    annotate.add_argument('file', nargs='?', default=WINNERS_FILE)
+
+    bench = sub.add_parser('bench', help="Benchmark extraction over all awards")
+    bench.add_argument('file', nargs='?', default=PROJECTS_FILE,
+                       help="projects.json or winner_emails.json")
+    bench.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'annotate':
+        from enrich import save_records
+        winners = serialization.load(args.file, 'winners')
+        changed = annotate_winners(winners)
+        if changed:
+            save_records(args.file, winners)
+        print(f"Updated 'uni' on {len(changed)}/{len(winners)} records in {args.file}")
+    elif args.command == 'bench':
+        benchmark(load_award_lists(args.file), repeat=args.repeat)
+
+if __name__ == '__main__':
+    main()